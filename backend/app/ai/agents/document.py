@@ -3,14 +3,15 @@ AI Tutor Platform - Document Agent
 Handles document upload, processing, chunking, and embedding for RAG.
 """
 import os
+import re
 import uuid
 import asyncio
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
 from app.ai.agents.base import BaseAgent, AgentContext, AgentResult, AgentState
-from app.ai.core.telemetry import get_tracer
+from app.ai.core.telemetry import get_tracer, trace_embedding_batches
 from app.core.config import settings
 
 # Document processing imports
@@ -20,26 +21,8 @@ try:
 except ImportError:
     TIKTOKEN_AVAILABLE = False
 
-try:
-    from pypdf import PdfReader
-    PYPDF_AVAILABLE = True
-except ImportError:
-    PYPDF_AVAILABLE = False
-
-try:
-    from docx import Document as DocxDocument
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
-
-
-@dataclass
-class ChunkResult:
-    """Result of chunking a document."""
-    chunks: List[str]
-    token_counts: List[int]
-    total_tokens: int
-    metadata: List[Dict[str, Any]]
+from app.ai.core.chunking import ChunkResult, SentenceChunker, create_chunker
+from app.ai.core.text_extraction import extract_docx_text, iter_pdf_pages
 
 
 @dataclass 
@@ -190,14 +173,26 @@ class DocumentAgent(BaseAgent):
             span.set_attribute("document.type", params["file_type"])
             
             try:
-                # Step 1: Extract text
+                # Steps 1-3: Extract, clean and chunk page by page. Pages
+                # stream in from the extraction pool, so the whole text is
+                # never held at once
                 span.add_event("extracting_text")
-                text = await self._extract_text(
+                await self._report_stage(context, "extracting")
+                chunker = self._create_chunker(params["chunk_size"], params["chunk_overlap"])
+                text_length = 0
+                page_count = 0
+                
+                async for page, text in self._iter_pages(
                     params["file_path"],
                     params["extraction_method"]
-                )
+                ):
+                    page_count += 1
+                    cleaned_text = self._clean_text(text)
+                    if cleaned_text:
+                        chunker.feed(cleaned_text, page)
+                        text_length += len(cleaned_text)
                 
-                if not text or not text.strip():
+                if not text_length:
                     return AgentResult(
                         success=False,
                         output=None,
@@ -205,26 +200,22 @@ class DocumentAgent(BaseAgent):
                         error="No text could be extracted from document"
                     )
                 
-                span.set_attribute("document.text_length", len(text))
-                
-                # Step 2: Clean text
-                span.add_event("cleaning_text")
-                cleaned_text = self._clean_text(text)
+                span.set_attribute("document.text_length", text_length)
+                span.set_attribute("document.page_count", page_count)
                 
-                # Step 3: Chunk text
                 span.add_event("chunking_text")
-                chunk_result = self._chunk_text(
-                    cleaned_text,
-                    params["chunk_size"],
-                    params["chunk_overlap"]
-                )
+                await self._report_stage(context, "chunking")
+                chunk_result = chunker.finish()
                 
                 span.set_attribute("document.chunk_count", len(chunk_result.chunks))
                 span.set_attribute("document.total_tokens", chunk_result.total_tokens)
                 
                 # Step 4: Generate embeddings (if embedding service available)
                 span.add_event("generating_embeddings")
-                embeddings = await self._generate_embeddings(chunk_result.chunks)
+                await self._report_stage(context, "embedding")
+                embeddings = await self._generate_embeddings(
+                    chunk_result.chunks, chunk_result.token_counts
+                )
                 
                 # Return result (storage happens at service layer)
                 result = DocumentResult(
@@ -257,48 +248,31 @@ class DocumentAgent(BaseAgent):
                     error=str(e)
                 )
     
-    async def _extract_text(self, file_path: str, method: str) -> str:
-        """Extract text from document based on file type."""
+    @staticmethod
+    async def _report_stage(context: AgentContext, stage: str) -> None:
+        """Tell the caller (ingestion job) which step is starting."""
+        on_stage = context.metadata.get("on_stage")
+        if on_stage:
+            await on_stage(stage)
+    
+    async def _iter_pages(
+        self,
+        file_path: str,
+        method: str,
+    ) -> AsyncIterator[Tuple[Optional[int], str]]:
+        """
+        Yield (page_number, text) in document order.
+        
+        PDFs are parsed in parallel page ranges (process pool); DOCX and
+        plain text have no pages and come as one piece with page None.
+        """
         if method == "pdf":
-            return await self._extract_pdf(file_path)
+            async for page, text in iter_pdf_pages(file_path):
+                yield page, text
         elif method == "docx":
-            return await self._extract_docx(file_path)
+            yield None, await extract_docx_text(file_path)
         else:
-            return await self._extract_text_file(file_path)
-    
-    async def _extract_pdf(self, file_path: str) -> str:
-        """Extract text from PDF file."""
-        if not PYPDF_AVAILABLE:
-            raise ImportError("pypdf is not installed. Run: pip install pypdf")
-        
-        def _read_pdf():
-            reader = PdfReader(file_path)
-            text_parts = []
-            for page in reader.pages:
-                text = page.extract_text()
-                if text:
-                    text_parts.append(text)
-            return "\n\n".join(text_parts)
-        
-        # Run in executor to not block async loop
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _read_pdf)
-    
-    async def _extract_docx(self, file_path: str) -> str:
-        """Extract text from DOCX file."""
-        if not DOCX_AVAILABLE:
-            raise ImportError("python-docx is not installed. Run: pip install python-docx")
-        
-        def _read_docx():
-            doc = DocxDocument(file_path)
-            text_parts = []
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    text_parts.append(para.text)
-            return "\n\n".join(text_parts)
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _read_docx)
+            yield None, await self._extract_text_file(file_path)
     
     async def _extract_text_file(self, file_path: str) -> str:
         """Extract text from plain text file."""
@@ -338,115 +312,44 @@ class DocumentAgent(BaseAgent):
         
         Uses sentence-aware splitting to avoid breaking mid-sentence.
         """
-        import re
-        
-        # Split into sentences
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        
-        chunks = []
-        token_counts = []
-        metadata = []
-        
-        current_chunk = []
-        current_tokens = 0
-        chunk_index = 0
-        
-        for sentence in sentences:
-            sentence_tokens = self._count_tokens(sentence)
-            
-            # If single sentence exceeds chunk size, split it
-            if sentence_tokens > chunk_size:
-                # Save current chunk if any
-                if current_chunk:
-                    chunk_text = ' '.join(current_chunk)
-                    chunks.append(chunk_text)
-                    token_counts.append(current_tokens)
-                    metadata.append({"chunk_index": chunk_index})
-                    chunk_index += 1
-                    current_chunk = []
-                    current_tokens = 0
-                
-                # Split long sentence by words
-                words = sentence.split()
-                word_chunk = []
-                word_tokens = 0
-                
-                for word in words:
-                    word_token_count = self._count_tokens(word)
-                    if word_tokens + word_token_count > chunk_size:
-                        if word_chunk:
-                            chunk_text = ' '.join(word_chunk)
-                            chunks.append(chunk_text)
-                            token_counts.append(word_tokens)
-                            metadata.append({"chunk_index": chunk_index})
-                            chunk_index += 1
-                        word_chunk = [word]
-                        word_tokens = word_token_count
-                    else:
-                        word_chunk.append(word)
-                        word_tokens += word_token_count
-                
-                if word_chunk:
-                    # Add remainder to current_chunk for overlap
-                    current_chunk = word_chunk
-                    current_tokens = word_tokens
-            
-            elif current_tokens + sentence_tokens > chunk_size:
-                # Save current chunk
-                chunk_text = ' '.join(current_chunk)
-                chunks.append(chunk_text)
-                token_counts.append(current_tokens)
-                metadata.append({"chunk_index": chunk_index})
-                chunk_index += 1
-                
-                # Start new chunk with overlap
-                overlap_sentences = []
-                overlap_tokens = 0
-                
-                for s in reversed(current_chunk):
-                    s_tokens = self._count_tokens(s)
-                    if overlap_tokens + s_tokens <= overlap:
-                        overlap_sentences.insert(0, s)
-                        overlap_tokens += s_tokens
-                    else:
-                        break
-                
-                current_chunk = overlap_sentences + [sentence]
-                current_tokens = overlap_tokens + sentence_tokens
-            else:
-                current_chunk.append(sentence)
-                current_tokens += sentence_tokens
-        
-        # Don't forget the last chunk
-        if current_chunk:
-            chunk_text = ' '.join(current_chunk)
-            chunks.append(chunk_text)
-            token_counts.append(current_tokens)
-            metadata.append({"chunk_index": chunk_index})
-        
-        return ChunkResult(
-            chunks=chunks,
-            token_counts=token_counts,
-            total_tokens=sum(token_counts),
-            metadata=metadata
+        chunker = self._create_chunker(chunk_size, overlap)
+        chunker.feed(text)
+        return chunker.finish()
+    
+    def _create_chunker(self, chunk_size: int, overlap: int) -> SentenceChunker:
+        """Chunker selected by DOCUMENT_CHUNKER (token offsets or compatible)."""
+        return create_chunker(
+            self._tokenizer,
+            self._count_tokens,
+            chunk_size,
+            overlap,
+            mode=settings.DOCUMENT_CHUNKER,
         )
     
-    async def _generate_embeddings(self, chunks: List[str]) -> List[List[float]]:
+    async def _generate_embeddings(
+        self,
+        chunks: List[str],
+        token_counts: Optional[List[int]] = None,
+    ) -> List[Optional[List[float]]]:
         """
-        Generate embeddings for chunks using OpenAI.
+        Generate embeddings for chunks using the configured provider.
         
-        Returns empty list if embedding fails (graceful degradation).
+        Chunks are embedded in concurrent token-bounded batches; chunks of a
+        batch that keeps failing get None. Returns empty list if embedding
+        is unavailable or every batch fails (graceful degradation).
         """
         try:
-            from langchain_openai import OpenAIEmbeddings
+            from app.ai.core.embedding_batcher import get_embedding_batcher
             
-            embeddings_model = OpenAIEmbeddings(
-                model="text-embedding-3-small",
-                openai_api_key=settings.OPENAI_API_KEY
-            )
+            batcher = get_embedding_batcher()
+            embeddings = await batcher.embed(chunks, token_counts)
+            trace_embedding_batches(batcher.stats)
             
-            # Generate embeddings in batches
-            embeddings = await embeddings_model.aembed_documents(chunks)
+            missing = sum(1 for embedding in embeddings if embedding is None)
+            if missing == len(embeddings):
+                return []
+            if missing:
+                print(f"[DocumentAgent] {missing} of {len(embeddings)} chunks have no embedding")
             return embeddings
             
         except Exception as e:
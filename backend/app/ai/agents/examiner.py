@@ -3,14 +3,17 @@ AI Tutor Platform - Examiner Agent
 Generates educational questions for assessments, tests, and practice.
 Refactored from question_generator.py to use Agentic Architecture.
 """
+import asyncio
 import json
 import random
-from typing import Dict, Any, List, Optional, Literal, Tuple
+import uuid
+from typing import Dict, Any, List, Optional, Literal, Sequence, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
 from app.ai.agents.base import BaseAgent, AgentContext, AgentResult, AgentState
 from app.ai.core.telemetry import get_tracer
+from app.ai.core.rate_limiter import LLMPriority
 
 
 class QuestionDifficulty(str, Enum):
@@ -63,6 +66,7 @@ class ExaminerAgent(BaseAgent):
     
     # Maximum retries for unique question generation
     MAX_RETRIES = 5  # Increased from 3 for more variety attempts
+    BATCH_REGENERATION_ROUNDS = 1  # Follow-up calls for rejected batch slots
     
     # Higher default temperature for more creative questions
     DEFAULT_TEMPERATURE = 1.0  # Increased from 0.9
@@ -329,7 +333,7 @@ FINAL CHECK: Is this question DIFFERENT from typical questions? Does it use UNIQ
             
             # Fetch concept exclusions
             try:
-                exclusions_dict = self.validator.get_exclusions(session_id)
+                exclusions_dict = await self.validator.get_exclusions(session_id)
                 exclusions_str = (
                     f"- Words: {', '.join(exclusions_dict.get('words', []))}\n"
                     f"- Numbers: {', '.join(map(str, exclusions_dict.get('numbers', [])))}\n"
@@ -360,6 +364,7 @@ FINAL CHECK: Is this question DIFFERENT from typical questions? Does it use UNIQ
                         system_prompt=self.SYSTEM_PROMPT,
                         context=params,
                         agent_name=self.name,
+                        use_cache=False,  # Every call must produce fresh questions
                     )
                     
                     # Normalize response
@@ -390,10 +395,7 @@ FINAL CHECK: Is this question DIFFERENT from typical questions? Does it use UNIQ
                                     "corrected_answer": validation.corrected_answer,
                                 })
                                 # Fix the answer and continue validation
-                                question.answer = validation.corrected_answer
-                                # Also fix it in options (first option should be correct)
-                                if question.options and question.options[0] != validation.corrected_answer:
-                                    question.options[0] = validation.corrected_answer
+                                self._apply_corrected_answer(question, validation.corrected_answer)
                                 
                                 # Re-validate without answer check (we just fixed it)
                                 validation = await self.validator.validate(
@@ -402,6 +404,7 @@ FINAL CHECK: Is this question DIFFERENT from typical questions? Does it use UNIQ
                                     grade=params["grade"],
                                     subject=params["subject"],
                                     answer=None,  # Skip answer validation this time
+                                    options=question.options,  # Re-check the patched options
                                     auto_record=False,
                                 )
                                 
@@ -540,7 +543,9 @@ FINAL CHECK: Is this question DIFFERENT from typical questions? Does it use UNIQ
         grade: int = 1,
         question_type: str = "multiple_choice",
         session_id: str = None,
-    ) -> List[GeneratedQuestion]:
+        priority: LLMPriority = LLMPriority.DEFAULT,
+        validate: bool = True,
+    ) -> List[Optional[GeneratedQuestion]]:
         """
         Generate multiple questions in a single LLM call for better diversity.
         
@@ -549,6 +554,18 @@ FINAL CHECK: Is this question DIFFERENT from typical questions? Does it use UNIQ
         2. Fewer API calls = lower cost and faster execution  
         3. Avoids retry loops from similar sequential questions
         
+        Every requested question is a slot (topic, subtopic, difficulty), in
+        topic_distribution order. The LLM tags each question with its topic
+        and subtopic, and questions are matched to slots by that tag - never
+        by position - so a dropped or reordered question cannot shift later
+        ones onto the wrong subtopic.
+        
+        With validate, every question goes through full validation
+        concurrently (ValidatorAgent.validate_many). Rejected or unfilled
+        slots are regenerated together in one follow-up call per round
+        rather than retried one by one. Accepted questions are recorded in
+        the session history.
+        
         Args:
             subject: The subject area
             topic_distribution: List of (topic, subtopic, count) tuples
@@ -556,11 +573,175 @@ FINAL CHECK: Is this question DIFFERENT from typical questions? Does it use UNIQ
             grade: Student grade level
             question_type: Type of questions
             session_id: Session ID for validation tracking
+            priority: LLM dispatch priority (BATCH for background refills)
+            validate: Run full validation and regenerate rejected slots
             
         Returns:
-            List of Gener
-
-atedQuestion objects
+            List aligned with the slots: a GeneratedQuestion per slot, or
+            None where no matching (valid) question was produced
+        """
+        # One slot per requested question: (topic, subtopic, difficulty)
+        slots = [
+            (topic, subtopic)
+            for topic, subtopic, count in topic_distribution
+            for _ in range(count)
+        ]
+        slots = [
+            (topic, subtopic, difficulty_distribution[i] if i < len(difficulty_distribution) else "medium")
+            for i, (topic, subtopic) in enumerate(slots)
+        ]
+        accepted: List[Optional[GeneratedQuestion]] = [None] * len(slots)
+        pending = list(range(len(slots)))
+        
+        candidates = await self._request_batch(
+            subject, topic_distribution, difficulty_distribution, grade, priority
+        )
+        if not validate:
+            for slot, question in self._assign_slots(slots, pending, candidates).items():
+                accepted[slot] = question
+            return accepted
+        
+        validation_session = session_id or f"batch_{uuid.uuid4().hex}"
+        
+        for round_idx in range(self.BATCH_REGENERATION_ROUNDS + 1):
+            batch = list(self._assign_slots(slots, pending, candidates).items())
+            results = await self.validator.validate_many(
+                [q for _, q in batch], validation_session, grade=grade, subject=subject
+            )
+            
+            rejected, rejected_texts, corrected = [], [], []
+            for (slot, question), result in zip(batch, results):
+                if result.is_valid:
+                    accepted[slot] = question
+                elif result.corrected_answer:
+                    # Wrong answer key only: fix it instead of regenerating
+                    self._apply_corrected_answer(question, result.corrected_answer)
+                    corrected.append((slot, question))
+                else:
+                    rejected.append(slot)
+                    rejected_texts.append(question.question)
+            
+            # Re-validate patched questions without the answer check (we just
+            # fixed it) so the distractor check runs on the new options
+            rechecks = await asyncio.gather(*(
+                self.validator.validate(
+                    question=question.question,
+                    session_id=validation_session,
+                    grade=grade,
+                    subject=subject,
+                    answer=None,
+                    options=question.options,
+                    auto_record=False,
+                )
+                for _, question in corrected
+            ))
+            for (slot, question), recheck in zip(corrected, rechecks):
+                if recheck.is_valid:
+                    accepted[slot] = question
+                else:
+                    rejected.append(slot)
+                    rejected_texts.append(question.question)
+            # Slots no returned question matched count as rejected
+            pending = sorted(set(rejected) | {slot for slot in pending if accepted[slot] is None})
+            
+            if not pending or round_idx == self.BATCH_REGENERATION_ROUNDS:
+                break
+            
+            # Regenerate only the rejected slots, in ONE call
+            print(f"🔁 Regenerating {len(pending)}/{len(slots)} rejected batch questions")
+            retry_distribution: Dict[Tuple[str, str], int] = {}
+            for slot in pending:
+                key = slots[slot][:2]
+                retry_distribution[key] = retry_distribution.get(key, 0) + 1
+            try:
+                candidates = await self._request_batch(
+                    subject,
+                    [(topic, subtopic, count) for (topic, subtopic), count in retry_distribution.items()],
+                    [slots[i][2] for i in pending],
+                    grade,
+                    priority,
+                    avoid=[q.question for q in accepted if q] + rejected_texts,
+                )
+            except Exception as e:
+                print(f"Batch regeneration failed: {e}")
+                break
+        
+        if session_id:
+            for question in accepted:
+                if question:
+                    await self.validator.record_question(session_id, question.question)
+        return accepted
+    
+    @staticmethod
+    def _assign_slots(
+        slots: Sequence[Tuple[str, str, Any]],
+        pending: Sequence[int],
+        candidates: Sequence[Tuple[Tuple[str, str], GeneratedQuestion]],
+    ) -> Dict[int, GeneratedQuestion]:
+        """
+        Match tagged questions to pending slots.
+        
+        A question goes to a pending slot with the same subtopic, preferring
+        one with the same difficulty. If its subtopic is not one that was
+        requested, its topic is used instead when that topic was requested
+        with a single subtopic. Questions that match no open slot are
+        dropped rather than guessed.
+        """
+        def norm(value: Any) -> str:
+            return " ".join(str(getattr(value, "value", value) or "").lower().split())
+        
+        requested_subtopics = {norm(subtopic) for _, subtopic, _ in slots}
+        subtopics_by_topic: Dict[str, set] = {}
+        for topic, subtopic, _ in slots:
+            subtopics_by_topic.setdefault(norm(topic), set()).add(norm(subtopic))
+        
+        open_slots = list(pending)
+        assigned: Dict[int, GeneratedQuestion] = {}
+        for (topic, subtopic), question in candidates:
+            subtopic_key = norm(subtopic)
+            if subtopic_key not in requested_subtopics:
+                topic_subtopics = subtopics_by_topic.get(norm(topic), set())
+                if len(topic_subtopics) != 1:
+                    continue
+                subtopic_key = next(iter(topic_subtopics))
+            matches = [i for i in open_slots if norm(slots[i][1]) == subtopic_key]
+            if not matches:
+                continue
+            same_difficulty = [i for i in matches if norm(slots[i][2]) == norm(question.difficulty)]
+            slot = (same_difficulty or matches)[0]
+            assigned[slot] = question
+            open_slots.remove(slot)
+        return assigned
+    
+    @staticmethod
+    def _apply_corrected_answer(question: GeneratedQuestion, corrected: str) -> None:
+        """
+        Replace a wrong answer (and its option) with the verified one.
+        
+        If the verified answer is already an option (a distractor was the
+        right one), the options are left alone so none is duplicated.
+        """
+        if question.options and corrected not in question.options:
+            try:
+                question.options[question.options.index(question.answer)] = corrected
+            except ValueError:
+                question.options[0] = corrected
+        question.answer = corrected
+        question.correct_answers = [corrected]
+    
+    async def _request_batch(
+        self,
+        subject: str,
+        topic_distribution: List[Tuple[str, str, int]],
+        difficulty_distribution: List[str],
+        grade: int,
+        priority: LLMPriority,
+        avoid: Sequence[str] = (),
+    ) -> List[Tuple[Tuple[str, str], GeneratedQuestion]]:
+        """
+        One batch LLM call: prompt, parse, in-batch dedup and answer fixes.
+        
+        Returns ((topic, subtopic) tag, question) pairs as tagged by the LLM.
         """
         # Build detailed prompt for batch generation
         total_questions = sum(count for _, _, count in topic_distribution)
@@ -577,13 +758,18 @@ atedQuestion objects
             diff_counts[d] = diff_counts.get(d, 0) + 1
         difficulty_breakdown = ", ".join([f"{count} {diff}" for diff, count in diff_counts.items()])
         
+        avoid_section = ""
+        if avoid:
+            avoid_lines = "\n".join(f"  - {text}" for text in avoid)
+            avoid_section = f"\nDO NOT REPEAT OR PARAPHRASE THESE EXISTING QUESTIONS:\n{avoid_lines}\n"
+        
         batch_prompt = f"""Generate {total_questions} COMPLETELY UNIQUE multiple-choice questions for Grade {grade} {subject}.
 
 TOPIC DISTRIBUTION (must follow exactly):
 {topic_breakdown}
 
 DIFFICULTY DISTRIBUTION: {difficulty_breakdown}
-
+{avoid_section}
 CRITICAL REQUIREMENTS FOR DIVERSITY:
 1. **Different Concepts**: Each question must test a DIFFERENT concept/skill
 2. **Different Numbers**: Use varied numbers/values (avoid similar patterns)
@@ -610,7 +796,9 @@ Return a JSON array of {total_questions} questions in this EXACT format:
     "subtopic": "subtopic name"
   }},
   ... ({total_questions} total)
-]"""
+]
+
+Set "topic" and "subtopic" on every question, copied EXACTLY from the topic distribution above."""
 
         try:
             # Use the LLM to generate batch (returns parsed JSON directly)
@@ -619,6 +807,8 @@ Return a JSON array of {total_questions} questions in this EXACT format:
                 system_prompt=self.SYSTEM_PROMPT,
                 context={"batch_mode": True, "total_questions": total_questions},
                 agent_name=self.name,
+                use_cache=False,  # Every call must produce fresh questions
+                priority=priority,
             )
             
             # Handle response - it might be a list already or need parsing
@@ -640,17 +830,18 @@ Return a JSON array of {total_questions} questions in this EXACT format:
                 # Assume it's already a valid structure
                 questions_data = [response] if isinstance(response, dict) else []
             
-            # Normalize and create GeneratedQuestion objects
+            # Normalize and create GeneratedQuestion objects, keeping the
+            # topic/subtopic tag each question was generated for
             questions = []
             for q_data in questions_data:
-                normalized = self._normalize_question(q_data)
-                questions.append(normalized)
+                tag = (str(q_data.get("topic") or ""), str(q_data.get("subtopic") or ""))
+                questions.append((tag, self._normalize_question(q_data)))
             
             # Validate batch for duplicates AND answer correctness
             seen_hashes = set()
             unique_questions = []
             
-            for q in questions:
+            for tag, q in questions:
                 q_hash = hash(q.question.lower().strip())
                 if q_hash not in seen_hashes:
                     seen_hashes.add(q_hash)
@@ -669,21 +860,11 @@ Return a JSON array of {total_questions} questions in this EXACT format:
                         if not answer_result.is_correct and answer_result.expected_answer:
                             # Fix the wrong answer with the correct one
                             print(f"⚠️ Answer correction: '{q.answer}' → '{answer_result.expected_answer}' for: {q.question[:50]}...")
-                            q.answer = answer_result.expected_answer
-                            q.correct_answers = [answer_result.expected_answer]
-                            
-                            # Also fix in options (replace wrong answer with correct)
-                            if q.options:
-                                try:
-                                    wrong_idx = q.options.index(answer_result.provided_answer)
-                                    q.options[wrong_idx] = answer_result.expected_answer
-                                except ValueError:
-                                    # Wrong answer not in options, insert at first position
-                                    q.options[0] = answer_result.expected_answer
+                            self._apply_corrected_answer(q, answer_result.expected_answer)
                     except Exception as vp_err:
                         print(f"Answer verification skipped: {vp_err}")
                     
-                    unique_questions.append(q)
+                    unique_questions.append((tag, q))
             
             return unique_questions
             
@@ -692,10 +873,11 @@ Return a JSON array of {total_questions} questions in this EXACT format:
             raise Exception(f"Failed to generate question batch: {str(e)}")
 
     
-    def clear_session(self, session_id: str) -> None:
+    async def clear_session(self, session_id: str) -> None:
         """Clear question history for a session."""
+        await super().clear_session(session_id)
         if self._validator:
-            self.validator.clear_session(session_id)
+            await self.validator.clear_session(session_id)
 
 
 # Singleton instance for backward compatibility
@@ -4,10 +4,11 @@ Generates personalized, engaging lesson content.
 Refactored from lesson_generator.py to use Agentic Architecture.
 """
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 from dataclasses import dataclass, field
 
 from app.ai.agents.base import BaseAgent, AgentContext, AgentResult, AgentState
+from app.ai.core.rate_limiter import LLMPriority
 from app.ai.core.telemetry import get_tracer
 
 
@@ -133,13 +134,10 @@ Generate the lesson now. Output ONLY the JSON, no markdown formatting."""
                     system_prompt=self.SYSTEM_PROMPT,
                     context=params,
                     agent_name=self.name,
+                    priority=context.metadata.get("priority"),
                 )
                 
-                # Normalize response
-                if "sections" not in response:
-                    response["sections"] = []
-                if "fun_fact" not in response:
-                    response["fun_fact"] = None
+                response = self.normalize(response)
                 
                 lesson = LessonContent(
                     title=response.get("title", ""),
@@ -168,6 +166,20 @@ Generate the lesson now. Output ONLY the JSON, no markdown formatting."""
                     error=str(e),
                 )
     
+    @staticmethod
+    def normalize(response: Any) -> Dict[str, Any]:
+        """
+        Fill the optional lesson fields the LLM may leave out, so generated
+        and streamed lessons are stored in the same shape.
+        
+        Raises ValueError if the response is not a JSON object.
+        """
+        if not isinstance(response, dict):
+            raise ValueError("Lesson content is not a JSON object")
+        response.setdefault("sections", [])
+        response.setdefault("fun_fact", None)
+        return response
+    
     async def generate(
         self,
         subject: str,
@@ -175,9 +187,13 @@ Generate the lesson now. Output ONLY the JSON, no markdown formatting."""
         subtopic: str,
         grade: int = 1,
         style: str = "story",
+        priority: Optional[LLMPriority] = None,
     ) -> dict:
         """
         Convenience method matching the old API.
+        
+        priority overrides the agent's LLM dispatch priority (BATCH for
+        offline pre-generation).
         """
         result = await self.run(
             user_input=f"Generate a lesson about {subtopic}",
@@ -187,6 +203,7 @@ Generate the lesson now. Output ONLY the JSON, no markdown formatting."""
                 "subtopic": subtopic,
                 "grade": grade,
                 "style": style,
+                "priority": priority,
             }
         )
         
@@ -194,6 +211,52 @@ Generate the lesson now. Output ONLY the JSON, no markdown formatting."""
             return result.output
         else:
             raise Exception(result.error or "Failed to generate lesson")
+    
+    async def stream(
+        self,
+        subject: str,
+        topic: str,
+        subtopic: str,
+        grade: int = 1,
+        style: str = "story",
+    ) -> AsyncIterator[str]:
+        """
+        Stream the raw lesson JSON as it is generated.
+        
+        Runs the same input safety check and plan as generate(); output is
+        moderated incrementally by LLMClient.stream. Callers accumulate the
+        deltas, parse the result with parse_json_content() and pass it
+        through normalize().
+        """
+        if self.enable_safety and self.safety_pipeline:
+            safety_result = await self.safety_pipeline.validate_input(
+                text=f"Generate a lesson about {subtopic}",
+                grade=grade,
+            )
+            if safety_result.is_blocked:
+                raise Exception(safety_result.block_reason or "Failed to generate lesson")
+        
+        context = AgentContext(
+            session_id=await self._create_session(),
+            user_input=f"Generate a lesson about {subtopic}",
+            metadata={
+                "subject": subject,
+                "topic": topic,
+                "subtopic": subtopic,
+                "grade": grade,
+                "style": style,
+            },
+        )
+        plan = await self.plan(context)
+        
+        async for delta in self.llm.stream(
+            prompt="Generate the lesson now.",
+            system_prompt=self.SYSTEM_PROMPT,
+            context=plan["params"],
+            agent_name=self.name,
+            grade=grade,
+        ):
+            yield delta
 
 
 # Singleton instance for backward compatibility
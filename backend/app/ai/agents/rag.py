@@ -15,6 +15,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 
 from app.ai.agents.base import BaseAgent, AgentContext, AgentResult, AgentState
+from app.ai.core.embedding_cache import get_embedding_cache
 from app.ai.core.telemetry import get_tracer
 from app.core.config import settings
 
@@ -34,6 +35,7 @@ class RetrievedChunk:
     filename: str
     similarity: float
     chunk_index: int
+    keyword_match: bool = False  # Among the top full-text/BM25 hits
 
 
 @dataclass
@@ -134,20 +136,10 @@ CHUNKS:
 For each chunk, return a relevance score 0-1 and brief reason.
 Return as JSON: {{"scores": [{{"chunk_id": "...", "score": 0.8, "reason": "..."}}]}}"""
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self._embeddings_model = None
-    
     @property
     def embeddings_model(self):
-        """Lazy load embeddings model."""
-        if self._embeddings_model is None:
-            from langchain_openai import OpenAIEmbeddings
-            self._embeddings_model = OpenAIEmbeddings(
-                model="text-embedding-3-small",
-                openai_api_key=settings.OPENAI_API_KEY
-            )
-        return self._embeddings_model
+        """Embeddings model (shared with the embedding cache)."""
+        return get_embedding_cache().model
     
     async def plan(self, context: AgentContext) -> Dict[str, Any]:
         """
@@ -219,14 +211,11 @@ Return as JSON: {{"scores": [{{"chunk_id": "...", "score": 0.8, "reason": "..."}
             span.set_attribute("rag.document_id", str(params.get("document_id", "all")))
             
             try:
-                # Step 1: Generate query embedding
-                span.add_event("generating_query_embedding")
-                query_embedding = await self.embeddings_model.aembed_query(params["query"])
-                
-                # Step 2: Retrieve relevant chunks
+                # Step 1-2: Embed the query and retrieve relevant chunks
+                # (both skipped on a retrieval cache hit)
                 span.add_event("retrieving_chunks")
                 chunks = await self._retrieve_chunks(
-                    query_embedding=query_embedding,
+                    query=params["query"],
                     user_id=params["user_id"],
                     document_id=params.get("document_id"),
                     top_k=params["top_k"],
@@ -247,8 +236,13 @@ Return as JSON: {{"scores": [{{"chunk_id": "...", "score": 0.8, "reason": "..."}
                 
                 span.set_attribute("rag.chunks_retrieved", len(chunks))
                 
-                # Step 3: Filter by relevance threshold
-                relevant_chunks = [c for c in chunks if c.similarity >= self.RELEVANCE_THRESHOLD]
+                # Step 3: Filter by relevance threshold (the strongest
+                # keyword matches, see RAG_KEYWORD_MATCH_TOP_N, are kept even
+                # when their embedding score is low)
+                relevant_chunks = [
+                    c for c in chunks
+                    if c.similarity >= self.RELEVANCE_THRESHOLD or c.keyword_match
+                ]
                 
                 if not relevant_chunks:
                     # Use top chunks anyway if nothing passes threshold
@@ -290,19 +284,26 @@ Return as JSON: {{"scores": [{{"chunk_id": "...", "score": 0.8, "reason": "..."}
     
     async def _retrieve_chunks(
         self,
-        query_embedding: List[float],
+        query: str,
         user_id: str,
         document_id: Optional[str],
         top_k: int,
     ) -> List[RetrievedChunk]:
-        """Retrieve relevant chunks from database."""
+        """
+        Retrieve relevant chunks from database.
+        
+        Hybrid: keyword and vector candidates are fused (reciprocal rank)
+        in the same query, so short factual questions still reach chunks
+        containing the exact term. Repeated questions are served from the
+        retrieval cache.
+        """
         from app.core.database import async_session_maker
         from app.services.document import DocumentService
         
         async with async_session_maker() as db:
             service = DocumentService(db)
-            results = await service.search_chunks(
-                query_embedding=query_embedding,
+            results = await service.retrieve(
+                query=query,
                 user_id=user_id,
                 document_id=document_id,
                 limit=top_k,
@@ -316,6 +317,7 @@ Return as JSON: {{"scores": [{{"chunk_id": "...", "score": 0.8, "reason": "..."}
                 filename=r["filename"],
                 similarity=r["similarity"],
                 chunk_index=r.get("chunk_index", 0),
+                keyword_match=r.get("keyword_match", False),
             )
             for r in results
         ]
@@ -383,6 +385,7 @@ Return as JSON: {{"scores": [{{"chunk_id": "...", "score": 0.8, "reason": "..."}
                 num_questions=num_questions,
             ),
             agent_name=self.name,
+            use_cache=False,  # Every call must produce fresh questions
         )
         
         # Parse questions from response
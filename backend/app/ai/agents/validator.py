@@ -3,17 +3,20 @@ AI Tutor Platform - Validator Agent
 Quality gate for generated questions - ensures uniqueness, variety, 
 grade-appropriateness, and ANSWER CORRECTNESS.
 """
+import asyncio
 import re
 import hashlib
-from typing import Dict, Any, List, Optional, Set, Tuple
+from typing import Dict, Any, List, Optional, Sequence, Set, Tuple
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import OrderedDict
 from difflib import SequenceMatcher
 
 from app.ai.agents.base import BaseAgent, AgentContext, AgentResult, AgentState
 from app.ai.core.telemetry import get_tracer
 from app.ai.core.memory import AgentMemory
-from app.ai.core.similarity import similarity_service
+from app.ai.core.minhash import LSHIndex
+from app.ai.core.similarity import EmbeddingMatrix, similarity_service
+from app.ai.core.validator_state import get_validator_state
 
 
 @dataclass
@@ -128,56 +131,35 @@ class ConceptExtractor:
 
 class ConceptTracker:
     """
-    Tracks used concepts per session to prevent repetition.
-    """
+    Decides concept repetition from a session's used concepts.
     
-    def __init__(self, max_history: int = 15):
-        self.max_history = max_history
-        # {session_id: {concept_type: [used_values]}}
-        self._used_concepts: Dict[str, Dict[str, List[Any]]] = defaultdict(
-            lambda: defaultdict(list)
-        )
+    The used concepts themselves live in the shared ValidatorStateStore,
+    so every worker sees the same session.
+    """
     
-    def record(self, session_id: str, concepts: ExtractedConcepts) -> None:
-        """Record concepts from a used question."""
-        session = self._used_concepts[session_id]
-        
-        for word in concepts.words:
-            if word not in session["words"]:
-                session["words"].append(word)
-        
-        for num in concepts.numbers:
-            if num not in session["numbers"]:
-                session["numbers"].append(num)
-        
-        for pos in concepts.positions:
-            if pos not in session["positions"]:
-                session["positions"].append(pos)
-        
-        if concepts.question_format and concepts.question_format not in session["formats"]:
-            session["formats"].append(concepts.question_format)
-        
-        if concepts.subject_type and concepts.subject_type not in session["types"]:
-            session["types"].append(concepts.subject_type)
-        
-        # Trim to max history
-        for key in session:
-            if len(session[key]) > self.max_history:
-                session[key] = session[key][-self.max_history:]
+    @staticmethod
+    def to_record(concepts: ExtractedConcepts) -> Dict[str, List[Any]]:
+        """Concept values to record for a used question, by concept type."""
+        return {
+            "words": list(concepts.words),
+            "numbers": list(concepts.numbers),
+            "positions": list(concepts.positions),
+            "formats": [concepts.question_format] if concepts.question_format else [],
+            "types": [concepts.subject_type] if concepts.subject_type else [],
+        }
     
-    def get_exclusions(self, session_id: str, subject: str = "") -> Dict[str, List[Any]]:
+    def get_exclusions(self, used: Dict[str, List[Any]], subject: str = "") -> Dict[str, List[Any]]:
         """Get concepts that should be excluded from the next question."""
-        session = self._used_concepts.get(session_id, {})
         return {
-            "words": list(session.get("words", [])),
-            "numbers": list(session.get("numbers", []))[-10:],  # Last 10 numbers
-            "positions": list(session.get("positions", []))[-5:],  # Last 5 positions
-            "formats": list(session.get("formats", []))[-3:],  # Encourage format variety
+            "words": list(used.get("words", [])),
+            "numbers": list(used.get("numbers", []))[-10:],  # Last 10 numbers
+            "positions": list(used.get("positions", []))[-5:],  # Last 5 positions
+            "formats": list(used.get("formats", []))[-3:],  # Encourage format variety
         }
     
     def has_concept_overlap(
         self, 
-        session_id: str, 
+        used: Dict[str, List[Any]],
         concepts: ExtractedConcepts,
         threshold: int = 2
     ) -> Tuple[bool, str]:
@@ -185,7 +167,7 @@ class ConceptTracker:
         Check if concepts overlap too much with recently used ones.
         Returns (has_overlap, reason)
         """
-        exclusions = self.get_exclusions(session_id)
+        exclusions = self.get_exclusions(used)
         overlaps = []
         
         # Check word overlap
@@ -207,11 +189,6 @@ class ConceptTracker:
             return True, f"Overlapping concepts: {', '.join(overlaps[:3])}"
         
         return False, ""
-    
-    def clear_session(self, session_id: str) -> None:
-        """Clear all tracked concepts for a session."""
-        if session_id in self._used_concepts:
-            del self._used_concepts[session_id]
 
 
 # Global instances
@@ -272,14 +249,20 @@ class ValidatorAgent(BaseAgent):
     }
     
     SIMILARITY_THRESHOLD = 0.65
+    NEAR_DUPLICATE_JACCARD = 0.8  # MinHash estimate; rejected without an embedding call
+    EMBEDDING_ESCALATION_JACCARD = 0.2  # Below this, pairs are too different to embed
     MAX_HISTORY = 10
+    SESSION_CACHE_SIZE = 1024  # Sessions with cached signatures/embeddings per process
     PATTERN_USAGE_LIMIT = 2
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self._question_history: Dict[str, List[str]] = defaultdict(list)
-        self._pattern_usage: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
-        self._question_embeddings: Dict[str, List[float]] = {}  # Cache of question hash -> embedding
+        # History, concepts and pattern counters are shared across workers
+        self._state = get_validator_state()
+        # Per-process caches rebuilt from the shared history, LRU-bounded:
+        # normalized embeddings and MinHash signatures keyed by question hash
+        self._session_matrices: "OrderedDict[str, EmbeddingMatrix]" = OrderedDict()
+        self._session_lsh: "OrderedDict[str, LSHIndex]" = OrderedDict()
     
     # =========================================================================
     # ANSWER VERIFICATION METHODS
@@ -569,32 +552,14 @@ class ValidatorAgent(BaseAgent):
         normalized = self._normalize_question(question)
         return hashlib.md5(normalized.encode()).hexdigest()[:16]
     
-    async def _get_embedding(self, text: str, text_hash: str) -> Optional[List[float]]:
-        """Get embedding from cache or service."""
-        if text_hash in self._question_embeddings:
-            return self._question_embeddings[text_hash]
-        
-        try:
-            vector = await similarity_service.get_embedding(text)
-            if vector:
-                self._question_embeddings[text_hash] = vector
-            return vector
-        except Exception:
-            return None
-
     async def _calculate_similarity(self, q1: str, q2: str) -> float:
         """Calculate similarity using embeddings (async)."""
         # Fallback to string matching for very short texts
         if len(q1) < 10 or len(q2) < 10:
             return SequenceMatcher(None, q1, q2).ratio()
 
-        # Get hashes
-        h1 = self._get_question_hash(q1)
-        h2 = self._get_question_hash(q2)
-        
-        # Get embeddings
-        vec1 = await self._get_embedding(q1, h1)
-        vec2 = await self._get_embedding(q2, h2)
+        # Get both embeddings in one batch
+        vec1, vec2 = await similarity_service.get_embeddings([q1, q2])
         
         if vec1 and vec2:
             return similarity_service.calculate_similarity(vec1, vec2)
@@ -602,6 +567,58 @@ class ValidatorAgent(BaseAgent):
         # Fallback to SequenceMatcher if embeddings fail
         return SequenceMatcher(None, q1, q2).ratio()
     
+    async def _embedding_similarities(
+        self,
+        session_id: str,
+        question: str,
+        candidates: List[str],
+    ) -> Dict[str, float]:
+        """
+        Embedding similarity of a question against some recent questions,
+        in one batched fetch and one matrix call. Keyed by question hash;
+        questions without an embedding are absent.
+        """
+        wanted = {self._get_question_hash(q): q for q in candidates if len(q) >= 10}
+        if len(question) < 10 or not wanted:
+            return {}
+        matrix = self._cached(self._session_matrices, session_id)
+        if matrix is None:
+            matrix = EmbeddingMatrix(max_rows=self.MAX_HISTORY)
+            self._cache(self._session_matrices, session_id, matrix)
+        known = set(matrix.keys)
+        missing = [(h, q) for h, q in wanted.items() if h not in known]
+        
+        vectors = await similarity_service.get_embeddings([question] + [q for _, q in missing])
+        if not vectors[0]:
+            return {}
+        for (h, _), vector in zip(missing, vectors[1:]):
+            if vector:
+                matrix.add(h, vector)
+        scores = dict(zip(matrix.keys, matrix.similarities(vectors[0]).tolist()))
+        return {h: scores[h] for h in wanted if h in scores}
+    
+    def _cached(self, cache: "OrderedDict[str, Any]", session_id: str) -> Any:
+        value = cache.get(session_id)
+        if value is not None:
+            cache.move_to_end(session_id)
+        return value
+    
+    def _cache(self, cache: "OrderedDict[str, Any]", session_id: str, value: Any) -> None:
+        cache[session_id] = value
+        cache.move_to_end(session_id)
+        while len(cache) > self.SESSION_CACHE_SIZE:
+            cache.popitem(last=False)
+    
+    def _session_index(self, session_id: str, history: List[str]) -> LSHIndex:
+        """MinHash index over the session history (rebuilt if another worker added to it)."""
+        lsh = self._cached(self._session_lsh, session_id)
+        if lsh is None or any(self._get_question_hash(q) not in lsh for q in history):
+            lsh = LSHIndex(max_size=self.MAX_HISTORY)
+            for q in history:
+                lsh.add(self._get_question_hash(q), q)
+            self._cache(self._session_lsh, session_id, lsh)
+        return lsh
+    
     def _extract_numbers(self, question: str) -> Set[int]:
         """Extract numbers from a question."""
         numbers = re.findall(r'\b\d+\b', question)
@@ -641,10 +658,18 @@ class ValidatorAgent(BaseAgent):
         
         return False
     
+    def _matched_patterns(self, question: str) -> List[str]:
+        """Usage-counter keys of the overused patterns a question matches."""
+        question_lower = question.lower()
+        return [
+            pattern[:20] for pattern in self.OVERUSED_PATTERNS
+            if re.search(pattern, question_lower)
+        ]
+    
     def _detect_overused_patterns(
         self, 
         question: str, 
-        session_id: str
+        pattern_usage: Dict[str, int]
     ) -> Tuple[bool, List[str]]:
         """Detect if question uses overused patterns."""
         overused = []
@@ -653,7 +678,7 @@ class ValidatorAgent(BaseAgent):
         for pattern in self.OVERUSED_PATTERNS:
             if re.search(pattern, question_lower):
                 pattern_key = pattern[:20]
-                current_count = self._pattern_usage[session_id][pattern_key]
+                current_count = pattern_usage.get(pattern_key, 0)
                 if current_count >= self.PATTERN_USAGE_LIMIT:
                     match = re.search(pattern, question_lower)
                     if match:
@@ -717,6 +742,8 @@ class ValidatorAgent(BaseAgent):
                 "check_patterns": metadata.get("check_patterns", True),
                 "check_grade": metadata.get("check_grade", True),
                 "check_answer": metadata.get("check_answer", True),  # NEW
+                "check_concepts": metadata.get("check_concepts", True),
+                "options": metadata.get("options"),
             }
         }
     
@@ -749,7 +776,10 @@ class ValidatorAgent(BaseAgent):
             span.set_attribute("validator.session_id", session_id)
             span.set_attribute("validator.grade", grade)
             
-            recent_questions = self._question_history.get(session_id, [])
+            # One round trip for history, concepts and pattern counters
+            # (batch validation passes a snapshot shared by all questions)
+            state = params.get("state") or await self._state.load(session_id)
+            recent_questions = state.history
             
             # 1. Check for exact duplicates
             question_hash = self._get_question_hash(question)
@@ -769,8 +799,41 @@ class ValidatorAgent(BaseAgent):
             
             # 2. Check similarity
             if params["check_similarity"]:
+                # 2a. MinHash near-duplicates: sub-millisecond, no embedding call
+                jaccards = self._session_index(session_id, recent_questions).jaccard_all(question)
                 for prev_q in recent_questions:
-                    similarity = await self._calculate_similarity(question, prev_q)
+                    jaccard = jaccards.get(self._get_question_hash(prev_q), 0.0)
+                    if jaccard >= self.NEAR_DUPLICATE_JACCARD:
+                        span.set_attribute("validator.rejected", "near_duplicate")
+                        return AgentResult(
+                            success=True,
+                            output=ValidationResult(
+                                is_valid=False,
+                                reason=f"Near-duplicate of a recent question ({jaccard:.0%} overlap)",
+                                similarity_score=jaccard,
+                                matched_question=prev_q,
+                            ),
+                            state=AgentState.COMPLETED,
+                        )
+                
+                # 2b. Escalate only borderline pairs to embeddings (questions
+                # not in the index yet count as borderline)
+                borderline = [
+                    q for q in recent_questions
+                    if jaccards.get(self._get_question_hash(q), 1.0) >= self.EMBEDDING_ESCALATION_JACCARD
+                ]
+                span.set_attribute("validator.embedding_candidates", len(borderline))
+                scores = await self._embedding_similarities(session_id, question, borderline)
+                borderline_hashes = {self._get_question_hash(q) for q in borderline}
+                
+                for prev_q in recent_questions:
+                    prev_hash = self._get_question_hash(prev_q)
+                    if prev_hash not in borderline_hashes:
+                        similarity = 0.0
+                    elif prev_hash in scores:
+                        similarity = scores[prev_hash]
+                    else:
+                        similarity = await self._calculate_similarity(question, prev_q)
                     
                     if self._is_math_equivalent(question, prev_q):
                         span.set_attribute("validator.rejected", "math_equivalent")
@@ -803,7 +866,7 @@ class ValidatorAgent(BaseAgent):
             if params.get("check_concepts", True):
                 concepts = concept_extractor.extract(question, params.get("subject", ""))
                 has_overlap, overlap_reason = concept_tracker.has_concept_overlap(
-                    session_id, concepts, threshold=1  # Strict: any key concept overlap
+                    state.concepts, concepts, threshold=1  # Strict: any key concept overlap
                 )
                 if has_overlap:
                     span.set_attribute("validator.rejected", "concept_overlap")
@@ -820,7 +883,7 @@ class ValidatorAgent(BaseAgent):
             # 3. Check overused patterns
             if params["check_patterns"]:
                 is_overused, overused_patterns = self._detect_overused_patterns(
-                    question, session_id
+                    question, state.pattern_usage
                 )
                 if is_overused:
                     span.set_attribute("validator.rejected", "overused_pattern")
@@ -895,44 +958,39 @@ class ValidatorAgent(BaseAgent):
     
     async def record_question(self, session_id: str, question: str) -> None:
         """Record a question that was shown to the student."""
-        self._question_history[session_id].append(question)
-        if len(self._question_history[session_id]) > self.MAX_HISTORY:
-            self._question_history[session_id] = self._question_history[session_id][-self.MAX_HISTORY:]
-        
-        # Track concepts
         concepts = concept_extractor.extract(question)
-        concept_tracker.record(session_id, concepts)
-
-        # Pre-fetch embedding
-        question_hash = self._get_question_hash(question)
-        await self._get_embedding(question, question_hash)
+        await self._state.record(
+            session_id,
+            question,
+            concepts=concept_tracker.to_record(concepts),
+            patterns=self._matched_patterns(question),
+        )
         
-        question_lower = question.lower()
-        for pattern in self.OVERUSED_PATTERNS:
-            if re.search(pattern, question_lower):
-                pattern_key = pattern[:20]
-                self._pattern_usage[session_id][pattern_key] += 1
+        # Index for near-duplicate checks; embeddings are fetched lazily,
+        # only when a later candidate is borderline
+        lsh = self._cached(self._session_lsh, session_id)
+        if lsh is not None:
+            lsh.add(self._get_question_hash(question), question)
     
-    def clear_session(self, session_id: str) -> None:
-        """Clear history for a session."""
-        if session_id in self._question_history:
-            del self._question_history[session_id]
-        if session_id in self._pattern_usage:
-            del self._pattern_usage[session_id]
-        
-        # Clear concept tracking
-        concept_tracker.clear_session(session_id)
+    async def clear_session(self, session_id: str) -> None:
+        """Clear history, concepts and pattern counters for a session."""
+        await super().clear_session(session_id)
+        await self._state.clear(session_id)
+        self._session_matrices.pop(session_id, None)
+        self._session_lsh.pop(session_id, None)
     
-    def get_exclusions(self, session_id: str) -> Dict[str, Any]:
+    async def get_exclusions(self, session_id: str) -> Dict[str, Any]:
         """Get concepts to exclude for the next question."""
-        return concept_tracker.get_exclusions(session_id)
+        state = await self._state.load(session_id)
+        return concept_tracker.get_exclusions(state.concepts)
     
-    def get_session_stats(self, session_id: str) -> Dict[str, Any]:
+    async def get_session_stats(self, session_id: str) -> Dict[str, Any]:
         """Get statistics for a session."""
+        state = await self._state.load(session_id)
         return {
-            "questions_recorded": len(self._question_history.get(session_id, [])),
-            "pattern_usage": dict(self._pattern_usage.get(session_id, {})),
-            "exclusions": self.get_exclusions(session_id),
+            "questions_recorded": len(state.history),
+            "pattern_usage": dict(state.pattern_usage),
+            "exclusions": concept_tracker.get_exclusions(state.concepts),
         }
     
     def validate_batch(
@@ -946,7 +1004,7 @@ class ValidatorAgent(BaseAgent):
         This is a lightweight check for batch-generated questions.
         It checks for:
         1. Exact duplicates within the batch
-        2. High similarity within the batch (using simple text matching)
+        2. Near-duplicates within the batch (MinHash estimate, no embeddings)
         
         Args:
             questions: List of question strings
@@ -957,22 +1015,19 @@ class ValidatorAgent(BaseAgent):
         """
         results = []
         seen_hashes = set()
-        seen_normalized = set()
+        seen = LSHIndex()
         
         for idx, question in enumerate(questions):
             # Hash check
             q_hash = hashlib.md5(question.encode()).hexdigest()
             
-            # Normalize for similarity
-            q_normalized = question.lower().strip().replace(" ", "").replace("?", "")
-            
             if q_hash in seen_hashes:
                 results.append((idx, False, "Exact duplicate within batch"))
-            elif q_normalized in seen_normalized:
+            elif seen.query(question, self.NEAR_DUPLICATE_JACCARD):
                 results.append((idx, False, "Very similar to another question in batch"))
             else:
                 seen_hashes.add(q_hash)
-                seen_normalized.add(q_normalized)
+                seen.add(idx, question)
                 results.append((idx, True, "Valid"))
         
         return results
@@ -1116,6 +1171,96 @@ class ValidatorAgent(BaseAgent):
                 reason=f"Validation error: {result.error}",
             )
     
+    async def validate_many(
+        self,
+        questions: Sequence[Any],
+        session_id: str,
+        grade: int = 1,
+        subject: str = "",
+        check_concepts: bool = False,
+    ) -> List[ValidationResult]:
+        """
+        Fully validate many generated questions concurrently.
+        
+        All questions are checked against one snapshot of the session
+        state and against each other (MinHash). Embeddings for every
+        borderline pair are fetched in a single batch up front. Nothing is
+        recorded; callers record the questions they keep.
+        
+        Args:
+            questions: Objects with question, answer and options attributes
+                (e.g. GeneratedQuestion).
+            session_id: Session whose history the questions must not repeat.
+            grade: Student grade level.
+            subject: Subject (enables subject-specific answer checks).
+            check_concepts: Apply the strict concept-overlap rule.
+        
+        Returns:
+            One ValidationResult per question, in order.
+        """
+        if not questions:
+            return []
+        
+        state = await self._state.load(session_id)
+        texts = [q.question for q in questions]
+        in_batch = self.validate_batch(texts, session_id)
+        await self._prefetch_embeddings(session_id, state.history, texts)
+        
+        async def validate_one(q: Any) -> ValidationResult:
+            context = AgentContext(session_id=session_id, user_input=f"Validate question: {q.question[:50]}...")
+            plan = {
+                "action": "validate_question",
+                "params": {
+                    "question": q.question,
+                    "answer": q.answer,
+                    "options": q.options,
+                    "session_id": session_id,
+                    "grade": grade,
+                    "subject": subject,
+                    "state": state,
+                    "check_similarity": True,
+                    "check_patterns": True,
+                    "check_grade": True,
+                    "check_answer": q.answer is not None,
+                    "check_concepts": check_concepts,
+                },
+            }
+            result = await self.execute(context, plan)
+            return result.output
+        
+        outcomes = await asyncio.gather(*(validate_one(q) for q in questions), return_exceptions=True)
+        
+        results = []
+        for (_, batch_ok, batch_reason), outcome in zip(in_batch, outcomes):
+            if not batch_ok:
+                results.append(ValidationResult(is_valid=False, reason=batch_reason))
+            elif isinstance(outcome, Exception):
+                results.append(ValidationResult(is_valid=True, reason=f"Validation error: {outcome}"))
+            else:
+                results.append(outcome)
+        return results
+    
+    async def _prefetch_embeddings(self, session_id: str, history: List[str], texts: List[str]) -> None:
+        """Warm the embedding cache for every borderline (candidate, recent) pair in one call."""
+        lsh = self._session_index(session_id, history)
+        needed: Dict[str, None] = {}
+        for text in texts:
+            if len(text) < 10:
+                continue
+            jaccards = lsh.jaccard_all(text)
+            borderline = [
+                q for q in history
+                if len(q) >= 10
+                and self.EMBEDDING_ESCALATION_JACCARD
+                <= jaccards.get(self._get_question_hash(q), 1.0)
+                < self.NEAR_DUPLICATE_JACCARD
+            ]
+            if borderline:
+                needed[text] = None
+                needed.update(dict.fromkeys(borderline))
+        if needed:
+            await similarity_service.get_embeddings(list(needed))
+    
     async def validate_answer_only(
         self,
         question: str,
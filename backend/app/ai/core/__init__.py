@@ -2,6 +2,13 @@
 # Phase 3A: Safety Infrastructure
 
 from app.ai.core.llm import LLMClient, LLMResponse, get_llm_client
+from app.ai.core.response_cache import ResponseCache, get_response_cache
+from app.ai.core.single_flight import SingleFlight, get_single_flight
+from app.ai.core.rate_limiter import LLMPriority, LLMRateLimiter, get_rate_limiter
+from app.ai.core.embeddings import create_embeddings_model
+from app.ai.core.embedding_cache import EmbeddingCache, get_embedding_cache
+from app.ai.core.fake_provider import FakeChatModel, FakeEmbeddings
+from app.ai.core.local_embeddings import HashingEmbeddings
 from app.ai.core.memory import AgentMemory
 from app.ai.core.telemetry import get_tracer, agent_span
 from app.ai.core.guardrails import (
@@ -29,6 +36,11 @@ from app.ai.core.observability import init_observability, get_observer
 __all__ = [
     # LLM
     "LLMClient", "LLMResponse", "get_llm_client",
+    "ResponseCache", "get_response_cache",
+    "SingleFlight", "get_single_flight",
+    "LLMPriority", "LLMRateLimiter", "get_rate_limiter",
+    "create_embeddings_model", "EmbeddingCache", "get_embedding_cache",
+    "FakeChatModel", "FakeEmbeddings", "HashingEmbeddings",
     # Memory
     "AgentMemory",
     # Telemetry
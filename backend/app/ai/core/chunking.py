@@ -0,0 +1,304 @@
+"""
+AI Tutor Platform - Document Chunking
+Sentence-aware, overlapping chunks for RAG, fed page by page.
+
+- SentenceChunker ("compatible"): counts tokens per sentence (and per
+  word of over-long sentences) once and reuses the counts for overlap
+  instead of re-encoding. Chunk boundaries match the original chunker
+  exactly.
+- TokenChunker ("token", default): encodes each page once, maps sentence
+  boundaries to token offsets and takes every count from that single
+  encoding. Over-long sentences are cut into token windows at word starts.
+
+`python -m benchmarks.chunking` compares both against the original.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Sentence boundaries for chunking
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Bytes that start a new word in a token window
+_WHITESPACE = frozenset(b" \t\n\r\f\v")
+
+# (text, page, token count) of one piece of the chunk being built
+_Part = Tuple[str, Optional[int], int]
+
+
+@dataclass
+class ChunkResult:
+    """Result of chunking a document."""
+    chunks: List[str]
+    token_counts: List[int]
+    total_tokens: int
+    metadata: List[Dict[str, Any]]
+
+
+class SentenceChunker:
+    """
+    Incremental sentence-aware chunking.
+
+    Text is fed page by page as it is extracted; chunks never break
+    mid-sentence (unless one sentence exceeds the chunk size) and carry
+    the page range they were taken from.
+    """
+
+    # Trim overlap so overlap + next sentence fits in chunk_size (the
+    # original chunker let such chunks run over by up to `overlap` tokens)
+    fit_overlap = False
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int],
+        chunk_size: int,
+        overlap: int,
+        count_batch: Optional[Callable[[Sequence[str]], List[int]]] = None,
+    ):
+        """
+        Args:
+            count_tokens: Token count of one string.
+            chunk_size: Maximum tokens per chunk.
+            overlap: Tokens of trailing sentences repeated in the next chunk.
+            count_batch: Token counts of many strings in one call (optional).
+        """
+        self.count_tokens = count_tokens
+        self.count_batch = count_batch or (lambda texts: [count_tokens(t) for t in texts])
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+
+        self.chunks: List[str] = []
+        self.token_counts: List[int] = []
+        self.metadata: List[Dict[str, Any]] = []
+
+        # Pieces of the chunk being built
+        self._current: List[_Part] = []
+        self._current_tokens = 0
+
+    def feed(self, text: str, page: Optional[int] = None) -> None:
+        """Add the next piece of cleaned text (one page, or a whole document)."""
+        sentences = _SENTENCE_RE.split(text)
+        for sentence, tokens in zip(sentences, self.count_batch(sentences)):
+            if tokens > self.chunk_size:
+                self._add_long_sentence(self._split_words(sentence, page))
+            else:
+                self._add_sentence((sentence, page, tokens))
+
+    def finish(self) -> ChunkResult:
+        """Flush the last chunk and return all chunks."""
+        if self._current:
+            self._emit(self._current, self._current_tokens)
+            self._current = []
+            self._current_tokens = 0
+        return ChunkResult(
+            chunks=self.chunks,
+            token_counts=self.token_counts,
+            total_tokens=sum(self.token_counts),
+            metadata=self.metadata,
+        )
+
+    def _emit(self, parts: List[_Part], tokens: int) -> None:
+        metadata: Dict[str, Any] = {"chunk_index": len(self.chunks)}
+        pages = [page for _, page, _ in parts if page is not None]
+        if pages:
+            metadata["page_start"] = min(pages)
+            metadata["page_end"] = max(pages)
+        self.chunks.append(' '.join(text for text, _, _ in parts))
+        self.token_counts.append(tokens)
+        self.metadata.append(metadata)
+
+    def _split_words(self, sentence: str, page: Optional[int]) -> List[List[_Part]]:
+        """Pieces of an over-long sentence, split between words."""
+        words = sentence.split()
+        pieces: List[List[_Part]] = []
+        piece: List[_Part] = []
+        piece_tokens = 0
+
+        for word, word_tokens in zip(words, self.count_batch(words)):
+            if piece_tokens + word_tokens > self.chunk_size:
+                if piece:
+                    pieces.append(piece)
+                piece = [(word, page, word_tokens)]
+                piece_tokens = word_tokens
+            else:
+                piece.append((word, page, word_tokens))
+                piece_tokens += word_tokens
+
+        if piece:
+            pieces.append(piece)
+        return pieces
+
+    def _add_long_sentence(self, pieces: List[List[_Part]]) -> None:
+        # Save current chunk if any
+        if self._current:
+            self._emit(self._current, self._current_tokens)
+
+        # Every piece but the last is a chunk of its own; the last one
+        # starts the next chunk (and is what its overlap comes from)
+        for piece in pieces[:-1]:
+            self._emit(piece, sum(tokens for _, _, tokens in piece))
+        self._current = list(pieces[-1]) if pieces else []
+        self._current_tokens = sum(tokens for _, _, tokens in self._current)
+
+    def _add_sentence(self, part: _Part) -> None:
+        tokens = part[2]
+        if self._current_tokens + tokens > self.chunk_size:
+            # Save current chunk
+            self._emit(self._current, self._current_tokens)
+
+            # Start new chunk with overlap
+            overlap_parts: List[_Part] = []
+            overlap_tokens = 0
+            budget = min(self.overlap, self.chunk_size - tokens) if self.fit_overlap else self.overlap
+
+            for previous in reversed(self._current):
+                if overlap_tokens + previous[2] <= budget:
+                    overlap_parts.insert(0, previous)
+                    overlap_tokens += previous[2]
+                else:
+                    break
+
+            self._current = overlap_parts + [part]
+            self._current_tokens = overlap_tokens + tokens
+        else:
+            self._current.append(part)
+            self._current_tokens += tokens
+
+
+# Byte length of every token id, per tiktoken encoding name
+_token_lengths: Dict[str, np.ndarray] = {}
+
+
+def token_byte_lengths(tokenizer) -> np.ndarray:
+    """Byte length of each token id (built once per encoding)."""
+    lengths = _token_lengths.get(tokenizer.name)
+    if lengths is None:
+        lengths = np.zeros(tokenizer.max_token_value + 1, dtype=np.int64)
+        for token in range(len(lengths)):
+            try:
+                lengths[token] = len(tokenizer.decode_single_token_bytes(token))
+            except KeyError:
+                pass  # Unused id
+        _token_lengths[tokenizer.name] = lengths
+    return lengths
+
+
+class TokenChunker(SentenceChunker):
+    """
+    Single-pass chunking from one encoding per page.
+
+    Sentence token counts are differences of sentence start positions in
+    the page's token array, located from token byte lengths (whitespace
+    before a sentence belongs to it, as it does in the BPE tokens), so
+    they add up to the page's true token count. Counts can differ by a
+    token from encoding each sentence alone, so boundaries may shift
+    slightly versus SentenceChunker. Overlap is trimmed so no chunk
+    exceeds chunk_size.
+    """
+
+    fit_overlap = True
+
+    def __init__(self, tokenizer, chunk_size: int, overlap: int):
+        """
+        Args:
+            tokenizer: tiktoken Encoding.
+            chunk_size: Maximum tokens per chunk.
+            overlap: Tokens of trailing sentences repeated in the next chunk.
+        """
+        super().__init__(
+            lambda text: len(tokenizer.encode_ordinary(text)),
+            chunk_size,
+            overlap,
+        )
+        self.tokenizer = tokenizer
+
+    def feed(self, text: str, page: Optional[int] = None) -> None:
+        tokens = self.tokenizer.encode_ordinary(text)
+        if not tokens:
+            return
+        data = text.encode("utf-8")
+        # Byte offset where each token starts (offsets[-1] == len(data))
+        offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum(token_byte_lengths(self.tokenizer)[tokens], out=offsets[1:])
+
+        # Sentence character spans, and the byte offset where each sentence
+        # ends and the whitespace before the next one begins
+        spans = []
+        boundaries = []
+        start = 0
+        byte_end = 0
+        for match in _SENTENCE_RE.finditer(text):
+            byte_end += len(text[spans[-1][1] if spans else 0:match.start()].encode("utf-8"))
+            spans.append((start, match.start()))
+            boundaries.append(byte_end)
+            start = match.end()
+        spans.append((start, len(text)))
+
+        # A sentence starts at the first token at or after the previous
+        # one's end, so no sentence ends in a whitespace-only token
+        bounds = [0] + np.searchsorted(offsets, boundaries, side="left").tolist() + [len(tokens)]
+
+        for i, (char_start, char_end) in enumerate(spans):
+            if char_start == char_end:
+                continue
+            token_start, token_end = bounds[i], bounds[i + 1]
+            if token_end - token_start > self.chunk_size:
+                self._add_long_sentence(
+                    self._split_tokens(data, offsets, token_start, token_end, page)
+                )
+            else:
+                self._add_sentence((text[char_start:char_end], page, token_end - token_start))
+
+    def _split_tokens(
+        self,
+        data: bytes,
+        offsets: np.ndarray,
+        token_start: int,
+        token_end: int,
+        page: Optional[int],
+    ) -> List[List[_Part]]:
+        """Windows of at most chunk_size tokens, cut where a word starts."""
+        pieces: List[List[_Part]] = []
+        start = token_start
+        while start < token_end:
+            end = min(start + self.chunk_size, token_end)
+            if end < token_end:
+                cut = end
+                while cut > start + 1 and data[offsets[cut]] not in _WHITESPACE:
+                    cut -= 1
+                if cut > start + 1:
+                    end = cut
+            piece_text = data[int(offsets[start]):int(offsets[end])].decode("utf-8", errors="ignore").strip()
+            if piece_text:
+                pieces.append([(piece_text, page, end - start)])
+            start = end
+        return pieces
+
+
+def create_chunker(
+    tokenizer,
+    count_tokens: Callable[[str], int],
+    chunk_size: int,
+    overlap: int,
+    mode: str = "token",
+) -> SentenceChunker:
+    """
+    Chunker for DOCUMENT_CHUNKER `mode` ("token" or "compatible").
+
+    Without a tiktoken tokenizer only the compatible chunker applies.
+    """
+    if tokenizer is None:
+        return SentenceChunker(count_tokens, chunk_size, overlap)
+    if mode == "token":
+        return TokenChunker(tokenizer, chunk_size, overlap)
+    return SentenceChunker(
+        count_tokens,
+        chunk_size,
+        overlap,
+        # encode_ordinary skips encode()'s per-call special-token scan;
+        # encode_ordinary_batch spins up a thread pool per call (slower here)
+        count_batch=lambda texts: [len(tokenizer.encode_ordinary(t)) for t in texts],
+    )
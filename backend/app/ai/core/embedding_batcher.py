@@ -0,0 +1,205 @@
+"""
+AI Tutor Platform - Embedding Batcher
+Document chunk embeddings for ingestion: chunks are packed into
+token-bounded batches and a bounded number of provider requests run at
+once, all through one long-lived embeddings model (so one pooled HTTP
+client instead of a new one per document).
+
+A failed batch is retried on its own with backoff. If it still fails,
+only its chunks are left without vectors; the rest of the document keeps
+its embeddings.
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from app.ai.core.resilience import backoff_delay, is_retryable_error
+from app.ai.core.telemetry import get_tracer
+from app.core.config import settings
+
+
+@dataclass
+class EmbeddingBatch:
+    """Consecutive texts embedded in one provider request."""
+    start: int  # Index of the first text
+    texts: List[str]
+    tokens: int
+
+
+def pack_batches(
+    texts: Sequence[str],
+    token_counts: Sequence[int],
+    max_tokens: int,
+    max_texts: int,
+) -> List[EmbeddingBatch]:
+    """
+    Split texts, in order, into batches of at most max_tokens tokens and
+    max_texts texts (a single text over max_tokens gets a batch of its own).
+    """
+    batches: List[EmbeddingBatch] = []
+    batch: Optional[EmbeddingBatch] = None
+    for i, (text, tokens) in enumerate(zip(texts, token_counts)):
+        if batch is None or batch.tokens + tokens > max_tokens or len(batch.texts) >= max_texts:
+            batch = EmbeddingBatch(start=i, texts=[], tokens=0)
+            batches.append(batch)
+        batch.texts.append(text)
+        batch.tokens += tokens
+    return batches
+
+
+class EmbeddingBatcher:
+    """
+    Concurrent, size-aware embedding of many texts.
+
+    The concurrency limit is shared by every document this batcher embeds,
+    so parallel ingestion jobs cannot multiply provider load.
+    """
+
+    def __init__(
+        self,
+        provider: str = None,
+        max_tokens: int = None,
+        max_texts: int = None,
+        concurrency: int = None,
+        max_retries: int = None,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            provider: Embeddings provider (defaults to EMBEDDING_PROVIDER).
+            max_tokens: Tokens per provider request.
+            max_texts: Texts per provider request.
+            concurrency: Provider requests in flight at once.
+            max_retries: Retries of a failed batch.
+        """
+        self.provider = provider or settings.EMBEDDING_PROVIDER
+        self.max_tokens = max_tokens or settings.EMBEDDING_BATCH_MAX_TOKENS
+        self.max_texts = max_texts or settings.EMBEDDING_BATCH_MAX_TEXTS
+        self.concurrency = max(1, concurrency or settings.EMBEDDING_BATCH_CONCURRENCY)
+        self.max_retries = settings.EMBEDDING_BATCH_MAX_RETRIES if max_retries is None else max_retries
+
+        self._model = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+        self.batches = 0
+        self.failed_batches = 0
+        self.retries = 0
+        self._latencies: Deque[float] = deque(maxlen=500)  # Seconds per successful request
+
+    @property
+    def model(self):
+        """Embeddings model (lazy, reused for every batch; raises if unavailable)."""
+        if self._model is None:
+            from app.ai.core.embeddings import create_embeddings_model
+            self._model = create_embeddings_model(self.provider)
+        return self._model
+
+    async def embed(
+        self,
+        texts: Sequence[str],
+        token_counts: Optional[Sequence[int]] = None,
+    ) -> List[Optional[List[float]]]:
+        """
+        Embeddings for texts, in order; None for texts whose batch failed.
+
+        Args:
+            texts: Texts to embed.
+            token_counts: Token count of each text (estimated from length if omitted).
+        """
+        if token_counts is None or len(token_counts) != len(texts):
+            token_counts = [max(1, len(text) // 4) for text in texts]
+        model = self.model  # Provider setup errors surface here, not per batch
+        semaphore = self._get_semaphore()
+
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        batches = pack_batches(texts, token_counts, self.max_tokens, self.max_texts)
+        results = await asyncio.gather(*(self._embed_batch(model, batch, semaphore) for batch in batches))
+        for batch, batch_vectors in zip(batches, results):
+            if batch_vectors is not None:
+                vectors[batch.start:batch.start + len(batch.texts)] = batch_vectors
+        return vectors
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Request limit for the running loop (entry points like Celery run one loop per job)."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _embed_batch(
+        self,
+        model,
+        batch: EmbeddingBatch,
+        semaphore: asyncio.Semaphore,
+    ) -> Optional[List[List[float]]]:
+        """One batch, retried with backoff on transient errors; None if it fails."""
+        self.batches += 1
+        tracer = get_tracer()
+        for attempt in range(self.max_retries + 1):
+            with tracer.start_as_current_span("embedding_batch") as span:
+                span.set_attribute("embedding.batch.start", batch.start)
+                span.set_attribute("embedding.batch.texts", len(batch.texts))
+                span.set_attribute("embedding.batch.tokens", batch.tokens)
+                span.set_attribute("embedding.batch.attempt", attempt)
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        vectors = await model.aembed_documents(batch.texts)
+                        if len(vectors) != len(batch.texts):
+                            raise ValueError(f"expected {len(batch.texts)} embeddings, got {len(vectors)}")
+                    except Exception as e:
+                        error = e
+                        span.record_exception(e)
+                    else:
+                        latency = time.perf_counter() - started
+                        self._latencies.append(latency)
+                        span.set_attribute("embedding.batch.latency_ms", round(latency * 1000, 1))
+                        return vectors
+
+            if attempt == self.max_retries or not is_retryable_error(error):
+                break
+            self.retries += 1
+            await asyncio.sleep(backoff_delay(attempt, error))
+
+        self.failed_batches += 1
+        print(
+            f"[EmbeddingBatcher] Batch of {len(batch.texts)} texts at {batch.start} failed "
+            f"after {attempt + 1} attempt(s): {error}"
+        )
+        return None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Batch counters and request latency percentiles for telemetry."""
+        latencies = sorted(self._latencies)
+
+        def percentile_ms(pct: float) -> float:
+            if not latencies:
+                return 0.0
+            index = min(len(latencies) - 1, int(round(pct / 100 * (len(latencies) - 1))))
+            return round(latencies[index] * 1000, 1)
+
+        return {
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "retries": self.retries,
+            "latency_p50_ms": percentile_ms(50),
+            "latency_p95_ms": percentile_ms(95),
+        }
+
+
+# One batcher per provider, shared by all ingestion jobs
+_embedding_batchers: Dict[str, EmbeddingBatcher] = {}
+
+
+def get_embedding_batcher(provider: Optional[str] = None) -> EmbeddingBatcher:
+    """Get the shared embedding batcher for a provider (default EMBEDDING_PROVIDER)."""
+    provider = provider or settings.EMBEDDING_PROVIDER
+    if provider not in _embedding_batchers:
+        _embedding_batchers[provider] = EmbeddingBatcher(provider=provider)
+    return _embedding_batchers[provider]
@@ -0,0 +1,218 @@
+"""
+AI Tutor Platform - Embedding Cache
+Content-addressed cache for text embeddings with an in-process LRU tier
+and an optional Redis tier shared across workers. Cache misses are
+embedded together in one batched provider call.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.ai.core.embeddings import embedding_model_name
+from app.core.config import settings
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache for embeddings.
+
+    Keys are a SHA-256 over provider, model, dimensions and text, so a
+    provider or model change never serves stale vectors. Each provider
+    has its own cache instance (see get_embedding_cache).
+
+    Tiers:
+    - Local: bounded LRU of float32 arrays with per-entry expiry (always on)
+    - Redis: optional, raw float16/float32 bytes shared across workers
+    """
+
+    KEY_PREFIX = "emb:cache:"
+
+    def __init__(
+        self,
+        provider: str = None,
+        max_entries: int = None,
+        ttl: int = None,
+        use_redis: bool = None,
+        redis_dtype: str = None,
+    ):
+        """
+        Initialize the embedding cache.
+
+        Args:
+            provider: Embeddings provider (defaults to EMBEDDING_PROVIDER).
+            max_entries: Maximum entries in the local LRU tier.
+            ttl: Entry lifetime in seconds (both tiers).
+            use_redis: Whether to use the Redis tier.
+            redis_dtype: "float16" (half the memory) or "float32".
+        """
+        self.provider = provider or settings.EMBEDDING_PROVIDER
+        self.max_entries = max_entries or settings.EMBEDDING_CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else settings.EMBEDDING_CACHE_TTL_SECONDS
+        self.use_redis = settings.EMBEDDING_CACHE_USE_REDIS if use_redis is None else use_redis
+        self.redis_dtype = np.dtype(redis_dtype or settings.EMBEDDING_CACHE_REDIS_DTYPE)
+
+        self._local: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._redis = None
+        self._model = None
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.provider_calls = 0
+
+    def make_key(self, text: str) -> str:
+        """Build a content-addressed key for a text under this cache's embedding config."""
+        digest = hashlib.sha256()
+        for part in (
+            self.provider,
+            embedding_model_name(self.provider),
+            str(settings.EMBEDDING_DIMENSIONS),
+            text,
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    @property
+    def model(self):
+        """Embeddings model (lazy; raises if the provider is unavailable)."""
+        if self._model is None:
+            from app.ai.core.embeddings import create_embeddings_model
+            self._model = create_embeddings_model(self.provider)
+        return self._model
+
+    async def _get_redis(self):
+        """Get Redis connection (lazy initialization, binary values)."""
+        if not self.use_redis:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(settings.REDIS_URL, decode_responses=False)
+                await self._redis.ping()
+            except Exception as e:
+                print(f"[EmbeddingCache] Redis unavailable, using local tier only: {e}")
+                self._redis = False
+        return self._redis if self._redis else None
+
+    def _get_local(self, key: str) -> Optional[np.ndarray]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: np.ndarray, ttl: int) -> None:
+        self._local[key] = (time.monotonic() + ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def get_many(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Embeddings for texts, in order.
+
+        Checks the local tier, then Redis (one MGET), and embeds all
+        remaining misses in a single aembed_documents call. Provider
+        errors propagate; callers keep their own fallback handling.
+        """
+        keys = [self.make_key(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+
+        for key in keys:
+            if key in found:
+                continue
+            value = self._get_local(key)
+            if value is not None:
+                found[key] = value
+                self.hits += 1
+
+        missing = list(dict.fromkeys(k for k in keys if k not in found))
+        if missing:
+            await self._fetch_redis(missing, found)
+
+        to_embed = [(key, text) for key, text in dict(zip(keys, texts)).items() if key not in found]
+        if to_embed:
+            self.misses += len(to_embed)
+            self.provider_calls += 1
+            vectors = await self.model.aembed_documents([text for _, text in to_embed])
+            fresh = {key: np.asarray(vector, dtype=np.float32) for (key, _), vector in zip(to_embed, vectors)}
+            for key, value in fresh.items():
+                self._set_local(key, value, self.ttl)
+            found.update(fresh)
+            await self._store_redis(fresh)
+
+        return [found[key].tolist() for key in keys]
+
+    async def get(self, text: str) -> List[float]:
+        """Embedding for a single text."""
+        return (await self.get_many([text]))[0]
+
+    async def _fetch_redis(self, keys: List[str], found: Dict[str, np.ndarray]) -> None:
+        redis = await self._get_redis()
+        if not redis:
+            return
+        try:
+            raws = await redis.mget([self.KEY_PREFIX + key for key in keys])
+        except Exception as e:
+            print(f"[EmbeddingCache] Redis read failed: {e}")
+            return
+        for key, raw in zip(keys, raws):
+            if raw:
+                value = np.frombuffer(raw, dtype=self.redis_dtype).astype(np.float32)
+                self._set_local(key, value, self.ttl)
+                found[key] = value
+                self.hits += 1
+                self.redis_hits += 1
+
+    async def _store_redis(self, values: Dict[str, np.ndarray]) -> None:
+        redis = await self._get_redis()
+        if not redis or not values:
+            return
+        try:
+            pipe = redis.pipeline()
+            for key, value in values.items():
+                pipe.set(self.KEY_PREFIX + key, value.astype(self.redis_dtype).tobytes(), ex=self.ttl)
+            await pipe.execute()
+        except Exception as e:
+            print(f"[EmbeddingCache] Redis write failed: {e}")
+
+    def clear(self) -> None:
+        """Clear the local tier and reset counters."""
+        self._local.clear()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.provider_calls = 0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for telemetry."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "provider_calls": self.provider_calls,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._local),
+        }
+
+
+# Shared caches (validator, RAG and document search), one per provider
+_embedding_caches: Dict[str, EmbeddingCache] = {}
+
+
+def get_embedding_cache(provider: Optional[str] = None) -> EmbeddingCache:
+    """Get the shared embedding cache for a provider (default EMBEDDING_PROVIDER)."""
+    provider = provider or settings.EMBEDDING_PROVIDER
+    if provider not in _embedding_caches:
+        _embedding_caches[provider] = EmbeddingCache(provider=provider)
+    return _embedding_caches[provider]
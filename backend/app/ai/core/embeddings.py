@@ -0,0 +1,53 @@
+"""
+AI Tutor Platform - Embeddings Factory
+Builds the embeddings model for the configured EMBEDDING_PROVIDER so all
+callers (similarity, documents, RAG) share one configuration.
+
+Providers:
+- openai: OpenAI embeddings (EMBEDDING_MODEL)
+- local: CPU-only feature-hashing projection, no network
+- fake: deterministic offline embeddings with simulated latency
+"""
+from typing import Optional
+
+from app.core.config import settings
+
+
+def create_embeddings_model(provider: Optional[str] = None):
+    """
+    Create an embeddings model exposing aembed_query/aembed_documents.
+
+    Args:
+        provider: Provider to build (defaults to EMBEDDING_PROVIDER).
+
+    Raises if the provider's dependencies or credentials are unavailable;
+    callers keep their existing graceful-degradation handling.
+    """
+    provider = provider or settings.EMBEDDING_PROVIDER
+    if provider == "fake":
+        from app.ai.core.fake_provider import FakeEmbeddings
+        return FakeEmbeddings(dimensions=settings.EMBEDDING_DIMENSIONS)
+    if provider == "local":
+        from app.ai.core.local_embeddings import HashingEmbeddings
+        return HashingEmbeddings(dimensions=settings.EMBEDDING_DIMENSIONS)
+
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(
+        model=settings.EMBEDDING_MODEL,
+        openai_api_key=settings.OPENAI_API_KEY
+    )
+
+
+def embedding_model_name(provider: Optional[str] = None) -> str:
+    """Model identifier for a provider (part of embedding cache keys)."""
+    provider = provider or settings.EMBEDDING_PROVIDER
+    if provider == "local":
+        from app.ai.core.local_embeddings import HashingEmbeddings
+        return HashingEmbeddings.MODEL_NAME
+    return settings.EMBEDDING_MODEL
+
+
+def embeddings_available(provider: Optional[str] = None) -> bool:
+    """Whether an embeddings provider can be used at all."""
+    provider = provider or settings.EMBEDDING_PROVIDER
+    return provider in ("fake", "local") or bool(settings.OPENAI_API_KEY)
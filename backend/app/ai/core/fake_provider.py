@@ -0,0 +1,341 @@
+"""
+AI Tutor Platform - Fake LLM & Embedding Provider
+Offline, deterministic stand-ins for the chat model and embeddings so the
+backend can be exercised and load-tested without network access.
+
+Enable with LLM_PROVIDER=fake and/or EMBEDDING_PROVIDER=fake.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, SystemMessage
+
+from app.core.config import settings
+
+
+# ==================== LATENCY ====================
+
+class FakeLatency:
+    """
+    Samples simulated call latency (seconds).
+
+    Distributions (FAKE_LLM_LATENCY_DISTRIBUTION):
+    - none: no delay
+    - fixed: always FAKE_LLM_LATENCY_MS
+    - uniform: 0.5x to 1.5x FAKE_LLM_LATENCY_MS
+    - lognormal: median FAKE_LLM_LATENCY_MS, sigma FAKE_LLM_LATENCY_SIGMA
+      (long right tail, closest to real provider latency)
+    """
+
+    def __init__(
+        self,
+        distribution: str = None,
+        median_ms: float = None,
+        sigma: float = None,
+        seed: Optional[int] = None,
+    ):
+        self.distribution = distribution or settings.FAKE_LLM_LATENCY_DISTRIBUTION
+        self.median_ms = settings.FAKE_LLM_LATENCY_MS if median_ms is None else median_ms
+        self.sigma = settings.FAKE_LLM_LATENCY_SIGMA if sigma is None else sigma
+        self._rng = random.Random(settings.FAKE_LLM_SEED if seed is None else seed)
+
+    def sample(self) -> float:
+        if self.distribution == "none" or self.median_ms <= 0:
+            return 0.0
+        if self.distribution == "fixed":
+            ms = self.median_ms
+        elif self.distribution == "uniform":
+            ms = self._rng.uniform(0.5 * self.median_ms, 1.5 * self.median_ms)
+        else:
+            ms = self._rng.lognormvariate(math.log(self.median_ms), self.sigma)
+        return ms / 1000.0
+
+
+# ==================== CANNED RESPONSES ====================
+
+def _grade_from(text: str, default: int = 3) -> int:
+    match = re.search(r"Grade(?: Level)?:?\s*(\d+)", text, re.IGNORECASE)
+    return int(match.group(1)) if match else default
+
+
+def _math_question(rng: random.Random, grade: int, difficulty: str = "medium") -> Dict[str, Any]:
+    """Build an arithmetic MCQ whose answer the validator can verify."""
+    scale = 10 ** min(1 + grade // 2 + (difficulty == "hard"), 5)
+    a, b = rng.randint(2, scale), rng.randint(2, scale)
+    op = rng.choice(["+", "-", "×"])
+    if op == "-" and b > a:
+        a, b = b, a
+    if op == "×":
+        b = rng.randint(2, 12)
+    answer = a + b if op == "+" else a - b if op == "-" else a * b
+
+    options = {answer}
+    while len(options) < 4:
+        options.add(answer + rng.choice([-1, 1]) * rng.randint(1, max(2, answer // 10 or 2)))
+    options = [str(answer)] + [str(o) for o in options if o != answer]
+
+    return {
+        "question": f"What is {a} {op} {b}?",
+        "answer": str(answer),
+        "options": options,
+        "correct_answers": [str(answer)],
+        "hint": "Work it out step by step.",
+        "explanation": f"{a} {op} {b} = {answer}",
+        "difficulty": difficulty,
+        "question_type": "multiple_choice",
+    }
+
+
+def _examiner_single(system: str, prompt: str, rng: random.Random) -> Any:
+    difficulty = re.search(r"Difficulty:\s*(\w+)", system)
+    return _math_question(rng, _grade_from(system), difficulty.group(1) if difficulty else "medium")
+
+
+def _examiner_batch(system: str, prompt: str, rng: random.Random) -> Any:
+    count = int(re.search(r"Generate (\d+)", prompt).group(1))
+    topics = re.findall(r"- (.+?) \((.+?)\): (\d+) questions", prompt)
+    slots = [(t, s) for t, s, n in topics for _ in range(int(n))] or [("General", "General")] * count
+    questions = []
+    for topic, subtopic in slots[:count]:
+        question = _math_question(rng, _grade_from(prompt), rng.choice(["easy", "medium", "hard"]))
+        question.update({"topic": topic, "subtopic": subtopic})
+        questions.append(question)
+    return questions
+
+
+def _lesson(system: str, prompt: str, rng: random.Random) -> Any:
+    subtopic = re.search(r"Subtopic:\s*(.+)", system)
+    name = subtopic.group(1).strip() if subtopic else "Today's Topic"
+    return {
+        "title": f"Let's Explore {name}! 🎉",
+        "hook": f"Did you know {name} is all around us?",
+        "introduction": f"Today we'll learn about {name}.",
+        "sections": [
+            {
+                "title": f"What is {name}?",
+                "content": f"{name} is something we can see and use every day.",
+                "example": "Imagine sharing 6 stickers between 2 friends.",
+            },
+            {
+                "title": "Let's Practice",
+                "content": "Try it yourself with things around your home.",
+                "example": "Count the windows in your room.",
+            },
+        ],
+        "summary": f"We learned what {name} is and how to use it.",
+        "fun_fact": "Octopuses have three hearts!",
+    }
+
+
+def _grader(system: str, prompt: str, rng: random.Random) -> Any:
+    correct = re.search(r"Correct Answer:\s*(.+)", system)
+    student = re.search(r"Student'?s? Answer:\s*(.+)", system)
+    is_correct = bool(correct and student and correct.group(1).strip().lower() == student.group(1).strip().lower())
+    return {
+        "is_correct": is_correct,
+        "score": 1.0 if is_correct else 0.0,
+        "feedback": "Great job! 🌟" if is_correct else "Nice try! Let's look at it again.",
+        "detailed_explanation": "Check each step carefully.",
+        "hint_for_retry": None if is_correct else "Try working it out step by step.",
+        "common_mistake": None if is_correct else "Mixing up the operation.",
+    }
+
+
+def _feedback(system: str, prompt: str, rng: random.Random) -> Any:
+    return {
+        "overall_interpretation": "You did well and you're improving!",
+        "strengths": ["You finished every question", "Careful reading"],
+        "areas_to_improve": ["Double-check your answers"],
+        "specific_recommendations": ["Practice 10 minutes a day", "Read each question twice"],
+        "practice_activities": ["Quiz a friend", "Try practice mode"],
+        "pattern_analysis": "Most mistakes came from rushing.",
+        "encouraging_message": "Keep up the great work! 🌟",
+    }
+
+
+def _analyzer(system: str, prompt: str, rng: random.Random) -> Any:
+    return {
+        "overall_score_interpretation": "A solid effort!",
+        "strengths": ["Good accuracy on easy questions"],
+        "areas_of_improvement": ["Harder word problems"],
+        "ways_to_improve": ["Practice word problems daily"],
+        "practical_assignments": ["Solve 5 word problems"],
+        "encouraging_words": "You're doing great! 🚀",
+        "pattern_analysis": "Mistakes cluster on multi-step questions.",
+    }
+
+
+def _document_validator(system: str, prompt: str, rng: random.Random) -> Any:
+    grade = _grade_from(system + prompt, 5)
+    return {
+        "is_appropriate": True,
+        "grade_match": "exact",
+        "estimated_grade_min": max(1, grade - 1),
+        "estimated_grade_max": grade + 1,
+        "reason": "Educational content suitable for this grade.",
+        "educational_value": "Reinforces core concepts.",
+        "content_warnings": [],
+    }
+
+
+def _gamification(system: str, prompt: str, rng: random.Random) -> Any:
+    return {
+        "effort_score": 0.7,
+        "effort_level": "good",
+        "bonus_xp": 10,
+        "reason": "Consistent practice.",
+        "encouragement": "Awesome effort today! 🌟",
+        "badges_earned": [],
+    }
+
+
+def _rag_quiz(system: str, prompt: str, rng: random.Random) -> Any:
+    count = re.search(r"Generate (\d+)", prompt)
+    return [
+        {
+            "question": f"According to the document, what is point {i + 1}?",
+            "options": [f"Point {i + 1}", "Something else", "Nothing", "All of these"],
+            "correct_answer": f"Point {i + 1}",
+            "explanation": "The document states this directly.",
+        }
+        for i in range(int(count.group(1)) if count else 3)
+    ]
+
+
+# Ordered (signature, responder) rules; the first signature found in the
+# system prompt or prompt picks the responder.
+_JSON_RESPONDERS: List[Tuple[str, Callable[[str, str, random.Random], Any]]] = [
+    ("Return a JSON array of", _examiner_batch),
+    ("MULTIPLE CHOICE questions", _examiner_single),
+    ("Create a complete lesson", _lesson),
+    ('"is_correct"', _grader),
+    ("overall_interpretation", _feedback),
+    ("overall_score_interpretation", _analyzer),
+    ('"is_appropriate"', _document_validator),
+    ('"effort_score"', _gamification),
+    ("educational quiz generator", _rag_quiz),
+]
+
+
+def fake_completion(system: str, prompt: str, rng: random.Random) -> str:
+    """Produce a canned completion shaped like what the calling agent expects."""
+    haystack = system + "\n" + prompt
+    for signature, responder in _JSON_RESPONDERS:
+        if signature in haystack:
+            return json.dumps(responder(system, prompt, rng), ensure_ascii=False)
+
+    if "content safety reviewer" in haystack:
+        return "SAFE"
+    if "SAFE: [reason]" in haystack:
+        return "SAFE: Ordinary educational question."
+    if "[SUGGESTIONS:" in haystack:
+        return (
+            "Great question! 🌟 Let's think about it together step by step. "
+            "Start with what you already know, then try one small example. "
+            '[SUGGESTIONS: ["Can you give me an example?", "How do I check my answer?"]]'
+        )
+    return "This is a placeholder response from the offline fake model."
+
+
+# ==================== CHAT MODEL ====================
+
+class FakeChatModel:
+    """
+    Drop-in replacement for ChatOpenAI/ChatAnthropic (ainvoke/astream).
+
+    Output depends only on the prompt and the per-model call counter, so a
+    given sequence of requests always produces the same responses.
+    """
+
+    def __init__(self, model: str = None, temperature: float = 0.7, latency: Optional[FakeLatency] = None):
+        self.model = model or settings.FAKE_LLM_MODEL
+        self.temperature = temperature
+        self.latency = latency or FakeLatency()
+        self._calls = 0
+
+    def _render(self, messages: List[BaseMessage]) -> Tuple[str, str, random.Random]:
+        system = "\n".join(str(m.content) for m in messages if isinstance(m, SystemMessage))
+        prompt = str(messages[-1].content) if messages else ""
+        self._calls += 1
+        digest = hashlib.sha256(f"{settings.FAKE_LLM_SEED}:{self._calls}:{system}:{prompt}".encode()).digest()
+        return system, prompt, random.Random(int.from_bytes(digest[:8], "big"))
+
+    def _usage(self, messages: List[BaseMessage], content: str) -> Dict[str, Any]:
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "token_usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+            "model_name": self.model,
+        }
+
+    async def ainvoke(self, messages: List[BaseMessage], **kwargs) -> AIMessage:
+        system, prompt, rng = self._render(messages)
+        content = fake_completion(system, prompt, rng)
+        await asyncio.sleep(self.latency.sample())
+        return AIMessage(content=content, response_metadata=self._usage(messages, content))
+
+    async def astream(self, messages: List[BaseMessage], **kwargs) -> AsyncIterator[AIMessageChunk]:
+        system, prompt, rng = self._render(messages)
+        content = fake_completion(system, prompt, rng)
+
+        # Time to first token ~ sampled latency; then a steady token rate
+        await asyncio.sleep(self.latency.sample())
+        per_token = settings.FAKE_LLM_STREAM_TOKEN_MS / 1000.0
+        for i in range(0, len(content), 4):
+            if per_token:
+                await asyncio.sleep(per_token)
+            yield AIMessageChunk(content=content[i:i + 4])
+
+
+# ==================== EMBEDDINGS ====================
+
+class FakeEmbeddings:
+    """
+    Deterministic hash-based embeddings (OpenAIEmbeddings-compatible API).
+
+    Words and word bigrams are feature-hashed into a fixed-size signed
+    vector and L2-normalized, so texts sharing vocabulary get high cosine
+    similarity - close enough to real embeddings to exercise dedup and
+    retrieval code paths.
+    """
+
+    def __init__(self, dimensions: int = None, latency: Optional[FakeLatency] = None):
+        self.dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+        self.latency = latency or FakeLatency(median_ms=settings.FAKE_EMBEDDING_LATENCY_MS)
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        words = re.findall(r"\w+", text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "big") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            vector[0] = 1.0
+            return vector
+        return [v / norm for v in vector]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self.latency.sample())
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.latency.sample())
+        return [self._embed(t) for t in texts]
@@ -0,0 +1,105 @@
+"""
+AI Tutor Platform - Hybrid Search Helpers
+Keyword ranking (BM25) and reciprocal-rank fusion for combining keyword
+and vector retrieval. Postgres does keyword ranking with full-text search
+in SQL; BM25Index covers the in-process fallback.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Question words and fillers that carry no retrieval signal
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how i in is it of on or
+the this that to was what when where which who why will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def fulltext_query(text: str) -> str:
+    """
+    OR-query for Postgres to_tsquery from free text ("" if no terms).
+
+    Tokens are plain word characters, so no tsquery syntax can leak in.
+    OR (rather than websearch AND) keeps long student questions from
+    matching nothing; ranking still favours chunks with more terms.
+    """
+    return " | ".join(dict.fromkeys(tokenize(text)))
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[Hashable]],
+    k: int = 60,
+) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse ranked lists: score(d) = sum over lists of 1 / (k + rank).
+
+    Ranks start at 1. Returns (key, score) pairs, best first.
+    """
+    scores: Dict[Hashable, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of documents (built once, queried many times)."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._keys: List[Hashable] = []
+        self._lengths: List[int] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: Hashable, text: str) -> None:
+        tokens = tokenize(text)
+        doc = len(self._keys)
+        self._keys.append(key)
+        self._lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            self._postings[term].append((doc, tf))
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        where: Optional[Callable[[Hashable], bool]] = None,
+    ) -> List[Tuple[Hashable, float]]:
+        """Top documents as (key, score), best first; where filters keys."""
+        if not self._keys or limit <= 0:
+            return []
+        n_docs = len(self._keys)
+        avg_length = sum(self._lengths) / n_docs or 1.0
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc] / avg_length)
+                scores[doc] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        results = []
+        for doc, score in ranked:
+            key = self._keys[doc]
+            if where is None or where(key):
+                results.append((key, score))
+                if len(results) >= limit:
+                    break
+        return results
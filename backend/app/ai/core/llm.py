@@ -2,18 +2,25 @@
 AI Tutor Platform - Unified LLM Client
 Centralized LLM access with telemetry, guardrails, and reliability features.
 """
+import asyncio
 import json
 import time
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Union, AsyncIterator
 from dataclasses import dataclass
 
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from langchain_core.output_parsers import StrOutputParser
+from opentelemetry import trace
 
 from app.core.config import settings
 from app.ai.core.telemetry import get_tracer, trace_llm_call, agent_span
 from app.ai.core.guardrails import validate_agent_input, validate_agent_output
 from app.ai.core.observability import get_observer, calculate_cost
+from app.ai.core.response_cache import ResponseCache, CachedCompletion, get_response_cache
+from app.ai.core.single_flight import get_single_flight
+from app.ai.core.rate_limiter import LLMPriority, AGENT_PRIORITIES, get_rate_limiter, estimate_tokens
+from app.ai.core.resilience import is_retryable_error, backoff_delay, get_latency_tracker
+from app.ai.core.stream_moderator import StreamModerator, StreamBlockedError
 
 
 @dataclass
@@ -25,6 +32,9 @@ class LLMResponse:
     tokens_completion: int = 0
     tokens_total: int = 0
     raw_response: Any = None
+    cached: bool = False
+    cache_key: Optional[str] = None
+    coalesced: bool = False
 
 
 class LLMClient:
@@ -35,8 +45,12 @@ class LLMClient:
     - Multi-provider support (OpenAI, Anthropic)
     - Built-in telemetry (OpenTelemetry)
     - Input/Output guardrails
-    - Retry logic with exponential backoff
+    - Retries with jittered exponential backoff, optional hedged requests
     - Token usage tracking
+    - Token streaming with incremental output moderation
+    - Content-addressed response cache (LRU + optional Redis)
+    - Single-flight coalescing of identical in-flight requests
+    - Shared concurrency/RPM/TPM limits with priority classes
     """
     
     def __init__(
@@ -46,56 +60,263 @@ class LLMClient:
         temperature: float = 0.7,
         timeout: int = None,
         enable_guardrails: bool = True,
+        enable_cache: bool = None,
     ):
         """
         Initialize the LLM client.
         
         Args:
-            provider: LLM provider ('openai' or 'anthropic'). Defaults to settings.
+            provider: LLM provider ('openai', 'anthropic' or 'fake'). Defaults to settings.
             model: Model name. Defaults to settings.
             temperature: Sampling temperature.
             timeout: Request timeout in seconds.
             enable_guardrails: Whether to apply input/output guardrails.
+            enable_cache: Whether to use the response cache. Defaults to settings.
         """
         self.provider = provider or settings.LLM_PROVIDER
-        self.model = model or (
-            settings.OPENAI_MODEL if self.provider == "openai" 
-            else settings.ANTHROPIC_MODEL
-        )
+        self.model = model or settings.model_for_provider(self.provider)
         self.temperature = temperature
         self.timeout = timeout or settings.LLM_TIMEOUT_SECONDS
         self.enable_guardrails = enable_guardrails
+        self.enable_cache = settings.LLM_CACHE_ENABLED if enable_cache is None else enable_cache
         
         self._llm = None
+        self._hedge_llm = None
+    
+    def _build_llm(self, provider: str, model: str):
+        """Create a chat model; retries are handled by _invoke, not the SDK."""
+        if provider == "fake":
+            from app.ai.core.fake_provider import FakeChatModel
+            return FakeChatModel(model=model, temperature=self.temperature)
+        if provider == "openai":
+            from langchain_openai import ChatOpenAI
+            return ChatOpenAI(
+                model=model,
+                api_key=settings.OPENAI_API_KEY,
+                temperature=self.temperature,
+                timeout=self.timeout,
+                max_retries=0,
+            )
+        from langchain_anthropic import ChatAnthropic
+        return ChatAnthropic(
+            model=model,
+            api_key=settings.ANTHROPIC_API_KEY,
+            temperature=self.temperature,
+            timeout=self.timeout,
+            max_retries=0,
+        )
     
     @property
     def llm(self):
         """Lazy-load the LLM instance."""
         if self._llm is None:
-            if self.provider == "openai":
-                from langchain_openai import ChatOpenAI
-                self._llm = ChatOpenAI(
-                    model=self.model,
-                    api_key=settings.OPENAI_API_KEY,
-                    temperature=self.temperature,
-                    timeout=self.timeout,
-                )
-            else:
-                from langchain_anthropic import ChatAnthropic
-                self._llm = ChatAnthropic(
-                    model=self.model,
-                    api_key=settings.ANTHROPIC_API_KEY,
-                    temperature=self.temperature,
-                    timeout=self.timeout,
-                )
+            self._llm = self._build_llm(self.provider, self.model)
         return self._llm
     
+    @property
+    def hedge_target(self) -> tuple:
+        """(provider, model) used for hedged requests."""
+        provider = settings.LLM_HEDGE_PROVIDER or self.provider
+        if provider == self.provider:
+            return provider, self.model
+        return provider, settings.model_for_provider(provider)
+    
+    @property
+    def hedge_llm(self):
+        """Lazy-load the LLM instance used for hedged requests."""
+        if self._hedge_llm is None:
+            provider, model = self.hedge_target
+            if (provider, model) == (self.provider, self.model):
+                self._hedge_llm = self.llm
+            else:
+                self._hedge_llm = self._build_llm(provider, model)
+        return self._hedge_llm
+    
+    def _resolve_priority(
+        self,
+        agent_name: str,
+        priority: Optional[LLMPriority],
+    ) -> LLMPriority:
+        if priority is not None:
+            return priority
+        return AGENT_PRIORITIES.get(agent_name, LLMPriority.DEFAULT)
+    
+    async def _invoke_once(
+        self,
+        llm,
+        provider: str,
+        model: str,
+        messages: List[BaseMessage],
+        priority: LLMPriority,
+    ) -> Dict[str, Any]:
+        """Make one rate-limited upstream call and extract token usage."""
+        estimated = sum(estimate_tokens(str(m.content)) for m in messages)
+        estimated += settings.LLM_RATE_LIMIT_COMPLETION_ESTIMATE
+        
+        async with get_rate_limiter().limit(
+            provider, model, estimated, priority
+        ) as usage:
+            start = time.monotonic()
+            response = await llm.ainvoke(messages)
+            get_latency_tracker().record(f"{provider}:{model}", time.monotonic() - start)
+            
+            tokens_prompt = 0
+            tokens_completion = 0
+            if hasattr(response, 'response_metadata'):
+                token_usage = response.response_metadata.get('token_usage', {})
+                tokens_prompt = token_usage.get('prompt_tokens', 0)
+                tokens_completion = token_usage.get('completion_tokens', 0)
+            usage["actual_tokens"] = tokens_prompt + tokens_completion
+        
+        return {
+            "content": response.content,
+            "model": model,
+            "tokens_prompt": tokens_prompt,
+            "tokens_completion": tokens_completion,
+            "raw_response": response,
+        }
+    
+    async def _invoke_hedged(
+        self,
+        messages: List[BaseMessage],
+        priority: LLMPriority,
+        attempt: int,
+    ) -> Dict[str, Any]:
+        """
+        Run the primary request; if it outlives the hedge delay, fire a
+        second request and take whichever succeeds first.
+        """
+        span = trace.get_current_span()
+        primary = asyncio.ensure_future(
+            self._invoke_once(self.llm, self.provider, self.model, messages, priority)
+        )
+        if not settings.LLM_HEDGE_ENABLED:
+            return await primary
+        
+        pending = {primary}
+        try:
+            delay = get_latency_tracker().hedge_delay(f"{self.provider}:{self.model}")
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            
+            hedge_provider, hedge_model = self.hedge_target
+            hedge = asyncio.ensure_future(
+                self._invoke_once(self.hedge_llm, hedge_provider, hedge_model, messages, priority)
+            )
+            pending.add(hedge)
+            span.add_event("llm.hedge", {
+                "attempt": attempt,
+                "delay_s": round(delay, 3),
+                "provider": hedge_provider,
+                "model": hedge_model,
+            })
+            
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        span.set_attribute("llm.hedge_won", task is hedge)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _invoke(
+        self,
+        messages: List[BaseMessage],
+        priority: LLMPriority = LLMPriority.DEFAULT,
+    ) -> Dict[str, Any]:
+        """
+        Call the LLM with retries (jittered exponential backoff) on
+        transient errors, recording every attempt on the current span.
+        """
+        span = trace.get_current_span()
+        max_attempts = settings.LLM_MAX_RETRIES + 1
+        
+        for attempt in range(max_attempts):
+            start = time.monotonic()
+            try:
+                result = await self._invoke_hedged(messages, priority, attempt)
+            except Exception as e:
+                retryable = is_retryable_error(e)
+                span.add_event("llm.attempt", {
+                    "attempt": attempt,
+                    "outcome": "retryable_error" if retryable else "error",
+                    "error.type": type(e).__name__,
+                    "latency_ms": round((time.monotonic() - start) * 1000, 2),
+                })
+                if not retryable or attempt == max_attempts - 1:
+                    span.set_attribute("llm.attempts", attempt + 1)
+                    raise
+                delay = backoff_delay(attempt, e)
+                print(f"[LLMClient] {type(e).__name__} on attempt {attempt + 1}, retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            else:
+                span.add_event("llm.attempt", {
+                    "attempt": attempt,
+                    "outcome": "success",
+                    "latency_ms": round((time.monotonic() - start) * 1000, 2),
+                })
+                span.set_attribute("llm.attempts", attempt + 1)
+                return result
+    
+    def _prepare_messages(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        context: Optional[Dict[str, Any]],
+        span,
+    ) -> tuple:
+        """
+        Apply input guardrails and context formatting.
+        
+        Returns:
+            (rendered system prompt, sanitized prompt, message list)
+        """
+        # Apply input guardrails
+        sanitized_prompt = prompt
+        if self.enable_guardrails:
+            try:
+                sanitized_prompt, warnings = validate_agent_input(prompt)
+                if warnings:
+                    span.set_attribute("guardrails.input_warnings", str(warnings))
+            except ValueError as e:
+                span.set_attribute("guardrails.input_blocked", True)
+                raise
+        
+        # Format prompt if context provided
+        if context:
+            try:
+                sanitized_prompt = sanitized_prompt.format(**context)
+            except KeyError:
+                pass  # Ignore missing format keys
+        
+        # Build messages
+        messages = []
+        if system_prompt:
+            if context:
+                try:
+                    system_prompt = system_prompt.format(**context)
+                except KeyError:
+                    pass
+            messages.append(SystemMessage(content=system_prompt))
+        messages.append(HumanMessage(content=sanitized_prompt))
+        
+        return system_prompt, sanitized_prompt, messages
+    
     async def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         context: Optional[Dict[str, Any]] = None,
         agent_name: str = "LLMClient",
+        use_cache: bool = True,
+        coalesce: bool = True,
+        priority: Optional[LLMPriority] = None,
     ) -> LLMResponse:
         """
         Generate a response from the LLM.
@@ -105,6 +326,12 @@ class LLMClient:
             system_prompt: Optional system prompt.
             context: Optional context variables for prompt formatting.
             agent_name: Name of the calling agent (for telemetry).
+            use_cache: Set False for callers that need a fresh completion
+                every time (e.g. question generation).
+            coalesce: Share one upstream call with concurrent identical
+                requests (single-flight).
+            priority: Dispatch priority under rate limiting. Defaults to
+                the agent's entry in AGENT_PRIORITIES.
             
         Returns:
             LLMResponse with content and metadata.
@@ -115,64 +342,75 @@ class LLMClient:
             span.set_attribute("llm.model", self.model)
             span.set_attribute("llm.provider", self.provider)
             span.set_attribute("agent.name", agent_name)
+            priority = self._resolve_priority(agent_name, priority)
             
-            # Apply input guardrails
-            sanitized_prompt = prompt
-            if self.enable_guardrails:
-                try:
-                    sanitized_prompt, warnings = validate_agent_input(prompt)
-                    if warnings:
-                        span.set_attribute("guardrails.input_warnings", str(warnings))
-                except ValueError as e:
-                    span.set_attribute("guardrails.input_blocked", True)
-                    raise
-            
-            # Format prompt if context provided
-            if context:
-                try:
-                    sanitized_prompt = sanitized_prompt.format(**context)
-                except KeyError:
-                    pass  # Ignore missing format keys
-            
-            # Build messages
-            messages = []
-            if system_prompt:
-                if context:
-                    try:
-                        system_prompt = system_prompt.format(**context)
-                    except KeyError:
-                        pass
-                messages.append(SystemMessage(content=system_prompt))
-            messages.append(HumanMessage(content=sanitized_prompt))
+            system_prompt, sanitized_prompt, messages = self._prepare_messages(
+                prompt, system_prompt, context, span
+            )
             
             # Record prompt length
             span.set_attribute("llm.prompt_length", len(sanitized_prompt))
             
-            # Call LLM
-            response = await self.llm.ainvoke(messages)
-            content = response.content
+            # Check response cache
+            cache = get_response_cache() if (self.enable_cache and use_cache) else None
+            cache_ttl = cache.ttl_for(agent_name) if cache else 0
+            cache_key = None
+            if cache and cache_ttl > 0:
+                cache_key = ResponseCache.make_key(
+                    self.provider, self.model, self.temperature,
+                    system_prompt, sanitized_prompt,
+                )
+                cached = await cache.get(cache_key)
+                if cached is not None:
+                    trace_llm_call(
+                        model=self.model,
+                        cache_hit=True,
+                        cache_stats=cache.stats,
+                    )
+                    span.set_attribute("llm.response_length", len(cached.content))
+                    return LLMResponse(
+                        content=cached.content,
+                        model=cached.model,
+                        tokens_prompt=cached.tokens_prompt,
+                        tokens_completion=cached.tokens_completion,
+                        tokens_total=cached.tokens_total,
+                        cached=True,
+                        cache_key=cache_key,
+                    )
             
-            # Extract token usage if available
-            tokens_prompt = 0
-            tokens_completion = 0
-            if hasattr(response, 'response_metadata'):
-                usage = response.response_metadata.get('token_usage', {})
-                tokens_prompt = usage.get('prompt_tokens', 0)
-                tokens_completion = usage.get('completion_tokens', 0)
+            # Call LLM, sharing the call with identical in-flight requests
+            coalesced = False
+            if coalesce and settings.LLM_SINGLE_FLIGHT_ENABLED:
+                flight_key = cache_key or ResponseCache.make_key(
+                    self.provider, self.model, self.temperature,
+                    system_prompt, sanitized_prompt,
+                )
+                result, coalesced = await get_single_flight().do(
+                    flight_key, lambda: self._invoke(messages, priority)
+                )
+                span.set_attribute("llm.coalesced", coalesced)
+            else:
+                result = await self._invoke(messages, priority)
             
+            content = result["content"]
+            tokens_prompt = result["tokens_prompt"]
+            tokens_completion = result["tokens_completion"]
             tokens_total = tokens_prompt + tokens_completion
+            response = None if coalesced else result["raw_response"]
             
-            # Record telemetry
+            # Record telemetry (coalesced callers didn't spend tokens)
             trace_llm_call(
                 model=self.model,
-                prompt_tokens=tokens_prompt,
-                completion_tokens=tokens_completion,
-                total_tokens=tokens_total,
+                prompt_tokens=0 if coalesced else tokens_prompt,
+                completion_tokens=0 if coalesced else tokens_completion,
+                total_tokens=0 if coalesced else tokens_total,
+                cache_hit=False if cache_key else None,
+                cache_stats=cache.stats if cache_key else None,
             )
             
             # Phase 3B: Langfuse Observability
             observer = get_observer()
-            if observer.is_enabled:
+            if observer.is_enabled and not coalesced:
                 langfuse_trace = observer.create_trace(
                     name=f"{agent_name}.generate",
                     metadata={
@@ -206,13 +444,29 @@ class LLMClient:
             
             span.set_attribute("llm.response_length", len(content))
             
+            # Only cache output that passed guardrails
+            if cache_key:
+                await cache.set(
+                    cache_key,
+                    CachedCompletion(
+                        content=content,
+                        model=self.model,
+                        tokens_prompt=tokens_prompt,
+                        tokens_completion=tokens_completion,
+                        tokens_total=tokens_total,
+                    ),
+                    cache_ttl,
+                )
+            
             return LLMResponse(
                 content=content,
-                model=self.model,
+                model=result.get("model", self.model),
                 tokens_prompt=tokens_prompt,
                 tokens_completion=tokens_completion,
                 tokens_total=tokens_total,
                 raw_response=response,
+                cache_key=cache_key,
+                coalesced=coalesced,
             )
     
     async def generate_json(
@@ -221,6 +475,9 @@ class LLMClient:
         system_prompt: Optional[str] = None,
         context: Optional[Dict[str, Any]] = None,
         agent_name: str = "LLMClient",
+        use_cache: bool = True,
+        coalesce: bool = True,
+        priority: Optional[LLMPriority] = None,
     ) -> Dict[str, Any]:
         """
         Generate a JSON response from the LLM.
@@ -231,26 +488,24 @@ class LLMClient:
             system_prompt=system_prompt,
             context=context,
             agent_name=agent_name,
+            use_cache=use_cache,
+            coalesce=coalesce,
+            priority=priority,
         )
         
-        # Parse JSON from response
-        content = response.content.strip()
-        
-        # Strip markdown code blocks if present
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-        
-        return json.loads(content)
+        try:
+            return parse_json_content(response.content)
+        except json.JSONDecodeError:
+            # Don't keep serving a completion we can't parse
+            if response.cache_key:
+                await get_response_cache().delete(response.cache_key)
+            raise
     
     async def chat(
         self,
         messages: List[BaseMessage],
         agent_name: str = "LLMClient",
+        priority: Optional[LLMPriority] = None,
     ) -> LLMResponse:
         """
         Send a conversation (list of messages) to the LLM.
@@ -258,6 +513,7 @@ class LLMClient:
         Args:
             messages: List of LangChain message objects.
             agent_name: Name of the calling agent (for telemetry).
+            priority: Dispatch priority under rate limiting.
             
         Returns:
             LLMResponse with content and metadata.
@@ -271,16 +527,13 @@ class LLMClient:
             span.set_attribute("llm.message_count", len(messages))
             
             # Call LLM with message history
-            response = await self.llm.ainvoke(messages)
-            content = response.content
-            
-            # Extract token usage
-            tokens_prompt = 0
-            tokens_completion = 0
-            if hasattr(response, 'response_metadata'):
-                usage = response.response_metadata.get('token_usage', {})
-                tokens_prompt = usage.get('prompt_tokens', 0)
-                tokens_completion = usage.get('completion_tokens', 0)
+            result = await self._invoke(
+                messages, self._resolve_priority(agent_name, priority)
+            )
+            response = result["raw_response"]
+            content = result["content"]
+            tokens_prompt = result["tokens_prompt"]
+            tokens_completion = result["tokens_completion"]
             
             tokens_total = tokens_prompt + tokens_completion
             trace_llm_call(self.model, tokens_prompt, tokens_completion, tokens_total)
@@ -297,13 +550,143 @@ class LLMClient:
             
             return LLMResponse(
                 content=content,
-                model=self.model,
+                model=result.get("model", self.model),
                 tokens_prompt=tokens_prompt,
                 tokens_completion=tokens_completion,
                 tokens_total=tokens_total,
                 raw_response=response,
             )
 
+    
+    async def stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+        agent_name: str = "LLMClient",
+        priority: Optional[LLMPriority] = None,
+        grade: int = 5,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from the LLM as moderated text deltas.
+        
+        Same prompt handling as generate(); output guardrails and content
+        moderation run incrementally (see StreamModerator), so text is
+        released shortly after it is generated rather than at the end.
+        
+        Raises:
+            StreamBlockedError: If the output fails moderation mid-stream.
+        """
+        span = trace.get_current_span()
+        _, _, messages = self._prepare_messages(prompt, system_prompt, context, span)
+        async for delta in self.stream_messages(messages, agent_name, priority, grade):
+            yield delta
+    
+    async def stream_messages(
+        self,
+        messages: List[BaseMessage],
+        agent_name: str = "LLMClient",
+        priority: Optional[LLMPriority] = None,
+        grade: int = 5,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a conversation (list of messages) as moderated text deltas.
+        
+        Transient errors are retried only until the first token arrives;
+        after that a failure is surfaced to the caller.
+        """
+        tracer = get_tracer()
+        
+        with tracer.start_as_current_span("llm.stream") as span:
+            span.set_attribute("llm.model", self.model)
+            span.set_attribute("llm.provider", self.provider)
+            span.set_attribute("agent.name", agent_name)
+            span.set_attribute("llm.message_count", len(messages))
+            
+            priority = self._resolve_priority(agent_name, priority)
+            moderator = StreamModerator(grade=grade) if self.enable_guardrails else None
+            prompt_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+            estimated = prompt_tokens + settings.LLM_RATE_LIMIT_COMPLETION_ESTIMATE
+            max_attempts = settings.LLM_MAX_RETRIES + 1
+            
+            for attempt in range(max_attempts):
+                start = time.monotonic()
+                received = False
+                streamed_chars = 0
+                try:
+                    async with get_rate_limiter().limit(
+                        self.provider, self.model, estimated, priority
+                    ) as usage:
+                        async for chunk in self.llm.astream(messages):
+                            delta = _chunk_text(chunk)
+                            if not delta:
+                                continue
+                            streamed_chars += len(delta)
+                            if not received:
+                                received = True
+                                span.set_attribute(
+                                    "llm.time_to_first_token_ms",
+                                    round((time.monotonic() - start) * 1000, 2),
+                                )
+                            released = moderator.feed(delta) if moderator else delta
+                            if released:
+                                yield released
+                        
+                        usage["actual_tokens"] = prompt_tokens + streamed_chars // 4
+                except StreamBlockedError:
+                    span.set_attribute("guardrails.output_blocked", True)
+                    raise
+                except Exception as e:
+                    if received or not is_retryable_error(e) or attempt == max_attempts - 1:
+                        span.set_attribute("llm.attempts", attempt + 1)
+                        raise
+                    delay = backoff_delay(attempt, e)
+                    print(f"[LLMClient] Stream {type(e).__name__} on attempt {attempt + 1}, retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                
+                if moderator:
+                    try:
+                        tail = moderator.flush()
+                    except StreamBlockedError:
+                        span.set_attribute("guardrails.output_blocked", True)
+                        raise
+                    if tail:
+                        yield tail
+                
+                span.set_attribute("llm.attempts", attempt + 1)
+                span.set_attribute("llm.stream_duration_ms", round((time.monotonic() - start) * 1000, 2))
+                return
+
+
+def parse_json_content(content: str) -> Any:
+    """Parse JSON from an LLM response, stripping markdown code fences."""
+    content = content.strip()
+    
+    # Strip markdown code blocks if present
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.startswith("```"):
+        content = content[3:]
+    if content.endswith("```"):
+        content = content[:-3]
+    content = content.strip()
+    
+    return json.loads(content)
+
+
+def _chunk_text(chunk) -> str:
+    """Extract text from a streamed message chunk (str or content blocks)."""
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return ""
+
 
 # Default client instance
 _default_client: Optional[LLMClient] = None
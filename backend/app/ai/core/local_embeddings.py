@@ -0,0 +1,120 @@
+"""
+AI Tutor Platform - Local Embeddings
+CPU-only embeddings for EMBEDDING_PROVIDER=local: no network round trip
+and no per-call cost, at lower quality than a trained encoder. Intended
+for question dedup, where latency matters more than retrieval quality.
+"""
+import asyncio
+import math
+import re
+import zlib
+from collections import Counter
+from typing import List, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class HashingEmbeddings:
+    """
+    Feature-hashing projection (OpenAIEmbeddings-compatible API).
+
+    Each text is split into word unigrams, word bigrams and character
+    n-grams of each word. Features are hashed (crc32) into a fixed-size
+    signed vector with sublinear term-frequency weights and L2-normalized,
+    so cosine similarity tracks shared vocabulary and word forms
+    ("multiply" / "multiplying"). Deterministic across processes, so
+    cached and stored vectors stay comparable.
+
+    Large batches are embedded in a worker thread to keep the event loop
+    responsive.
+    """
+
+    MODEL_NAME = "local-hashing-v1"
+
+    # Relative weight of each feature family, by feature prefix
+    FAMILY_WEIGHTS = {"w": 1.0, "b": 0.7, "c": 0.3}
+
+    def __init__(
+        self,
+        dimensions: int = None,
+        char_ngram: int = 3,
+        thread_batch_size: int = None,
+    ):
+        """
+        Initialize the embedder.
+
+        Args:
+            dimensions: Output vector size (defaults to EMBEDDING_DIMENSIONS,
+                so vectors fit the existing pgvector columns).
+            char_ngram: Character n-gram size within words (0 disables).
+            thread_batch_size: Batches at least this large run in a thread.
+        """
+        self.dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+        self.char_ngram = char_ngram
+        self.thread_batch_size = (
+            thread_batch_size if thread_batch_size is not None
+            else settings.LOCAL_EMBEDDING_THREAD_BATCH_SIZE
+        )
+
+    def _features(self, text: str) -> Counter:
+        """Term frequency of each prefixed feature ("w:", "b:", "c:")."""
+        words = _WORD_RE.findall(text.lower())
+        counts: Counter = Counter(f"w:{word}" for word in words)
+        counts.update(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+        if self.char_ngram:
+            n = self.char_ngram
+            for word in words:
+                if len(word) > n:
+                    padded = f"<{word}>"
+                    counts.update(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return counts
+
+    def _embed_into(self, text: str, row: np.ndarray) -> None:
+        features = self._features(text)
+        if not features:
+            row[0] = 1.0
+            return
+        hashes = np.fromiter(
+            (zlib.crc32(f.encode("utf-8")) for f in features),
+            dtype=np.uint64,
+            count=len(features),
+        )
+        # Sublinear TF: repeated features add information, but not linearly
+        weights = np.fromiter(
+            (self.FAMILY_WEIGHTS[f[0]] * (1.0 + math.log(tf)) for f, tf in features.items()),
+            dtype=np.float32,
+            count=len(features),
+        )
+        signs = np.where((hashes >> np.uint64(31)) & np.uint64(1), -1.0, 1.0).astype(np.float32)
+        np.add.at(row, (hashes % np.uint64(self.dimensions)).astype(np.intp), signs * weights)
+        norm = np.linalg.norm(row)
+        if norm:
+            row /= norm
+        else:
+            row[0] = 1.0
+
+    def embed_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into an (n, dimensions) float32 matrix."""
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for text, row in zip(texts, matrix):
+            self._embed_into(text, row)
+        return matrix
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_matrix([text])[0].tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_matrix(texts).tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return self.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if len(texts) >= self.thread_batch_size:
+            return await asyncio.to_thread(self.embed_documents, texts)
+        return self.embed_documents(texts)
@@ -0,0 +1,183 @@
+"""
+AI Tutor Platform - MinHash / LSH Near-Duplicate Index
+Estimates Jaccard similarity between questions from character shingles,
+without an embedding call. LSH banding finds candidates in large sets
+(the question bank) without comparing against every entry.
+"""
+import re
+import zlib
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+
+# Prime just above 2^32: (a * x + b) stays below 2^64 for 32-bit a, b, x
+_PRIME = np.uint64(4294967311)
+
+_NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def _canonical_number(match: "re.Match") -> str:
+    digits = match.group(0).replace(",", "")
+    if "." in digits:
+        whole, frac = digits.split(".", 1)
+        frac = frac.rstrip("0")
+        return f"{whole.lstrip('0') or '0'}.{frac}" if frac else whole.lstrip("0") or "0"
+    return digits.lstrip("0") or "0"
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase, canonicalize numbers ("1,000" and "01000" -> "1000"),
+    drop punctuation and collapse whitespace.
+
+    Numbers keep their value: "3 + 4" and "5 + 6" are different drills,
+    and template-level repeats are left to the math-equivalence checks.
+    """
+    text = _NUMBER_RE.sub(_canonical_number, text.lower())
+    text = re.sub(r"[^\w\s.]", " ", text)
+    text = re.sub(r"\.(?!\d)|(?<!\d)\.", " ", text)  # Keep decimal points only
+    return " ".join(text.split())
+
+
+def shingles(text: str, size: int = 5) -> Set[str]:
+    """Character shingles of the normalized text."""
+    normalized = normalize_text(text)
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+class MinHasher:
+    """MinHash signatures over character shingles (vectorized with NumPy)."""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2**32 - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2**32 - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (num_perm uint64 values) of a text."""
+        items = shingles(text, self.shingle_size)
+        if not items:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in items),
+            dtype=np.uint64,
+            count=len(items),
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return permuted.min(axis=0)
+
+    @staticmethod
+    def jaccard(sig1: np.ndarray, sig2: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return float(np.mean(sig1 == sig2))
+
+
+_default_hasher: Optional[MinHasher] = None
+
+
+def get_minhasher() -> MinHasher:
+    """Shared MinHasher (signatures are only comparable under the same hasher)."""
+    global _default_hasher
+    if _default_hasher is None:
+        _default_hasher = MinHasher()
+    return _default_hasher
+
+
+class LSHIndex:
+    """
+    MinHash signatures bucketed by LSH bands.
+
+    With b bands of r rows, pairs become candidates with probability
+    1 - (1 - J^r)^b; the default 8 x 8 over 64 permutations puts the
+    S-curve's midpoint near J = 0.77. Optional max_size evicts the oldest
+    entries (a sliding window for per-session history).
+    """
+
+    def __init__(
+        self,
+        hasher: Optional[MinHasher] = None,
+        bands: int = 8,
+        max_size: Optional[int] = None,
+    ):
+        self.hasher = hasher or get_minhasher()
+        if self.hasher.num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = self.hasher.num_perm // bands
+        self.max_size = max_size
+        self._signatures: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._buckets: List[Dict[bytes, Set[Hashable]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._signatures
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[i * self.rows:(i + 1) * self.rows].tobytes()
+            for i in range(self.bands)
+        ]
+
+    def _as_signature(self, item: Union[str, np.ndarray]) -> np.ndarray:
+        return self.hasher.signature(item) if isinstance(item, str) else item
+
+    def add(self, key: Hashable, item: Union[str, np.ndarray]) -> np.ndarray:
+        """Index a text (or precomputed signature) under key; returns the signature."""
+        signature = self._as_signature(item)
+        if key in self._signatures:
+            self.remove(key)
+        self._signatures[key] = signature
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(band_key, set()).add(key)
+        if self.max_size:
+            while len(self._signatures) > self.max_size:
+                self.remove(next(iter(self._signatures)))
+        return signature
+
+    def remove(self, key: Hashable) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket = band.get(band_key)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del band[band_key]
+
+    def candidates(self, item: Union[str, np.ndarray]) -> Set[Hashable]:
+        """Keys sharing at least one LSH band with the item."""
+        found: Set[Hashable] = set()
+        for band, band_key in zip(self._buckets, self._band_keys(self._as_signature(item))):
+            found |= band.get(band_key, set())
+        return found
+
+    def query(self, item: Union[str, np.ndarray], threshold: float) -> List[Tuple[Hashable, float]]:
+        """LSH candidates with estimated Jaccard >= threshold, best first."""
+        signature = self._as_signature(item)
+        matches = [
+            (key, MinHasher.jaccard(signature, self._signatures[key]))
+            for key in self.candidates(signature)
+        ]
+        return sorted((m for m in matches if m[1] >= threshold), key=lambda m: -m[1])
+
+    def jaccard_all(self, item: Union[str, np.ndarray]) -> Dict[Hashable, float]:
+        """Estimated Jaccard against every entry (one vectorized pass; for small windows)."""
+        if not self._signatures:
+            return {}
+        signature = self._as_signature(item)
+        matrix = np.stack(list(self._signatures.values()))
+        scores = (matrix == signature).mean(axis=1)
+        return dict(zip(self._signatures.keys(), scores.tolist()))
+
+    def clear(self) -> None:
+        self._signatures.clear()
+        self._buckets = [{} for _ in range(self.bands)]
@@ -0,0 +1,329 @@
+"""
+AI Tutor Platform - LLM Rate Limiter
+Process-wide concurrency cap plus requests-per-minute and tokens-per-minute
+token buckets for outbound LLM traffic, with priority classes so interactive
+requests are dispatched ahead of background batch work.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Optional, Dict, Any, List, Tuple
+
+from opentelemetry import trace
+
+from app.core.config import settings
+
+
+class LLMPriority(IntEnum):
+    """Dispatch priority for outbound LLM calls (lower goes first)."""
+    INTERACTIVE = 0  # A student is waiting on this response (chat, hints)
+    DEFAULT = 1
+    BATCH = 2  # Background generation (queue refill, pre-generation)
+
+
+# Default priority per agent when the caller doesn't pass one
+AGENT_PRIORITIES: Dict[str, LLMPriority] = {
+    "TutorAgent": LLMPriority.INTERACTIVE,
+    "TutorChatAgent": LLMPriority.INTERACTIVE,
+    "RAGAgent": LLMPriority.INTERACTIVE,
+    "GraderAgent": LLMPriority.INTERACTIVE,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) for admission control."""
+    return max(1, len(text) // 4)
+
+
+@dataclass
+class RateLimit:
+    """Limits for one provider/model. A value of 0 means unlimited."""
+    rpm: int = 0
+    tpm: int = 0
+    concurrency: int = 0
+
+
+class TokenBucket:
+    """Continuously refilling token bucket sized to one minute of capacity."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` can be consumed (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)  # Oversized requests wait for a full bucket
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        if self.unlimited:
+            return
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Credit (positive) or debit (negative) after actual usage is known."""
+        if self.unlimited:
+            return
+        self._refill()
+        self.level = min(self.capacity, self.level + delta)
+
+
+class ModelLimiter:
+    """
+    Limiter for a single provider/model.
+
+    Waiters sit in a priority heap; a request is dispatched only when a
+    concurrency slot is free and both buckets can cover it, so a queued
+    interactive request always goes before any queued batch request.
+    """
+
+    def __init__(self, name: str, limit: RateLimit):
+        self.name = name
+        self.limit = limit
+        self.requests = TokenBucket(limit.rpm)
+        self.tokens = TokenBucket(limit.tpm)
+        self.active = 0
+
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at = 0.0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for *_, fut in self._waiters if not fut.done())
+
+    def _has_slot(self) -> bool:
+        return not self.limit.concurrency or self.active < self.limit.concurrency
+
+    def _schedule(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        at = loop.time() + delay
+        if self._timer is not None and self._timer_at <= at:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_at = at
+        self._timer = loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._waiters and self._has_slot():
+            _, _, tokens, fut = self._waiters[0]
+            if fut.done():  # Cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            wait = max(self.requests.time_until(1), self.tokens.time_until(tokens))
+            if wait > 0:
+                self._schedule(wait)
+                return
+            heapq.heappop(self._waiters)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self.active += 1
+            fut.set_result(None)
+
+    async def acquire(self, tokens: int, priority: LLMPriority) -> None:
+        """Wait until this request is admitted."""
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), tokens, fut))
+        self._dispatch()
+
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # Admitted just as we were cancelled
+            raise
+
+    def release(self, token_delta: int = 0) -> None:
+        """Free the concurrency slot and reconcile estimated vs actual tokens."""
+        self.active -= 1
+        if token_delta:
+            self.tokens.adjust(-token_delta)
+        self._dispatch()
+
+    def give_back(self, tokens: int) -> None:
+        """Return an admitted slot unused, refunding what it took from both buckets."""
+        self.requests.adjust(1)
+        self.release(-tokens)
+
+
+class LLMRateLimiter:
+    """
+    Process-wide limiter for outbound LLM calls, one ModelLimiter per
+    provider/model.
+
+    With LLM_RATE_LIMIT_USE_REDIS, admitted requests are also counted in
+    per-minute Redis windows so RPM/TPM hold across all workers; local
+    priority ordering still applies within each worker.
+    """
+
+    KEY_PREFIX = "llm:ratelimit:"
+
+    def __init__(self, use_redis: bool = None):
+        self.use_redis = settings.LLM_RATE_LIMIT_USE_REDIS if use_redis is None else use_redis
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self._redis = None
+
+    def _limit_for(self, provider: str, model: str) -> RateLimit:
+        override = settings.LLM_RATE_LIMIT_OVERRIDES.get(f"{provider}:{model}")
+        if override:
+            return RateLimit(**override)
+        return RateLimit(
+            rpm=settings.LLM_RATE_LIMIT_RPM,
+            tpm=settings.LLM_RATE_LIMIT_TPM,
+            concurrency=settings.LLM_MAX_CONCURRENCY,
+        )
+
+    def get_limiter(self, provider: str, model: str) -> ModelLimiter:
+        name = f"{provider}:{model}"
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            limiter = ModelLimiter(name, self._limit_for(provider, model))
+            self._limiters[name] = limiter
+        return limiter
+
+    async def _get_redis(self):
+        """Get Redis connection (lazy initialization)."""
+        if not self.use_redis:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(
+                    settings.REDIS_URL,
+                    encoding="utf-8",
+                    decode_responses=True,
+                )
+                await self._redis.ping()
+            except Exception as e:
+                print(f"[RateLimiter] Redis unavailable, limiting per process: {e}")
+                self._redis = False
+        return self._redis if self._redis else None
+
+    async def _reserve_global(self, limiter: ModelLimiter, tokens: int) -> float:
+        """
+        Count this request in the shared per-minute window.
+
+        Returns 0 if it fits (or Redis is off), otherwise the seconds until
+        the next window, with nothing reserved.
+        """
+        redis = await self._get_redis()
+        if not redis:
+            return 0.0
+        limit = limiter.limit
+        now = time.time()
+        window = int(now // 60)
+        key = f"{self.KEY_PREFIX}{limiter.name}:{window}"
+        try:
+            pipe = redis.pipeline()
+            pipe.hincrby(key, "requests", 1)
+            pipe.hincrby(key, "tokens", tokens)
+            pipe.expire(key, 120)
+            requests_used, tokens_used, _ = await pipe.execute()
+        except Exception as e:
+            print(f"[RateLimiter] Redis window check failed: {e}")
+            return 0.0
+
+        over = (limit.rpm and requests_used > limit.rpm) or (limit.tpm and tokens_used > limit.tpm)
+        if not over:
+            return 0.0
+        try:
+            pipe = redis.pipeline()
+            pipe.hincrby(key, "requests", -1)
+            pipe.hincrby(key, "tokens", -tokens)
+            await pipe.execute()
+        except Exception:
+            pass
+        return (window + 1) * 60 - now
+
+    @asynccontextmanager
+    async def limit(
+        self,
+        provider: str,
+        model: str,
+        estimated_tokens: int,
+        priority: LLMPriority = LLMPriority.DEFAULT,
+    ):
+        """
+        Hold an admission slot for the duration of one upstream call.
+
+        Yields a dict; set "actual_tokens" on it once usage is known so the
+        token bucket can be reconciled with the estimate.
+        """
+        limiter = self.get_limiter(provider, model)
+        start = time.monotonic()
+        while True:
+            await limiter.acquire(estimated_tokens, priority)
+            try:
+                wait = await self._reserve_global(limiter, estimated_tokens)
+            except BaseException:
+                limiter.release()
+                raise
+            if not wait:
+                break
+            # Shared window is full: hand the local slot to the next waiter
+            # rather than holding it, and queue again once the window rolls over
+            limiter.give_back(estimated_tokens)
+            await asyncio.sleep(wait)
+
+        usage: Dict[str, Any] = {"actual_tokens": None}
+        try:
+            queue_wait = time.monotonic() - start
+
+            span = trace.get_current_span()
+            if span:
+                span.set_attribute("llm.queue_wait_ms", round(queue_wait * 1000, 2))
+                span.set_attribute("llm.priority", priority.name.lower())
+                span.set_attribute("llm.queue_depth", limiter.queued)
+            yield usage
+        finally:
+            delta = 0
+            if usage["actual_tokens"]:
+                delta = usage["actual_tokens"] - estimated_tokens
+            limiter.release(delta)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Active and queued counts per provider/model."""
+        return {
+            name: {"active": limiter.active, "queued": limiter.queued}
+            for name, limiter in self._limiters.items()
+        }
+
+
+# Singleton limiter shared by all LLM callers
+_rate_limiter: Optional[LLMRateLimiter] = None
+
+
+def get_rate_limiter() -> LLMRateLimiter:
+    """Get the shared LLM rate limiter."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = LLMRateLimiter()
+    return _rate_limiter
@@ -0,0 +1,112 @@
+"""
+AI Tutor Platform - LLM Resilience Helpers
+Retry classification, jittered exponential backoff and latency tracking
+used by LLMClient for retries and hedged requests.
+"""
+import asyncio
+import random
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional
+
+from app.core.config import settings
+
+
+# HTTP statuses worth retrying (timeouts, conflicts, throttling, server errors)
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+# Provider SDK exception names, matched by name so neither SDK is required
+RETRYABLE_ERROR_NAMES = {
+    "APITimeoutError",
+    "APIConnectionError",
+    "RateLimitError",
+    "InternalServerError",
+    "ServiceUnavailableError",
+    "OverloadedError",
+}
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Whether an upstream failure is transient and safe to retry."""
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return type(exc).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Read a Retry-After hint from a provider error, if present."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, exc: Optional[BaseException] = None) -> float:
+    """
+    Full-jitter exponential backoff for the given retry attempt (0-based).
+
+    A provider Retry-After hint is honoured as a floor, still capped at
+    LLM_RETRY_MAX_DELAY_SECONDS so a user-facing call can't stall.
+    """
+    cap = settings.LLM_RETRY_MAX_DELAY_SECONDS
+    ceiling = min(cap, settings.LLM_RETRY_BASE_DELAY_SECONDS * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    hint = retry_after_seconds(exc) if exc is not None else None
+    if hint:
+        delay = max(delay, hint)
+    return min(delay, cap)
+
+
+class LatencyTracker:
+    """
+    Rolling window of successful call latencies per provider/model.
+
+    Supplies the hedge delay: the observed p95, so only the slowest ~5% of
+    calls trigger a second request.
+    """
+
+    MIN_SAMPLES = 20
+
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, key: str, seconds: float) -> None:
+        self._samples[key].append(seconds)
+
+    def percentile(self, key: str, pct: float) -> Optional[float]:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def hedge_delay(self, key: str) -> float:
+        """Seconds to wait on the primary request before hedging."""
+        floor = settings.LLM_HEDGE_MIN_DELAY_SECONDS
+        p95 = self.percentile(key, 95)
+        return max(floor, p95) if p95 is not None else floor
+
+
+# Shared tracker so all LLMClients learn from the same traffic
+_latency_tracker: Optional[LatencyTracker] = None
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Get the shared latency tracker."""
+    global _latency_tracker
+    if _latency_tracker is None:
+        _latency_tracker = LatencyTracker()
+    return _latency_tracker
@@ -0,0 +1,225 @@
+"""
+AI Tutor Platform - LLM Response Cache
+Content-addressed cache for LLM completions with an in-process LRU tier
+and an optional Redis tier shared across workers.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple
+
+from app.core.config import settings
+
+
+# Per-agent TTLs (seconds), keyed by each agent's `name`. Agents not listed
+# use LLM_CACHE_DEFAULT_TTL_SECONDS. A TTL of 0 disables caching for that agent.
+AGENT_CACHE_TTLS: Dict[str, int] = {
+    "LessonAgent": 24 * 3600,  # Lessons for a subtopic + grade are stable
+    "document_validator": 24 * 3600,
+    "FeedbackAgent": 3600,
+    "GraderAgent": 3600,
+    "AnalyzerAgent": 1800,
+    "ReviewerAgent": 1800,
+    "RAGAgent": 900,
+    "GamificationAgent": 300,
+    "ExaminerAgent": 0,  # Needs variety on every call
+}
+
+
+@dataclass
+class CachedCompletion:
+    """A cached LLM completion (post-guardrails)."""
+    content: str
+    model: str
+    tokens_prompt: int = 0
+    tokens_completion: int = 0
+    tokens_total: int = 0
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "content": self.content,
+            "model": self.model,
+            "tokens_prompt": self.tokens_prompt,
+            "tokens_completion": self.tokens_completion,
+            "tokens_total": self.tokens_total,
+        })
+
+    @classmethod
+    def from_json(cls, data: str) -> "CachedCompletion":
+        return cls(**json.loads(data))
+
+
+class ResponseCache:
+    """
+    Two-tier cache for LLM responses.
+
+    Keys are a SHA-256 over provider, model, temperature, rendered
+    system prompt and prompt, so identical requests share one entry
+    regardless of which agent instance issued them.
+
+    Tiers:
+    - Local: bounded LRU with per-entry expiry (always on)
+    - Redis: optional, shared across uvicorn workers
+    """
+
+    KEY_PREFIX = "llm:cache:"
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        default_ttl: int = None,
+        use_redis: bool = None,
+    ):
+        """
+        Initialize the response cache.
+
+        Args:
+            max_entries: Maximum entries in the local LRU tier.
+            default_ttl: TTL in seconds for agents without an explicit TTL.
+            use_redis: Whether to use the Redis tier.
+        """
+        self.max_entries = max_entries or settings.LLM_CACHE_MAX_ENTRIES
+        self.default_ttl = default_ttl if default_ttl is not None else settings.LLM_CACHE_DEFAULT_TTL_SECONDS
+        self.use_redis = settings.LLM_CACHE_USE_REDIS if use_redis is None else use_redis
+
+        self._local: "OrderedDict[str, Tuple[float, CachedCompletion]]" = OrderedDict()
+        self._redis = None
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        temperature: float,
+        system_prompt: Optional[str],
+        prompt: str,
+    ) -> str:
+        """Build a content-addressed key for an LLM request."""
+        digest = hashlib.sha256()
+        for part in (provider, model, f"{temperature:.3f}", system_prompt or "", prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def ttl_for(self, agent_name: str) -> int:
+        """Get the TTL for an agent (0 means do not cache)."""
+        return AGENT_CACHE_TTLS.get(agent_name, self.default_ttl)
+
+    async def _get_redis(self):
+        """Get Redis connection (lazy initialization)."""
+        if not self.use_redis:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(
+                    settings.REDIS_URL,
+                    encoding="utf-8",
+                    decode_responses=True,
+                )
+                await self._redis.ping()
+            except Exception as e:
+                print(f"[ResponseCache] Redis unavailable, using local tier only: {e}")
+                self._redis = False
+        return self._redis if self._redis else None
+
+    def _get_local(self, key: str) -> Optional[CachedCompletion]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: CachedCompletion, ttl: int) -> None:
+        self._local[key] = (time.monotonic() + ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[CachedCompletion]:
+        """Look up a completion, checking the local tier then Redis."""
+        value = self._get_local(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        redis = await self._get_redis()
+        if redis:
+            try:
+                raw = await redis.get(self.KEY_PREFIX + key)
+                if raw:
+                    value = CachedCompletion.from_json(raw)
+                    ttl = await redis.ttl(self.KEY_PREFIX + key)
+                    self._set_local(key, value, max(int(ttl), 1))
+                    self.hits += 1
+                    self.redis_hits += 1
+                    return value
+            except Exception as e:
+                print(f"[ResponseCache] Redis read failed: {e}")
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: CachedCompletion, ttl: int) -> None:
+        """Store a completion in both tiers."""
+        if ttl <= 0:
+            return
+        self._set_local(key, value, ttl)
+
+        redis = await self._get_redis()
+        if redis:
+            try:
+                await redis.set(self.KEY_PREFIX + key, value.to_json(), ex=ttl)
+            except Exception as e:
+                print(f"[ResponseCache] Redis write failed: {e}")
+
+    async def delete(self, key: str) -> None:
+        """Remove a completion from both tiers (e.g. unparseable output)."""
+        self._local.pop(key, None)
+
+        redis = await self._get_redis()
+        if redis:
+            try:
+                await redis.delete(self.KEY_PREFIX + key)
+            except Exception as e:
+                print(f"[ResponseCache] Redis delete failed: {e}")
+
+    def clear(self) -> None:
+        """Clear the local tier and reset counters."""
+        self._local.clear()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for telemetry."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._local),
+        }
+
+
+# Singleton cache instance shared by all LLMClients
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the shared response cache instance."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
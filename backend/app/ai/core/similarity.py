@@ -2,16 +2,136 @@
 Semantic Similarity Service 🧠
 
 Provides functionality to calculate semantic similarity between texts
-using vector embeddings (OpenAI).
+using vector embeddings (SIMILARITY_EMBEDDING_PROVIDER, falling back to
+EMBEDDING_PROVIDER; "local" avoids a network round trip per check).
 Used by ValidatorAgent to detect duplicate or semantically identical questions.
+
+Vectors compared repeatedly are kept L2-normalized in an EmbeddingMatrix
+(contiguous float32), so scoring a query against all of them is a single
+matrix-vector product.
 """
-import math
-from typing import List, Optional
-import os
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
 
-from langchain_openai import OpenAIEmbeddings
+from app.ai.core.embedding_cache import get_embedding_cache
+from app.ai.core.embeddings import embedding_model_name, embeddings_available
 from app.core.config import settings
 
+
+def normalize_vector(vector: Sequence[float]) -> Optional[np.ndarray]:
+    """L2-normalized float32 copy of a vector (None for empty or zero vectors)."""
+    arr = np.asarray(vector, dtype=np.float32).ravel()
+    if arr.size == 0:
+        return None
+    norm = float(np.linalg.norm(arr))
+    if norm == 0.0:
+        return None
+    return arr / norm
+
+
+class EmbeddingMatrix:
+    """
+    Pre-normalized embeddings stored row-wise in one float32 array.
+    
+    Rows are labelled with a key (e.g. a question hash). With max_rows set
+    the oldest rows are dropped, matching a sliding history window.
+    """
+    
+    def __init__(self, dimensions: Optional[int] = None, max_rows: Optional[int] = None):
+        self.dimensions = dimensions
+        self.max_rows = max_rows
+        self._data = np.empty((0, dimensions or 0), dtype=np.float32)
+        self._keys: List[Hashable] = []
+    
+    @classmethod
+    def from_array(
+        cls,
+        keys: Sequence[Hashable],
+        vectors: np.ndarray,
+        normalized: bool = False,
+    ) -> "EmbeddingMatrix":
+        """
+        Wrap an (n, d) array without copying it row by row.
+        
+        With normalized=True the array is used as-is (it may be a
+        read-only memory map); the first add() copies it into memory.
+        """
+        if len(keys) != len(vectors):
+            raise ValueError("keys and vectors must have the same length")
+        matrix = cls(dimensions=vectors.shape[1] if vectors.ndim == 2 else None)
+        if not normalized:
+            vectors = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1.0, norms)
+        matrix._data = vectors
+        matrix._keys = list(keys)
+        return matrix
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    @property
+    def keys(self) -> List[Hashable]:
+        return list(self._keys)
+    
+    @property
+    def vectors(self) -> np.ndarray:
+        """The normalized rows (a view; do not modify)."""
+        return self._data[:len(self._keys)]
+    
+    def add(self, key: Hashable, vector: Sequence[float]) -> bool:
+        """Append a vector; returns False if it is empty, zero or the wrong size."""
+        row = normalize_vector(vector)
+        if row is None:
+            return False
+        if self.dimensions is None:
+            self.dimensions = row.size
+            self._data = np.empty((0, row.size), dtype=np.float32)
+        if row.size != self.dimensions:
+            return False
+        
+        size = len(self._keys)
+        if self.max_rows and size >= self.max_rows:
+            # Slide the window: drop the oldest row in place
+            self._data[:size - 1] = self._data[1:size]
+            self._keys.pop(0)
+            size -= 1
+        elif size >= self._data.shape[0]:
+            # Grow capacity geometrically so appends stay amortized O(d)
+            capacity = max(8, self._data.shape[0] * 2)
+            if self.max_rows:
+                capacity = min(capacity, self.max_rows)
+            grown = np.empty((capacity, self.dimensions), dtype=np.float32)
+            grown[:size] = self._data[:size]
+            self._data = grown
+        
+        self._data[size] = row
+        self._keys.append(key)
+        return True
+    
+    def similarities(self, query: Sequence[float]) -> np.ndarray:
+        """Cosine similarity of the query against every row (one BLAS call)."""
+        q = normalize_vector(query)
+        if q is None or not self._keys or q.size != self.dimensions:
+            return np.zeros(len(self._keys), dtype=np.float32)
+        return self.vectors @ q
+    
+    def top_k(self, query: Sequence[float], k: int = 1) -> List[Tuple[Hashable, float]]:
+        """The k most similar rows as (key, similarity), best first."""
+        scores = self.similarities(query)
+        if scores.size == 0 or k <= 0:
+            return []
+        k = min(k, scores.size)
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx])]
+        return [(self._keys[i], float(scores[i])) for i in idx]
+    
+    def clear(self) -> None:
+        self._data = np.empty((0, self.dimensions or 0), dtype=np.float32)
+        self._keys.clear()
+
+
 class SemanticSimilarityService:
     _instance = None
     
@@ -27,16 +147,13 @@ class SemanticSimilarityService:
             
         self._enabled = False
         self._embeddings = None
+        # Dedup can run on a cheaper provider than document retrieval
+        self.provider = settings.SIMILARITY_EMBEDDING_PROVIDER or settings.EMBEDDING_PROVIDER
         
-        # Check for API key
-        api_key = settings.OPENAI_API_KEY
-        if api_key:
+        # Check for API key (or an offline provider)
+        if embeddings_available(self.provider):
             try:
-                # Initialize OpenAI Embeddings (using small model for speed/cost)
-                self._embeddings = OpenAIEmbeddings(
-                    openai_api_key=api_key,
-                    model="text-embedding-3-small"
-                )
+                self._embeddings = get_embedding_cache(self.provider).model
                 self._enabled = True
             except Exception as e:
                 print(f"⚠️ Failed to initialize Embeddings: {e}")
@@ -46,41 +163,57 @@ class SemanticSimilarityService:
     @property
     def is_enabled(self) -> bool:
         return self._enabled
+    
+    @property
+    def model_id(self) -> str:
+        """"provider:model" of the vectors this service produces (stored with persisted vectors)."""
+        return f"{self.provider}:{embedding_model_name(self.provider)}"
         
     async def get_embedding(self, text: str) -> Optional[List[float]]:
-        """Get vector embedding for text."""
-        if not self._enabled:
-            return None
+        """Get vector embedding for text (served from the shared embedding cache)."""
+        return (await self.get_embeddings([text]))[0]
+    
+    async def get_embeddings(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Get embeddings for many texts; cache misses are embedded in one batch."""
+        if not self._enabled or not texts:
+            return [None] * len(texts)
             
         try:
-            # LangChain's embed_query is synchronous but fast enough or we can run in executor
-            # For strict async, we might wrap it, but it typically makes HTTP req.
-            # OpenAIEmbeddings.aembed_query is async supported in recent versions
-            return await self._embeddings.aembed_query(text)
+            return await get_embedding_cache(self.provider).get_many(texts)
         except Exception as e:
             print(f"⚠️ Embedding error: {e}")
-            return None
+            return [None] * len(texts)
 
     def calculate_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """
         Calculate Cosine Similarity between two vectors.
         Result is between 0.0 (no similarity) and 1.0 (identical).
         """
-        if not vec1 or not vec2 or len(vec1) != len(vec2):
+        if vec1 is None or vec2 is None or len(vec1) == 0 or len(vec1) != len(vec2):
             return 0.0
-            
-        # Dot product
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
         
-        # Magnitude (norm) - OpenAI embeddings are usually normalized, 
-        # so magnitude is close to 1, but we calculate to be safe.
-        norm1 = math.sqrt(sum(a * a for a in vec1))
-        norm2 = math.sqrt(sum(b * b for b in vec2))
-        
-        if norm1 == 0 or norm2 == 0:
+        a = normalize_vector(vec1)
+        b = normalize_vector(vec2)
+        if a is None or b is None:
             return 0.0
-            
-        return dot_product / (norm1 * norm2)
+        return float(a @ b)
+    
+    def top_k_similar(
+        self,
+        query: Sequence[float],
+        candidates: Sequence[Sequence[float]],
+        k: int = 1,
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k cosine similarities of a query against many vectors.
+        
+        Returns (candidate index, similarity) pairs, best first. For
+        repeated queries against the same set, keep an EmbeddingMatrix.
+        """
+        matrix = EmbeddingMatrix()
+        for i, vector in enumerate(candidates):
+            matrix.add(i, vector)
+        return matrix.top_k(query, k)
 
 # Singleton instance
 similarity_service = SemanticSimilarityService()
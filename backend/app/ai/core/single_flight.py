@@ -0,0 +1,234 @@
+"""
+AI Tutor Platform - Single-Flight Request Coalescing
+Collapses concurrent identical LLM calls into one upstream request.
+Locally this is a shared asyncio task per key; across uvicorn workers
+it is a Redis lock plus a pub/sub notification carrying the result.
+"""
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+# Release the lock only if we still own it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Single-flight coordinator keyed by request hash.
+
+    The first caller for a key becomes the leader and runs the work;
+    every concurrent caller with the same key awaits the leader's result.
+    The work runs in its own task so a cancelled caller (e.g. a client
+    disconnect) does not cancel it for everyone else.
+
+    With Redis enabled, the leader also takes a short-lived lock so that
+    callers in other workers wait on a pub/sub channel for the result
+    instead of issuing their own request. If the remote leader fails or
+    times out, followers fall back to running the work themselves.
+    """
+
+    LOCK_PREFIX = "llm:flight:lock:"
+    RESULT_PREFIX = "llm:flight:result:"
+    CHANNEL_PREFIX = "llm:flight:done:"
+
+    def __init__(
+        self,
+        use_redis: bool = None,
+        wait_timeout: float = None,
+        result_ttl: int = 5,
+    ):
+        """
+        Initialize the coordinator.
+
+        Args:
+            use_redis: Whether to coalesce across workers via Redis.
+            wait_timeout: Max seconds a follower waits on a remote leader.
+            result_ttl: Seconds a published result stays readable, covering
+                followers that subscribe just after the leader publishes.
+        """
+        self.use_redis = settings.LLM_SINGLE_FLIGHT_USE_REDIS if use_redis is None else use_redis
+        self.wait_timeout = wait_timeout or settings.LLM_SINGLE_FLIGHT_WAIT_SECONDS
+        self.result_ttl = result_ttl
+
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._redis = None
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.remote_coalesced = 0
+
+    async def _get_redis(self):
+        """Get Redis connection (lazy initialization)."""
+        if not self.use_redis:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(
+                    settings.REDIS_URL,
+                    encoding="utf-8",
+                    decode_responses=True,
+                )
+                await self._redis.ping()
+            except Exception as e:
+                print(f"[SingleFlight] Redis unavailable, coalescing locally only: {e}")
+                self._redis = False
+        return self._redis if self._redis else None
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run fn once for all concurrent callers sharing key.
+
+        Args:
+            key: Request hash identifying identical calls.
+            fn: Coroutine factory producing a JSON-serializable dict.
+
+        Returns:
+            Tuple of (result, shared) where shared is True if this caller
+            received another caller's result.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._lead(key, fn))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+            self.leaders += 1
+            local_shared = False
+        else:
+            self.coalesced += 1
+            local_shared = True
+
+        result, remote_shared = await asyncio.shield(task)
+        return result, local_shared or remote_shared
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _lead(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Run the work, coordinating with other workers when Redis is on."""
+        redis = await self._get_redis()
+        if not redis:
+            return await fn(), False
+
+        lock_key = self.LOCK_PREFIX + key
+        token = uuid.uuid4().hex
+        try:
+            acquired = await redis.set(
+                lock_key, token, nx=True, px=int(self.wait_timeout * 1000)
+            )
+        except Exception as e:
+            print(f"[SingleFlight] Redis lock failed: {e}")
+            return await fn(), False
+
+        if not acquired:
+            result = await self._wait_remote(redis, key)
+            if result is not None:
+                self.remote_coalesced += 1
+                return result, True
+            return await fn(), False
+
+        try:
+            result = await fn()
+        except Exception as e:
+            await self._publish(redis, key, {"__error__": str(e)})
+            raise
+        else:
+            await self._publish(redis, key, result)
+            return result, False
+        finally:
+            try:
+                await redis.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except Exception:
+                pass  # Lock expires on its own
+
+    async def _publish(self, redis, key: str, result: Dict[str, Any]) -> None:
+        # Non-serializable values (e.g. raw provider responses) stay local
+        payload = json.dumps(result, default=lambda _: None)
+        try:
+            await redis.set(self.RESULT_PREFIX + key, payload, ex=self.result_ttl)
+            await redis.publish(self.CHANNEL_PREFIX + key, payload)
+        except Exception as e:
+            print(f"[SingleFlight] Redis publish failed: {e}")
+
+    async def _wait_remote(self, redis, key: str) -> Optional[Dict[str, Any]]:
+        """Wait for another worker's leader; None means run it ourselves."""
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(self.CHANNEL_PREFIX + key)
+
+            # The leader may have finished before we subscribed
+            payload = await redis.get(self.RESULT_PREFIX + key)
+
+            deadline = time.monotonic() + self.wait_timeout
+            while payload is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=min(remaining, 1.0)
+                )
+                if message and message.get("type") == "message":
+                    payload = message["data"]
+                elif not await redis.exists(self.LOCK_PREFIX + key):
+                    # Leader released without publishing; check once more
+                    payload = await redis.get(self.RESULT_PREFIX + key)
+                    if payload is None:
+                        return None
+
+            result = json.loads(payload)
+            if "__error__" in result:
+                return None
+            return result
+        except Exception as e:
+            print(f"[SingleFlight] Waiting on remote leader failed: {e}")
+            return None
+        finally:
+            try:
+                await pubsub.unsubscribe()
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Leader/coalesced counters for telemetry."""
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "remote_coalesced": self.remote_coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+# Singleton coordinator shared by all LLMClients
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the shared single-flight coordinator."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,98 @@
+"""
+AI Tutor Platform - Streaming Output Moderation
+Runs output guardrails and grade-aware content moderation incrementally
+over a sliding window while an LLM response is being streamed.
+"""
+from typing import Optional, List
+
+from app.core.config import settings
+from app.ai.core.guardrails import OutputGuardrails, GuardrailResult
+from app.ai.core.content_moderator import (
+    ContentModerator,
+    ContentCategory,
+    ModerationResult,
+    get_content_moderator,
+)
+
+
+class StreamBlockedError(Exception):
+    """Raised when streamed output fails moderation part-way through."""
+
+    def __init__(self, reason: str, categories: Optional[List[ContentCategory]] = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.categories = categories or []
+
+
+class StreamModerator:
+    """
+    Incremental moderator for streamed LLM output.
+
+    Text is buffered and only released once it is `holdback` characters
+    behind the head of the stream, so a blocked term that is still being
+    generated is caught before any of it reaches the student. Each check
+    covers the last `window` characters, which keeps the per-token cost
+    constant regardless of response length.
+
+    Usage:
+        moderator = StreamModerator(grade=3)
+        for delta in stream:
+            safe_text = moderator.feed(delta)   # may raise StreamBlockedError
+        safe_text = moderator.flush()           # final full-text check
+    """
+
+    def __init__(
+        self,
+        grade: int = 5,
+        window: int = None,
+        holdback: int = None,
+        content_moderator: Optional[ContentModerator] = None,
+    ):
+        self.grade = grade
+        self.window = window or settings.LLM_STREAM_MODERATION_WINDOW
+        self.holdback = holdback if holdback is not None else settings.LLM_STREAM_HOLDBACK_CHARS
+        self.content_moderator = content_moderator or get_content_moderator()
+
+        self._buffer = ""
+        self._released = 0
+        self._checked = 0
+
+    @property
+    def text(self) -> str:
+        """Everything received so far."""
+        return self._buffer
+
+    def _check(self, text: str) -> None:
+        guardrail = OutputGuardrails.check_dangerous_content(text)
+        if guardrail.result == GuardrailResult.BLOCK:
+            raise StreamBlockedError(guardrail.message)
+
+        moderation = self.content_moderator.moderate_output(text, self.grade)
+        if moderation.result == ModerationResult.BLOCKED:
+            raise StreamBlockedError(moderation.reason, moderation.categories)
+
+    def feed(self, delta: str) -> str:
+        """Add a streamed delta; returns newly released (moderated) text."""
+        self._buffer += delta
+
+        # Re-check once enough new text has arrived, or at a word boundary
+        pending = len(self._buffer) - self._checked
+        if pending < self.holdback and not delta[-1:].isspace():
+            return ""
+
+        start = max(0, self._checked - self.window)
+        self._check(self._buffer[start:])
+        self._checked = len(self._buffer)
+
+        release_to = max(self._released, len(self._buffer) - self.holdback)
+        released = self._buffer[self._released:release_to]
+        self._released = release_to
+        return released
+
+    def flush(self) -> str:
+        """Check the full response once the stream ends and release the rest."""
+        self._check(self._buffer)
+        self._checked = len(self._buffer)
+        released = self._buffer[self._released:]
+        self._released = len(self._buffer)
+        return released
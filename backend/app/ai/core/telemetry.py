@@ -172,10 +172,15 @@ def trace_llm_call(
     prompt_tokens: int = 0,
     completion_tokens: int = 0,
     total_tokens: int = 0,
+    cache_hit: Optional[bool] = None,
+    cache_stats: Optional[dict] = None,
 ):
     """
     Record LLM-specific telemetry attributes on the current span.
     Call this within an active span to add token usage metrics.
+    
+    If the response cache was consulted, also records whether this call
+    was served from cache and the cache's running hit/miss counters.
     """
     span = trace.get_current_span()
     if span:
@@ -183,6 +188,29 @@ def trace_llm_call(
         span.set_attribute("llm.tokens.prompt", prompt_tokens)
         span.set_attribute("llm.tokens.completion", completion_tokens)
         span.set_attribute("llm.tokens.total", total_tokens)
+        
+        if cache_hit is not None:
+            span.set_attribute("llm.cache.hit", cache_hit)
+        if cache_stats:
+            for key, value in cache_stats.items():
+                span.set_attribute(f"llm.cache.{key}", value)
+
+
+def trace_retrieval_cache(cache_hit: bool, cache_stats: Optional[dict] = None):
+    """Record a document retrieval cache lookup on the current span."""
+    span = trace.get_current_span()
+    if span:
+        span.set_attribute("retrieval.cache.hit", cache_hit)
+        for key, value in (cache_stats or {}).items():
+            span.set_attribute(f"retrieval.cache.{key}", value)
+
+
+def trace_embedding_batches(batch_stats: dict):
+    """Record embedding batcher counters and request latencies on the current span."""
+    span = trace.get_current_span()
+    if span:
+        for key, value in batch_stats.items():
+            span.set_attribute(f"embedding.{key}", value)
 
 
 # Import asyncio for iscoroutinefunction check
@@ -0,0 +1,130 @@
+"""
+AI Tutor Platform - Document Text Extraction
+Page-level PDF/DOCX text extraction run in a process pool, so large
+textbooks use several cores instead of one GIL-bound executor thread.
+
+The module-level readers below run in the worker processes, which are
+long-lived (started on first use, stopped at app shutdown). PDFs are
+split into page ranges; pages are yielded in order as ranges complete,
+with a bounded number of ranges in flight so memory does not grow with
+document size.
+"""
+import asyncio
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+try:
+    from docx import Document as DocxDocument
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+
+
+# ==================== WORKER FUNCTIONS (run in pool processes) ====================
+
+def count_pdf_pages(file_path: str) -> int:
+    return len(PdfReader(file_path).pages)
+
+
+def read_pdf_pages(file_path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) ("" for pages without text)."""
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def read_docx_text(file_path: str) -> str:
+    doc = DocxDocument(file_path)
+    return "\n\n".join(para.text for para in doc.paragraphs if para.text.strip())
+
+
+# ==================== POOL ====================
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_extraction_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared process pool (None when DOCUMENT_EXTRACTION_PROCESSES is 0)."""
+    global _pool
+    if _pool is None and settings.DOCUMENT_EXTRACTION_PROCESSES > 0:
+        # spawn: never fork the event loop, DB pools or OTel exporter threads
+        _pool = ProcessPoolExecutor(
+            max_workers=extraction_workers(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def extraction_workers() -> int:
+    """Parallel extraction tasks (1 without a process pool)."""
+    return max(1, min(settings.DOCUMENT_EXTRACTION_PROCESSES, os.cpu_count() or 1))
+
+
+def shutdown_extraction_pool() -> None:
+    """Stop the worker processes (app shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# ==================== STREAMING EXTRACTION ====================
+
+async def iter_pdf_pages(
+    file_path: str,
+    pages_per_task: Optional[int] = None,
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Yield (page_number, text) for each page in order, 1-based.
+
+    Page ranges of `pages_per_task` are extracted in parallel; at most two
+    ranges per worker are in flight (or buffered) at any time.
+    """
+    if not PYPDF_AVAILABLE:
+        raise ImportError("pypdf is not installed. Run: pip install pypdf")
+
+    loop = asyncio.get_running_loop()
+    pool = get_extraction_pool()  # None runs in the default thread executor
+    pages_per_task = max(1, pages_per_task or settings.DOCUMENT_EXTRACTION_PAGES_PER_TASK)
+    window = 2 * (extraction_workers() if pool else 1)
+
+    total = await loop.run_in_executor(pool, count_pdf_pages, file_path)
+    ranges = iter([(start, min(start + pages_per_task, total)) for start in range(0, total, pages_per_task)])
+
+    in_flight: deque = deque()
+
+    def submit_next() -> None:
+        page_range = next(ranges, None)
+        if page_range is not None:
+            in_flight.append((page_range[0], loop.run_in_executor(pool, read_pdf_pages, file_path, *page_range)))
+
+    for _ in range(window):
+        submit_next()
+    try:
+        while in_flight:
+            start, future = in_flight.popleft()
+            texts = await future
+            submit_next()
+            for offset, text in enumerate(texts):
+                yield start + offset + 1, text
+    finally:
+        # Consumer stopped early (error or cancellation)
+        for _, future in in_flight:
+            future.cancel()
+
+
+async def extract_docx_text(file_path: str) -> str:
+    """Paragraph text of a DOCX file (DOCX has no stored page breaks)."""
+    if not DOCX_AVAILABLE:
+        raise ImportError("python-docx is not installed. Run: pip install python-docx")
+    return await asyncio.get_running_loop().run_in_executor(get_extraction_pool(), read_docx_text, file_path)
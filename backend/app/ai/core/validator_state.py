@@ -0,0 +1,223 @@
+"""
+AI Tutor Platform - Validator Session State
+Per-session question history, used concepts and pattern counters for the
+ValidatorAgent, shared across workers so a student's requests see the
+same history whichever worker serves them.
+
+State lives in Redis (plain strings, one pipelined round trip per load or
+record, expired by TTL) with an in-process fallback when Redis is
+unavailable.
+"""
+import copy
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+
+CONCEPT_TYPES = ("words", "numbers", "positions", "formats", "types")
+
+
+@dataclass
+class ValidatorSessionState:
+    """Snapshot of one session's validator state."""
+    history: List[str] = field(default_factory=list)  # Oldest first
+    pattern_usage: Dict[str, int] = field(default_factory=dict)
+    concepts: Dict[str, List[Any]] = field(
+        default_factory=lambda: {name: [] for name in CONCEPT_TYPES}
+    )
+
+    def apply(
+        self,
+        question: str,
+        concepts: Dict[str, Sequence[Any]],
+        patterns: Sequence[str],
+        max_history: int,
+        max_concepts: int,
+    ) -> None:
+        """Record a question (same semantics as the Redis pipeline)."""
+        self.history = (self.history + [question])[-max_history:]
+        for pattern in patterns:
+            self.pattern_usage[pattern] = self.pattern_usage.get(pattern, 0) + 1
+        for name, values in concepts.items():
+            used = self.concepts.setdefault(name, [])
+            for value in values:
+                # Re-used concepts move to the most recent end
+                if value in used:
+                    used.remove(value)
+                used.append(value)
+            del used[:-max_concepts]
+
+
+class ValidatorStateStore:
+    """
+    Validator session state with TTL eviction.
+
+    Keys (per session):
+    - validator:{session_id}:hist - list of recent question texts
+    - validator:{session_id}:pat - hash of pattern key -> usage count
+    - validator:{session_id}:c:{type} - list of used concepts, most recent last
+    """
+
+    PREFIX = "validator:"
+
+    def __init__(
+        self,
+        use_redis: bool = None,
+        ttl: int = None,
+        max_history: int = 10,
+        max_concepts: int = 15,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            use_redis: Whether to share state through Redis.
+            ttl: Seconds an idle session's state is kept.
+            max_history: Recent questions kept per session.
+            max_concepts: Used values kept per concept type.
+        """
+        self.use_redis = settings.VALIDATOR_STATE_USE_REDIS if use_redis is None else use_redis
+        self.ttl = ttl or settings.VALIDATOR_STATE_TTL_SECONDS
+        self.max_history = max_history
+        self.max_concepts = max_concepts
+
+        self._redis = None
+        # Local fallback: session_id -> (expires_at, state)
+        self._local: Dict[str, Tuple[float, ValidatorSessionState]] = {}
+        self._local_writes = 0
+
+    async def _get_redis(self):
+        """Get Redis connection (lazy initialization)."""
+        if not self.use_redis:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(
+                    settings.REDIS_URL,
+                    encoding="utf-8",
+                    decode_responses=True,
+                )
+                await self._redis.ping()
+            except Exception as e:
+                print(f"[ValidatorStateStore] Redis unavailable, using local store: {e}")
+                self._redis = False
+        return self._redis if self._redis else None
+
+    def _keys(self, session_id: str) -> Tuple[str, str, Dict[str, str]]:
+        base = f"{self.PREFIX}{session_id}:"
+        return base + "hist", base + "pat", {name: f"{base}c:{name}" for name in CONCEPT_TYPES}
+
+    # ==================== LOCAL FALLBACK ====================
+
+    def _local_get(self, session_id: str) -> Optional[ValidatorSessionState]:
+        entry = self._local.get(session_id)
+        if entry is None:
+            return None
+        expires_at, state = entry
+        if expires_at < time.monotonic():
+            del self._local[session_id]
+            return None
+        return state
+
+    def _local_set(self, session_id: str, state: ValidatorSessionState) -> None:
+        self._local[session_id] = (time.monotonic() + self.ttl, state)
+        # Amortized sweep so abandoned sessions do not accumulate
+        self._local_writes += 1
+        if self._local_writes % 256:
+            return
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._local.items() if expires_at < now]:
+            del self._local[key]
+
+    # ==================== STATE ====================
+
+    async def load(self, session_id: str) -> ValidatorSessionState:
+        """Load a session's state in one round trip."""
+        redis = await self._get_redis()
+        if redis:
+            hist_key, pat_key, concept_keys = self._keys(session_id)
+            try:
+                pipe = redis.pipeline(transaction=False)
+                pipe.lrange(hist_key, 0, -1)
+                pipe.hgetall(pat_key)
+                for key in concept_keys.values():
+                    pipe.lrange(key, 0, -1)
+                history, patterns, *concept_lists = await pipe.execute()
+
+                concepts = dict(zip(concept_keys, concept_lists))
+                concepts["numbers"] = [int(n) for n in concepts["numbers"]]
+                return ValidatorSessionState(
+                    history=history,
+                    pattern_usage={k: int(v) for k, v in patterns.items()},
+                    concepts=concepts,
+                )
+            except Exception as e:
+                print(f"[ValidatorStateStore] Redis read failed: {e}")
+
+        state = self._local_get(session_id)
+        return copy.deepcopy(state) if state else ValidatorSessionState()
+
+    async def record(
+        self,
+        session_id: str,
+        question: str,
+        concepts: Dict[str, Sequence[Any]],
+        patterns: Sequence[str],
+    ) -> None:
+        """Record a served question, its concepts and matched patterns (pipelined)."""
+        redis = await self._get_redis()
+        if redis:
+            hist_key, pat_key, concept_keys = self._keys(session_id)
+            try:
+                pipe = redis.pipeline(transaction=False)
+                pipe.rpush(hist_key, question)
+                pipe.ltrim(hist_key, -self.max_history, -1)
+                pipe.expire(hist_key, self.ttl)
+                for pattern in patterns:
+                    pipe.hincrby(pat_key, pattern, 1)
+                if patterns:
+                    pipe.expire(pat_key, self.ttl)
+                for name, values in concepts.items():
+                    if not values:
+                        continue
+                    key = concept_keys[name]
+                    for value in values:
+                        # Move re-used concepts to the most recent end
+                        pipe.lrem(key, 0, value)
+                        pipe.rpush(key, value)
+                    pipe.ltrim(key, -self.max_concepts, -1)
+                    pipe.expire(key, self.ttl)
+                await pipe.execute()
+                return
+            except Exception as e:
+                print(f"[ValidatorStateStore] Redis write failed: {e}")
+
+        state = self._local_get(session_id) or ValidatorSessionState()
+        state.apply(question, concepts, patterns, self.max_history, self.max_concepts)
+        self._local_set(session_id, state)
+
+    async def clear(self, session_id: str) -> None:
+        """Drop all state for a session."""
+        self._local.pop(session_id, None)
+        redis = await self._get_redis()
+        if redis:
+            hist_key, pat_key, concept_keys = self._keys(session_id)
+            try:
+                await redis.delete(hist_key, pat_key, *concept_keys.values())
+            except Exception as e:
+                print(f"[ValidatorStateStore] Redis delete failed: {e}")
+
+
+# Singleton store shared by all ValidatorAgent instances
+_validator_state: Optional[ValidatorStateStore] = None
+
+
+def get_validator_state() -> ValidatorStateStore:
+    """Get the shared validator state store."""
+    global _validator_state
+    if _validator_state is None:
+        _validator_state = ValidatorStateStore()
+    return _validator_state
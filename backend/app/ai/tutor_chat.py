@@ -4,7 +4,7 @@ LangChain-based conversational agent for real-time student support
 """
 import uuid
 import logging
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, AsyncIterator, Tuple
 from datetime import datetime
 
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
@@ -13,6 +13,9 @@ from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from app.core.config import settings
 from app.ai.core.safety_pipeline import get_safety_pipeline, SafetyAction
 from app.ai.core.observability import get_observer
+from app.ai.core.rate_limiter import LLMPriority, get_rate_limiter, estimate_tokens
+from app.ai.core.llm import LLMClient
+from app.ai.core.stream_moderator import StreamBlockedError
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +59,7 @@ Format them as a JSON array at the very end of your response like this:
 
     def __init__(self):
         self._llm = None
+        self._stream_client = None
         # In-memory session storage (use Redis in production)
         self._sessions: Dict[str, List[dict]] = {}
 
@@ -63,7 +67,10 @@ Format them as a JSON array at the very end of your response like this:
     def llm(self):
         """Lazy load the LLM based on configuration."""
         if self._llm is None:
-            if settings.LLM_PROVIDER == "openai":
+            if settings.LLM_PROVIDER == "fake":
+                from app.ai.core.fake_provider import FakeChatModel
+                self._llm = FakeChatModel(temperature=0.7)
+            elif settings.LLM_PROVIDER == "openai":
                 from langchain_openai import ChatOpenAI
                 self._llm = ChatOpenAI(
                     model=settings.OPENAI_MODEL,
@@ -81,6 +88,13 @@ Format them as a JSON array at the very end of your response like this:
                 )
         return self._llm
 
+    @property
+    def stream_client(self) -> LLMClient:
+        """Lazy load the LLMClient used for streamed responses."""
+        if self._stream_client is None:
+            self._stream_client = LLMClient(temperature=0.7, enable_cache=False)
+        return self._stream_client
+
     def _get_session(self, session_id: str) -> List[dict]:
         """Get or create a chat session."""
         if session_id not in self._sessions:
@@ -99,26 +113,72 @@ Format them as a JSON array at the very end of your response like this:
         if len(session) > 10:
             self._sessions[session_id] = session[-10:]
 
-    def _build_messages(self, session_id: str, context: str, grade_level: int):
-        """Build the message list for the LLM."""
-        messages = [
-            SystemMessage(content=self.SYSTEM_PROMPT.format(
-                context=context,
-                grade_level=grade_level
-            ))
-        ]
+    def _build_messages(
+        self,
+        session_id: str,
+        context: str,
+        grade_level: int,
+        safe_message: str,
+        image_attachment: Optional[str] = None,
+    ) -> list:
+        """
+        Build the message list for the LLM.
+        
+        Expects the current (sanitized) user message to already be the last
+        entry in the session; it is re-added with the image if one is attached.
+        """
+        # Build system prompt with optional vision instructions
+        system_content = self.SYSTEM_PROMPT.format(
+            context=context,
+            grade_level=grade_level
+        )
+        
+        if image_attachment:
+            system_content += """
+
+VISION MODE:
+The student has shared an image. First, carefully analyze the image.
+- If it's a math problem: Solve it step-by-step, showing your work.
+- If it's a diagram or chart: Explain what you see.
+- If it's handwritten text: Transcribe and respond to it.
+- If it's unclear: Ask the student to clarify or take a clearer photo."""
         
+        messages = [SystemMessage(content=system_content)]
+        
+        # Add history
         session = self._get_session(session_id)
-        for msg in session:
+        for msg in session[:-1]:  # Exclude the message we just added
             if msg["role"] == "user":
                 messages.append(HumanMessage(content=msg["content"]))
             else:
-                # Strip suggestions from previous AI responses
                 content = msg["content"]
                 if "[SUGGESTIONS:" in content:
                     content = content.split("[SUGGESTIONS:")[0].strip()
                 messages.append(AIMessage(content=content))
         
+        # Add current message - with image if attached
+        if image_attachment:
+            # GPT-4o Vision format: content as list of parts
+            message_content = [
+                {"type": "text", "text": safe_message or "Please analyze this image."},
+            ]
+            
+            # Determine if base64 or URL
+            if image_attachment.startswith("data:") or image_attachment.startswith("http"):
+                image_url = image_attachment
+            else:
+                # Assume base64, add data URI prefix
+                image_url = f"data:image/jpeg;base64,{image_attachment}"
+            
+            message_content.append({
+                "type": "image_url",
+                "image_url": {"url": image_url, "detail": "high"}
+            })
+            
+            messages.append(HumanMessage(content=message_content))
+        else:
+            messages.append(HumanMessage(content=safe_message))
+        
         return messages
 
     def _parse_suggestions(self, response: str) -> tuple[str, List[str]]:
@@ -220,61 +280,21 @@ Format them as a JSON array at the very end of your response like this:
             # Add user message to session
             self._add_to_session(session_id, "user", safe_message)
             
-            # Build system prompt with optional vision instructions
-            system_content = self.SYSTEM_PROMPT.format(
-                context=context,
-                grade_level=grade_level
+            messages = self._build_messages(
+                session_id, context, grade_level, safe_message, image_attachment
             )
             
-            if image_attachment:
-                system_content += """
-
-VISION MODE:
-The student has shared an image. First, carefully analyze the image.
-- If it's a math problem: Solve it step-by-step, showing your work.
-- If it's a diagram or chart: Explain what you see.
-- If it's handwritten text: Transcribe and respond to it.
-- If it's unclear: Ask the student to clarify or take a clearer photo."""
-            
-            messages = [SystemMessage(content=system_content)]
-            
-            # Add history
-            session = self._get_session(session_id)
-            for msg in session[:-1]:  # Exclude the message we just added
-                if msg["role"] == "user":
-                    messages.append(HumanMessage(content=msg["content"]))
-                else:
-                    content = msg["content"]
-                    if "[SUGGESTIONS:" in content:
-                        content = content.split("[SUGGESTIONS:")[0].strip()
-                    messages.append(AIMessage(content=content))
-            
-            # Add current message - with image if attached
-            if image_attachment:
-                # GPT-4o Vision format: content as list of parts
-                message_content = [
-                    {"type": "text", "text": safe_message or "Please analyze this image."},
-                ]
-                
-                # Determine if base64 or URL
-                if image_attachment.startswith("data:") or image_attachment.startswith("http"):
-                    image_url = image_attachment
-                else:
-                    # Assume base64, add data URI prefix
-                    image_url = f"data:image/jpeg;base64,{image_attachment}"
-                
-                message_content.append({
-                    "type": "image_url",
-                    "image_url": {"url": image_url, "detail": "high"}
-                })
-                
-                messages.append(HumanMessage(content=message_content))
-            else:
-                messages.append(HumanMessage(content=safe_message))
-            
             # === LLM CALL with tracing ===
             llm_span = observer.create_span(trace, "llm_invoke")
-            response = await self.llm.ainvoke(messages)
+            model = settings.LLM_MODEL
+            estimated = sum(estimate_tokens(str(m.content)) for m in messages)
+            async with get_rate_limiter().limit(
+                settings.LLM_PROVIDER,
+                model,
+                estimated + settings.LLM_RATE_LIMIT_COMPLETION_ESTIMATE,
+                LLMPriority.INTERACTIVE,
+            ):
+                response = await self.llm.ainvoke(messages)
             response_text = response.content
             if llm_span:
                 llm_span.end(output={"response_length": len(response_text)})
@@ -314,6 +334,86 @@ The student has shared an image. First, carefully analyze the image.
                 trace.update(output={"error": str(e)})
             raise
 
+    async def chat_stream(
+        self,
+        message: str,
+        context: str = "General tutoring session",
+        grade_level: int = 1,
+        session_id: Optional[str] = None,
+        image_attachment: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Streaming variant of chat().
+        
+        Yields (event, data) tuples:
+        - ("token", {"text": ...}) for each moderated chunk of the answer
+        - ("replace", {"text": ...}) if moderation blocks the answer part-way;
+          the client should discard what it has shown and use this text
+        - ("done", {"session_id": ..., "suggestions": [...], "blocked": bool})
+        
+        Output moderation runs incrementally inside LLMClient.stream_messages,
+        and the trailing [SUGGESTIONS: ...] block is never streamed.
+        """
+        if session_id is None:
+            session_id = str(uuid.uuid4())
+        
+        safety_pipeline = get_safety_pipeline()
+        safety_result = await safety_pipeline.validate_input(
+            text=message,
+            grade=grade_level,
+            student_id=user_id
+        )
+        
+        if safety_result.action == SafetyAction.BLOCK:
+            logger.warning(f"Input blocked for user {user_id}: {safety_result.block_reason}")
+            yield "token", {"text": "I can't help with that request. Let's focus on learning together! 📚 What would you like to study?"}
+            yield "done", {
+                "session_id": session_id,
+                "suggestions": ["Help me with math", "Explain a science concept"],
+                "blocked": True
+            }
+            return
+        
+        safe_message = safety_result.processed_text
+        self._add_to_session(session_id, "user", safe_message)
+        messages = self._build_messages(
+            session_id, context, grade_level, safe_message, image_attachment
+        )
+        
+        full_text = ""
+        emitted = 0
+        marker = "[SUGGESTIONS:"
+        try:
+            async for delta in self.stream_client.stream_messages(
+                messages,
+                agent_name="TutorChatAgent",
+                priority=LLMPriority.INTERACTIVE,
+                grade=grade_level,
+            ):
+                full_text += delta
+                marker_at = full_text.find(marker)
+                # Hold back enough characters to never emit a partial marker
+                visible_end = marker_at if marker_at >= 0 else len(full_text) - len(marker)
+                if visible_end > emitted:
+                    yield "token", {"text": full_text[emitted:visible_end]}
+                    emitted = visible_end
+        except StreamBlockedError as e:
+            logger.warning(f"Streamed output blocked for user {user_id}: {e.reason}")
+            fallback = safety_pipeline._get_fallback_response(e.categories)
+            self._add_to_session(session_id, "assistant", fallback)
+            yield "replace", {"text": fallback}
+            yield "done", {"session_id": session_id, "suggestions": [], "blocked": True}
+            return
+        
+        clean_response, suggestions = self._parse_suggestions(full_text)
+        remainder = clean_response[emitted:]
+        if remainder:
+            yield "token", {"text": remainder}
+        
+        self._add_to_session(session_id, "assistant", clean_response)
+        yield "done", {"session_id": session_id, "suggestions": suggestions, "blocked": False}
+
     def get_session_history(self, session_id: str) -> List[dict]:
         """Get the chat history for a session."""
         return self._get_session(session_id)
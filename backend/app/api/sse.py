@@ -0,0 +1,40 @@
+"""
+AI Tutor Platform - Server-Sent Events helpers
+Formatting and response wrapper for streaming endpoints.
+"""
+import json
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event with a JSON payload."""
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """
+    Wrap an async iterator of (event, data) tuples as a text/event-stream.
+
+    Unhandled errors are reported as a final "error" event instead of
+    cutting the connection mid-stream.
+    """
+    async def body():
+        try:
+            async for event, data in events:
+                yield sse_event(event, data)
+        except Exception as e:
+            print(f"[SSE] Stream failed: {e}")
+            yield sse_event("error", {"detail": "Something went wrong. Please try again."})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering (nginx)
+        },
+    )
@@ -104,6 +104,8 @@ async def start_assessment(
         
         # Convert to AssessmentQuestion format
         for i, q_data in enumerate(questions_batch[:5]):
+            if q_data is None:
+                continue  # Slot the batch could not fill
             questions.append(AssessmentQuestion(
                 question_id=f"q_{i}_{uuid.uuid4().hex[:8]}",
                 question=q_data.question,
@@ -24,6 +24,7 @@ from app.schemas.chat import (
     ChatRole
 )
 from app.ai.tutor_chat import tutor_chat
+from app.api.sse import sse_response
 
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
@@ -130,6 +131,33 @@ async def ask_tutor(
     )
 
 
+@router.post("/ask/stream")
+async def ask_tutor_stream(
+    request: ChatRequest,
+    student: Student = Depends(get_student_profile),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Streaming variant of /ask using Server-Sent Events.
+    
+    Events:
+    - token: {"text": "..."} - next chunk of the answer
+    - replace: {"text": "..."} - moderation stopped the answer; show this instead
+    - done: {"session_id": "...", "suggestions": [...], "blocked": false}
+    - error: {"detail": "..."}
+    """
+    context = await build_context(request.context_type, request.context_id, db)
+    grade_level = student.grade_level or 1
+    
+    return sse_response(tutor_chat.chat_stream(
+        message=request.message,
+        context=context,
+        grade_level=grade_level,
+        session_id=str(request.session_id) if request.session_id else None,
+        image_attachment=request.image_attachment
+    ))
+
+
 @router.get("/history/{session_id}", response_model=ChatHistoryResponse)
 async def get_chat_history(
     session_id: uuid.UUID,
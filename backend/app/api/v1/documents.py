@@ -37,12 +37,19 @@ class DocumentResponse(BaseModel):
     chunk_count: int
     total_tokens: int
     error_message: Optional[str] = None
+    processing_stage: Optional[str] = None
+    processing_progress: int = 0
     created_at: str
     
     class Config:
         from_attributes = True
 
 
+class DocumentUploadResponse(DocumentResponse):
+    """Accepted upload; poll GET /documents/{id} until status is final."""
+    job_id: str
+
+
 class DocumentListResponse(BaseModel):
     """Response for document listing."""
     documents: List[DocumentResponse]
@@ -83,11 +90,32 @@ class SearchResponse(BaseModel):
     query: str
 
 
+def _document_response(document) -> DocumentResponse:
+    """DocumentResponse from a UserDocument."""
+    return DocumentResponse(
+        id=str(document.id),
+        filename=document.filename,
+        original_filename=document.original_filename,
+        file_type=document.file_type,
+        file_size=document.file_size,
+        subject=document.subject,
+        grade_level=document.grade_level,
+        description=document.description,
+        status=document.status.value if isinstance(document.status, DocumentStatus) else document.status,
+        chunk_count=document.chunk_count,
+        total_tokens=document.total_tokens,
+        error_message=document.error_message,
+        processing_stage=document.processing_stage,
+        processing_progress=document.processing_progress or 0,
+        created_at=document.created_at.isoformat(),
+    )
+
+
 # =============================================================================
 # ENDPOINTS
 # =============================================================================
 
-@router.post("/upload", response_model=DocumentResponse)
+@router.post("/upload", response_model=DocumentUploadResponse, status_code=202)
 async def upload_document(
     file: UploadFile = File(...),
     subject: Optional[str] = Form(None),
@@ -102,11 +130,15 @@ async def upload_document(
     
     Supported formats: PDF, DOCX, TXT, MD
     
-    The document will be:
-    1. Saved to storage
-    2. Text extracted
-    3. Chunked into segments
-    4. Embedded for vector search
+    The document is saved and a background ingestion job is queued;
+    the response (202) carries the job ID. The job then:
+    1. Extracts text
+    2. Chunks it into segments
+    3. Embeds them for vector search
+    4. Validates grade-appropriateness
+    
+    Poll GET /documents/{id} for status, processing_stage and
+    processing_progress.
     """
     # Validate file type
     allowed_extensions = {".pdf", ".docx", ".txt", ".md", ".markdown"}
@@ -129,7 +161,7 @@ async def upload_document(
             detail=f"File too large. Maximum size: 10MB"
         )
     
-    # Process document
+    # Store and queue for ingestion
     service = get_document_service(db)
     
     try:
@@ -143,26 +175,15 @@ async def upload_document(
             description=description,
         )
         
-        return DocumentResponse(
-            id=str(document.id),
-            filename=document.filename,
-            original_filename=document.original_filename,
-            file_type=document.file_type,
-            file_size=document.file_size,
-            subject=document.subject,
-            grade_level=document.grade_level,
-            description=document.description,
-            status=document.status.value if isinstance(document.status, DocumentStatus) else document.status,
-            chunk_count=document.chunk_count,
-            total_tokens=document.total_tokens,
-            error_message=document.error_message,
-            created_at=document.created_at.isoformat(),
+        return DocumentUploadResponse(
+            **_document_response(document).model_dump(),
+            job_id=str(document.id),
         )
         
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to process document: {str(e)}"
+            detail=f"Failed to upload document: {str(e)}"
         )
 
 
@@ -189,21 +210,7 @@ async def list_documents(
     
     return DocumentListResponse(
         documents=[
-            DocumentResponse(
-                id=str(doc.id),
-                filename=doc.filename,
-                original_filename=doc.original_filename,
-                file_type=doc.file_type,
-                file_size=doc.file_size,
-                subject=doc.subject,
-                grade_level=doc.grade_level,
-                description=doc.description,
-                status=doc.status.value if isinstance(doc.status, DocumentStatus) else doc.status,
-                chunk_count=doc.chunk_count,
-                total_tokens=doc.total_tokens,
-                error_message=doc.error_message,
-                created_at=doc.created_at.isoformat(),
-            )
+            _document_response(doc)
             for doc in documents
         ],
         total=len(documents),
@@ -224,21 +231,7 @@ async def get_document(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    return DocumentResponse(
-        id=str(document.id),
-        filename=document.filename,
-        original_filename=document.original_filename,
-        file_type=document.file_type,
-        file_size=document.file_size,
-        subject=document.subject,
-        grade_level=document.grade_level,
-        description=document.description,
-        status=document.status.value if isinstance(document.status, DocumentStatus) else document.status,
-        chunk_count=document.chunk_count,
-        total_tokens=document.total_tokens,
-        error_message=document.error_message,
-        created_at=document.created_at.isoformat(),
-    )
+    return _document_response(document)
 
 
 @router.delete("/{document_id}")
@@ -292,34 +285,25 @@ async def search_documents(
     """
     Search documents using semantic similarity.
     
-    Generates an embedding for the query and finds similar chunks.
+    Generates an embedding for the query and finds similar chunks; exact
+    keyword matches are fused in when RAG_HYBRID_SEARCH is on. Repeated
+    queries are served from the retrieval cache.
     """
-    from langchain_openai import OpenAIEmbeddings
-    from app.core.config import settings
+    service = get_document_service(db)
     
-    # Generate query embedding
     try:
-        embeddings_model = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=settings.OPENAI_API_KEY
+        results = await service.retrieve(
+            query=request.query,
+            user_id=str(current_user.id),
+            document_id=request.document_id,
+            limit=request.limit,
         )
-        query_embedding = await embeddings_model.aembed_query(request.query)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate query embedding: {str(e)}"
         )
     
-    # Search
-    service = get_document_service(db)
-    
-    results = await service.search_chunks(
-        query_embedding=query_embedding,
-        user_id=str(current_user.id),
-        document_id=request.document_id,
-        limit=request.limit,
-    )
-    
     return SearchResponse(
         results=[SearchResult(**r) for r in results],
         query=request.query,
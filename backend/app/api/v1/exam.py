@@ -118,7 +118,7 @@ async def start_exam(
         
         
         # Convert to ExamQuestion format
-        # Questions come back in same order as topic_distribution
+        # Questions come back aligned with the topic_distribution slots
         questions: list[ExamQuestion] = []
         q_idx = 0
         
@@ -126,8 +126,8 @@ async def start_exam(
             topic_obj = topic_objects[topic_idx]
             
             for _ in range(count):
-                if q_idx < len(questions_batch):
-                    q_data = questions_batch[q_idx]
+                q_data = questions_batch[q_idx] if q_idx < len(questions_batch) else None
+                if q_data is not None:
                     questions.append(ExamQuestion(
                         question_id=f"exam_q_{q_idx}_{uuid.uuid4().hex[:8]}",
                         question=q_data.question,
@@ -135,7 +135,7 @@ async def start_exam(
                         topic_id=str(topic_obj.id),
                         topic_name=topic_obj.name
                     ))
-                    q_idx += 1
+                q_idx += 1
 
                 
     except Exception as e:
@@ -13,7 +13,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import CurrentUser, DbSession
 from app.core.config import settings
 from app.models.curriculum import Subject, Topic, Subtopic
-from app.models.user import User
+from app.models.user import Student, User
+from app.services.practice_queue import get_practice_store
+from app.services.question_bank import bank_question_to_dict, get_question_bank
+from app.ai.core.rate_limiter import LLMPriority
 from app.ai.agents.feedback import feedback_agent, FeedbackType
 
 router = APIRouter(prefix="/practice", tags=["Practice"])
@@ -67,21 +70,9 @@ class PracticeSessionFeedback(BaseModel):
     next_topic_suggestion: Optional[str] = None
 
 
-# Simple in-memory storage for demo (replace with Redis in production)
-_active_questions: dict[str, dict] = {}
-
-# Track recent questions per student to avoid repetition (stores last 5 question texts)
-_recent_questions: dict[str, list[str]] = {}
-MAX_RECENT_QUESTIONS = 5
-
-# Track session answers per student for session feedback
-_session_answers: dict[str, list[dict]] = {}  # {user_id: [{question, answer, correct_answer, is_correct}]}
-
-# BATCH PRE-FETCHING: Question queue per user/subtopic
-# Key: "{user_id}_{subtopic_id}", Value: list of pre-generated question dicts
-_question_queue: dict[str, list[dict]] = {}
-BATCH_SIZE = 5  # Generate 5 questions at once (10 was timing out)
-REFILL_THRESHOLD = 2  # Refill when queue drops to 2
+# Practice state (question queues, served questions, recent questions and
+# session answers) lives in the shared store so every worker sees it.
+BATCH_SIZE = settings.PRACTICE_QUEUE_BATCH_SIZE  # Questions generated per refill (10 was timing out)
 
 
 @router.post("/start", response_model=QuestionResponse)
@@ -163,66 +154,99 @@ async def start_practice(
     
     # Get user's recent questions for duplicate checking
     user_id = str(current_user.id)
-    recent_questions = _recent_questions.get(user_id, [])
+    store = get_practice_store()
+    recent_questions = await store.get_recent_questions(user_id)
     
-    # Try to generate with AI first
-    MAX_RETRIES = 3
     question_data = None
     difficulty_str = subtopic.difficulty.value if hasattr(subtopic.difficulty, 'value') else str(subtopic.difficulty)
     
     # Try AI generation using BATCH PRE-FETCHING
-    if settings.OPENAI_API_KEY or settings.ANTHROPIC_API_KEY:
+    if settings.LLM_CONFIGURED:
         try:
             from app.ai.agents.examiner import examiner_agent as question_generator
             
-            # Build queue key
-            queue_key = f"{user_id}_{subtopic.id}"
+            # Plain values only: the batch may be generated after this request ends
+            subject_name, topic_name, subtopic_name = subject.name, topic.name, subtopic.name
+            subtopic_uuid = subtopic.id
+            subtopic_id = str(subtopic.id)
+            grade = topic.grade_level or 1
+            result = await db.execute(
+                select(Student.id).where(Student.parent_id == current_user.id).limit(1)
+            )
+            student_id = result.scalar_one_or_none()
             
-            # Check if we have questions in queue
-            if queue_key not in _question_queue or len(_question_queue[queue_key]) == 0:
-                # Generate a BATCH of 10 questions at once!
-                print(f"🚀 Generating batch of {BATCH_SIZE} questions for: {subject.name} > {topic.name} > {subtopic.name}")
-                
-                # Build topic distribution for batch
-                topic_distribution = [(topic.name, subtopic.name, BATCH_SIZE)]
-                
-                # Generate all 10 questions in ONE call
-                batch = await question_generator.generate_batch(
-                    subject=subject.name,
-                    topic_distribution=topic_distribution,
-                    difficulty_distribution=[difficulty_str] * BATCH_SIZE,
-                    grade=topic.grade_level or 1,
-                    session_id=f"practice_{user_id}_{subtopic.id}"
-                )
-                
-                # Convert to queue format
-                _question_queue[queue_key] = []
-                for gen in batch:
-                    _question_queue[queue_key].append({
-                        "question": gen.question,
-                        "answer": gen.answer,
-                        "correct_answers": gen.correct_answers,
-                        "options": gen.options or [],
-                        "hint": gen.hint,
-                        "explanation": gen.explanation,
-                        "subject": subject.name,
-                        "topic": topic.name,
-                        "subtopic": subtopic.name,
-                        "subtopic_id": subtopic.id,
-                        "difficulty": difficulty_str,
-                        "question_type": gen.question_type or "multiple_choice",
-                    })
-                
-                print(f"✅ Generated {len(_question_queue[queue_key])} questions, ready to serve!")
+            def to_queue_item(data: dict) -> dict:
+                return {
+                    **data,
+                    "subject": subject_name,
+                    "topic": topic_name,
+                    "subtopic": subtopic_name,
+                    "subtopic_id": subtopic_id,
+                    "difficulty": difficulty_str,
+                    "question_type": data.get("question_type") or "multiple_choice",
+                }
             
-            # Pop a question from queue
-            if _question_queue[queue_key]:
-                question_data = _question_queue[queue_key].pop(0)
-                print(f"📋 Serving from queue ({len(_question_queue[queue_key])} remaining): {question_data['question'][:50]}...")
+            async def generate_batch() -> list[dict]:
+                # Runs outside the request, so it uses its own session
+                from app.core.database import async_session_maker
                 
-                # Check if we need to refill (background refill when low)
-                if len(_question_queue[queue_key]) <= REFILL_THRESHOLD:
-                    print(f"⚠️ Queue low ({len(_question_queue[queue_key])} left), will refill on next request")
+                async with async_session_maker() as session:
+                    bank = get_question_bank(session)
+                    
+                    # 1. Questions other students already generated
+                    drawn = []
+                    if settings.QUESTION_BANK_ENABLED:
+                        drawn = await bank.draw(
+                            subtopic_uuid, grade, difficulty_str, BATCH_SIZE, student_id=student_id
+                        )
+                    served = drawn
+                    
+                    # 2. Top up from the LLM, banking the results for everyone
+                    generated = []
+                    if len(drawn) < BATCH_SIZE:
+                        print(f"🚀 Generating batch of {BATCH_SIZE} questions for: {subject_name} > {topic_name} > {subtopic_name}")
+                        batch = await question_generator.generate_batch(
+                            subject=subject_name,
+                            topic_distribution=[(topic_name, subtopic_name, BATCH_SIZE)],
+                            difficulty_distribution=[difficulty_str] * BATCH_SIZE,
+                            grade=grade,
+                            session_id=f"practice_{user_id}_{subtopic_id}",
+                            priority=LLMPriority.BATCH,  # Background refill; yields to live requests
+                        )
+                        batch = [gen for gen in batch if gen]  # Unfilled slots are None
+                        if settings.QUESTION_BANK_ENABLED:
+                            banked = await bank.add_questions(
+                                subtopic_uuid, grade, batch, difficulty=difficulty_str
+                            )
+                            served = drawn + banked
+                        if not settings.QUESTION_BANK_ENABLED or not served:
+                            generated = [
+                                {
+                                    "question": gen.question,
+                                    "answer": gen.answer,
+                                    "correct_answers": gen.correct_answers,
+                                    "options": gen.options or [],
+                                    "hint": gen.hint,
+                                    "explanation": gen.explanation,
+                                    "question_type": gen.question_type,
+                                }
+                                for gen in batch
+                            ]
+                    else:
+                        print(f"🏦 Serving {len(drawn)} banked questions for: {subject_name} > {topic_name} > {subtopic_name}")
+                    
+                    await bank.mark_served(served, student_id=student_id)
+                    await session.commit()
+                    return [to_queue_item(bank_question_to_dict(q)) for q in served] + [
+                        to_queue_item(g) for g in generated
+                    ]
+            
+            # Serve from the queue; it refills in the background when low
+            question_data = await store.next_question(
+                store.queue_key(user_id, subtopic_id), generate_batch
+            )
+            if question_data:
+                print(f"📋 Serving from queue: {question_data['question'][:50]}...")
             
         except Exception as e:
             print(f"⚠️ Batch generation failed: {e}, will fallback to mock questions")
@@ -369,7 +393,7 @@ async def start_practice(
             "subject": subject.name,
             "topic": topic.name,
             "subtopic": subtopic.name,
-            "subtopic_id": subtopic.id,
+            "subtopic_id": str(subtopic.id),
             "difficulty": difficulty_str,
             "question_type": "multiple_choice",
         }
@@ -392,19 +416,11 @@ async def start_practice(
     # ============================================================
     question_text = question_data["question"]
     
-    # Add to recent questions list
-    if user_id in _recent_questions:
-        _recent_questions[user_id].append(question_text)
-        # Keep only last N questions
-        if len(_recent_questions[user_id]) > MAX_RECENT_QUESTIONS:
-            _recent_questions[user_id].pop(0)
-    else:
-        _recent_questions[user_id] = [question_text]
-    
-    print(f"📝 Recent questions for user: {len(_recent_questions[user_id])} tracked")
+    tracked = await store.add_recent_question(user_id, question_text)
+    print(f"📝 Recent questions for user: {tracked} tracked")
     
     # Store for answer validation
-    _active_questions[question_id] = question_data
+    await store.save_active_question(question_id, question_data)
     
     return QuestionResponse(
         question_id=question_id,
@@ -432,7 +448,8 @@ async def submit_answer(
     from app.models.curriculum import Progress, Subtopic
     from app.models.user import Student, UserRole
     
-    question_data = _active_questions.get(request.question_id)
+    store = get_practice_store()
+    question_data = await store.get_active_question(request.question_id)
     
     if not question_data:
         raise HTTPException(
@@ -469,7 +486,7 @@ async def submit_answer(
     
     # Try AI evaluation
     try:
-        if settings.OPENAI_API_KEY or settings.ANTHROPIC_API_KEY:
+        if settings.LLM_CONFIGURED:
             from app.ai.agents.grader import answer_evaluator  # BaseAgent-compliant alias
             
             evaluation = await answer_evaluator.evaluate(
@@ -522,7 +539,7 @@ async def submit_answer(
             
         # 2. Update Progress if we have subtopic_id
         if "subtopic_id" in question_data:
-            subtopic_id = question_data["subtopic_id"]
+            subtopic_id = UUID(str(question_data["subtopic_id"]))
             
             # Fetch existing progress
             result = await db.execute(
@@ -583,10 +600,7 @@ async def submit_answer(
     
     # Track session answer for end-of-session feedback
     user_id = str(current_user.id)
-    if user_id not in _session_answers:
-        _session_answers[user_id] = []
-    
-    _session_answers[user_id].append({
+    await store.add_session_answer(user_id, {
         "question": question_data["question"],
         "answer": request.answer,
         "correct_answer": correct_answer,
@@ -596,7 +610,7 @@ async def submit_answer(
     })
     
     # Clean up
-    del _active_questions[request.question_id]
+    await store.delete_active_question(request.question_id)
     
     return AnswerFeedback(
         is_correct=is_correct,
@@ -620,7 +634,8 @@ async def end_session(
     user_id = str(current_user.id)
     
     # Get session answers
-    session_answers = _session_answers.get(user_id, [])
+    store = get_practice_store()
+    session_answers = await store.get_session_answers(user_id)
     
     if not session_answers:
         return PracticeSessionFeedback(
@@ -698,6 +713,6 @@ async def end_session(
         )
     
     # Clear session answers after generating feedback
-    _session_answers[user_id] = []
+    await store.clear_session_answers(user_id)
     
     return response
@@ -11,7 +11,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, async_session_maker
 from app.api.deps import get_current_user
 from app.models.user import User, Student
 from app.models.curriculum import Topic, Subtopic
@@ -27,6 +27,9 @@ from app.schemas.lesson import (
 )
 from app.services.learning_path import LearningPathService
 from app.ai.agents.lesson import lesson_agent  # Compliant with Safety Pipeline via BaseAgent
+from app.ai.core.llm import parse_json_content
+from app.ai.core.stream_moderator import StreamBlockedError
+from app.api.sse import sse_response
 
 
 def sanitize_lesson_content(content: dict) -> dict:
@@ -226,23 +229,38 @@ async def get_or_generate_lesson(
         await db.commit()
         await db.refresh(lesson)
     
-    # Check student's completion status
+    progress = await _start_lesson_progress(db, student.id, lesson.id)
+    return _lesson_response(lesson, progress)
+
+
+async def _start_lesson_progress(
+    db: AsyncSession,
+    student_id: uuid.UUID,
+    lesson_id: uuid.UUID
+) -> StudentLessonProgress:
+    """Get the student's progress for a lesson, creating it (start tracking) if missing."""
     progress_query = select(StudentLessonProgress).where(
-        StudentLessonProgress.student_id == student.id,
-        StudentLessonProgress.lesson_id == lesson.id
+        StudentLessonProgress.student_id == student_id,
+        StudentLessonProgress.lesson_id == lesson_id
     )
     progress_result = await db.execute(progress_query)
     progress = progress_result.scalar_one_or_none()
     
-    # Create or update progress record (start tracking)
     if not progress:
         progress = StudentLessonProgress(
-            student_id=student.id,
-            lesson_id=lesson.id
+            student_id=student_id,
+            lesson_id=lesson_id
         )
         db.add(progress)
         await db.commit()
     
+    return progress
+
+
+def _lesson_response(
+    lesson: GeneratedLesson,
+    progress: Optional[StudentLessonProgress]
+) -> LessonResponse:
     return LessonResponse(
         id=lesson.id,
         subtopic_id=lesson.subtopic_id,
@@ -256,6 +274,94 @@ async def get_or_generate_lesson(
     )
 
 
+@router.get("/lesson/{subtopic_id}/stream")
+async def stream_lesson(
+    subtopic_id: uuid.UUID,
+    student: Student = Depends(get_student_profile),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Streaming variant of GET /lesson/{subtopic_id} using Server-Sent Events.
+    
+    An existing lesson is sent straight away as a single "lesson" event.
+    Otherwise the generated lesson JSON is streamed as "token" events
+    ({"text": "..."}) while it is written, then saved and sent as a final
+    "lesson" event. Moderation or parsing failures end with an "error" event.
+    """
+    subtopic_query = select(Subtopic).options(
+        selectinload(Subtopic.topic).selectinload(Topic.subject)
+    ).where(Subtopic.id == subtopic_id)
+    subtopic_result = await db.execute(subtopic_query)
+    subtopic = subtopic_result.scalar_one_or_none()
+    
+    if not subtopic:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Subtopic not found"
+        )
+    
+    grade_level = student.grade_level or subtopic.topic.grade_level
+    student_id = student.id
+    
+    lesson_query = select(GeneratedLesson).where(
+        GeneratedLesson.subtopic_id == subtopic_id,
+        GeneratedLesson.grade_level == grade_level
+    )
+    lesson_result = await db.execute(lesson_query)
+    lesson = lesson_result.scalar_one_or_none()
+    
+    if lesson:
+        progress = await _start_lesson_progress(db, student_id, lesson.id)
+        response = _lesson_response(lesson, progress)
+        
+        async def cached_events():
+            yield "lesson", response
+        
+        return sse_response(cached_events())
+    
+    subject_name = subtopic.topic.subject.name
+    topic_name = subtopic.topic.name
+    subtopic_name = subtopic.name
+    
+    async def generated_events():
+        raw = ""
+        try:
+            async for delta in lesson_agent.stream(
+                subject=subject_name,
+                topic=topic_name,
+                subtopic=subtopic_name,
+                grade=grade_level,
+                style="story"  # Default style
+            ):
+                raw += delta
+                yield "token", {"text": delta}
+            content = lesson_agent.normalize(parse_json_content(raw))
+        except StreamBlockedError as e:
+            yield "error", {"detail": "This lesson couldn't be generated safely. Please try again.", "reason": e.reason}
+            return
+        except ValueError:  # Includes JSONDecodeError
+            yield "error", {"detail": "The lesson came back incomplete. Please try again."}
+            return
+        
+        # The request's session is closed once streaming starts; use a fresh one
+        async with async_session_maker() as session:
+            new_lesson = GeneratedLesson(
+                subtopic_id=subtopic_id,
+                grade_level=grade_level,
+                title=content.get("title", f"Learning {subtopic_name}"),
+                content=content,
+                generated_by="LessonAgent"
+            )
+            session.add(new_lesson)
+            await session.commit()
+            await session.refresh(new_lesson)
+            
+            progress = await _start_lesson_progress(session, student_id, new_lesson.id)
+            yield "lesson", _lesson_response(new_lesson, progress)
+    
+    return sse_response(generated_events())
+
+
 @router.post("/lesson/{lesson_id}/complete", response_model=LessonProgressResponse)
 async def complete_lesson(
     lesson_id: uuid.UUID,
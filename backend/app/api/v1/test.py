@@ -15,6 +15,7 @@ from app.api.deps import get_current_user
 from app.models.user import User, Student
 from app.models.curriculum import Topic, Subtopic
 from app.models.test import TestResult
+from app.services.question_bank import get_question_bank
 from app.schemas.test import (
     TestStartRequest,
     TestStartResponse,
@@ -115,40 +116,52 @@ async def start_test(
     # Create shared session
     test_session_id = f"test_{uuid.uuid4().hex}"
     
-    # Build topic distribution for batch generation
-    topic_distribution = []
+    # One slot per question: (subtopic, difficulty), grouped by subtopic
+    slots: list[tuple[Subtopic, QuestionDifficulty]] = []
     for i, subtopic in enumerate(subtopics):
         count = questions_per_subtopic + (1 if i < remainder else 0)
-        topic_distribution.append((topic.name, subtopic.name, count))
-    
-    try:
-        # Generate all 10 questions in ONE batch
-        questions_batch = await question_generator.generate_batch(
+        for _ in range(count):
+            slots.append((subtopic, difficulty_distribution[len(slots)]))
+    grade = student.grade_level or topic.grade_level or 1
+    
+    async def generate(missing: list[int]) -> list:
+        # Generate only the questions the bank could not supply, in ONE batch.
+        # generate_batch returns one entry per requested slot, grouped by
+        # subtopic like topic_distribution; map them back to `missing`
+        by_subtopic: dict[Subtopic, list[int]] = {}
+        for i in missing:
+            by_subtopic.setdefault(slots[i][0], []).append(i)
+        order = [i for indexes in by_subtopic.values() for i in indexes]
+        batch = await question_generator.generate_batch(
             subject=topic.name,
-            topic_distribution=topic_distribution,
-            difficulty_distribution=difficulty_distribution[:TEST_QUESTIONS],
-            grade=student.grade_level or topic.grade_level or 1,
+            topic_distribution=[
+                (topic.name, subtopic.name, len(indexes)) for subtopic, indexes in by_subtopic.items()
+            ],
+            difficulty_distribution=[slots[i][1] for i in order],
+            grade=grade,
             session_id=test_session_id
         )
+        generated = dict(zip(order, batch))
+        return [generated.get(i) for i in missing]
+    
+    try:
+        # Draw from the shared question bank first; generate the rest
+        drawn = await get_question_bank(db).fill_slots(
+            [(s.id, d.value) for s, d in slots], grade, generate, student_id=student.id
+        )
         
         # Convert to TestQuestion format
         questions: list[TestQuestion] = []
-        q_idx = 0
-        
-        for subtopic_idx, (topic_name, subtopic_name, count) in enumerate(topic_distribution):
-            subtopic_obj = subtopics[subtopic_idx]
-            
-            for _ in range(count):
-                if q_idx < len(questions_batch) and q_idx < TEST_QUESTIONS:
-                    q_data = questions_batch[q_idx]
-                    questions.append(TestQuestion(
-                        question_id=f"test_q_{q_idx}_{uuid.uuid4().hex[:8]}",
-                        question=q_data.question,
-                        options=q_data.options or [],
-                        subtopic_id=str(subtopic_obj.id),
-                        subtopic_name=subtopic_obj.name
-                    ))
-                    q_idx += 1
+        for q_idx, ((subtopic_obj, _), q_data) in enumerate(zip(slots, drawn)):
+            if q_data is None or q_idx >= TEST_QUESTIONS:
+                continue
+            questions.append(TestQuestion(
+                question_id=f"test_q_{q_idx}_{uuid.uuid4().hex[:8]}",
+                question=q_data.question,
+                options=q_data.options or [],
+                subtopic_id=str(subtopic_obj.id),
+                subtopic_name=subtopic_obj.name
+            ))
                     
     except Exception as e:
         print(f"Error generating test questions: {e}")
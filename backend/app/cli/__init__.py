@@ -0,0 +1 @@
+"""Command-line tools (installed as tutor-cli)."""
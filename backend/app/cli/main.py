@@ -0,0 +1,76 @@
+"""
+AI Tutor Platform - Command Line Interface
+Entry point for the `tutor-cli` script declared in pyproject.toml.
+
+Usage:
+    tutor-cli pregenerate [--subject mathematics] [--grade 1 --grade 2]
+    python -m app.cli.main pregenerate --questions 10 --concurrency 8
+"""
+import argparse
+import asyncio
+import sys
+from typing import Optional, Sequence
+
+from app.core.config import settings
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="tutor-cli", description=settings.APP_NAME + " tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pregen = commands.add_parser(
+        "pregenerate",
+        help="Generate lessons and bank questions for the whole curriculum ahead of time",
+        description=(
+            "Walk every subject > topic > subtopic and fill in missing lessons and "
+            "question-bank entries. Safe to re-run: finished subtopics are skipped."
+        ),
+    )
+    pregen.add_argument("--subject", action="append", default=[], metavar="SLUG",
+                        help="Only this subject slug (repeatable)")
+    pregen.add_argument("--grade", action="append", type=int, default=[],
+                        help="Only this grade (repeatable)")
+    pregen.add_argument("--questions", type=int, default=settings.PREGENERATION_QUESTIONS_PER_DIFFICULTY,
+                        help="Banked questions per difficulty per subtopic (default: %(default)s)")
+    pregen.add_argument("--difficulty", action="append", default=[], choices=["easy", "medium", "hard"],
+                        help="Only this difficulty (repeatable; default: all)")
+    pregen.add_argument("--concurrency", type=int, default=settings.PREGENERATION_CONCURRENCY,
+                        help="Subtopics generated at once (default: %(default)s)")
+    pregen.add_argument("--limit", type=int, default=None,
+                        help="Stop after this many subtopics")
+    pregen.add_argument("--skip-lessons", action="store_true", help="Only generate questions")
+    pregen.add_argument("--skip-questions", action="store_true", help="Only generate lessons")
+
+    return parser
+
+
+async def _pregenerate(args: argparse.Namespace) -> int:
+    from app.services.pregeneration import DIFFICULTIES, CurriculumPregenerator
+
+    pregenerator = CurriculumPregenerator(
+        questions_per_difficulty=args.questions,
+        difficulties=args.difficulty or DIFFICULTIES,
+        concurrency=args.concurrency,
+        lessons=not args.skip_lessons,
+        questions=not args.skip_questions,
+    )
+    report = await pregenerator.run(subject_slugs=args.subject, grades=args.grade, limit=args.limit)
+    for error in report.errors:
+        print(f"  ❌ {error}")
+    return 1 if report.failed else 0
+
+
+def app(argv: Optional[Sequence[str]] = None) -> int:
+    """Run tutor-cli."""
+    args = build_parser().parse_args(argv)
+
+    if args.command == "pregenerate":
+        if not settings.LLM_CONFIGURED:
+            print("No LLM provider configured (set OPENAI_API_KEY/ANTHROPIC_API_KEY or LLM_PROVIDER=fake)")
+            return 2
+        return asyncio.run(_pregenerate(args))
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(app())
@@ -67,7 +67,7 @@ class Settings(BaseSettings):
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
     
     # LLM Configuration
-    LLM_PROVIDER: Literal["openai", "anthropic"] = "openai"
+    LLM_PROVIDER: Literal["openai", "anthropic", "fake"] = "openai"
     OPENAI_API_KEY: str = ""
     ANTHROPIC_API_KEY: str = ""
     
@@ -77,10 +77,156 @@ class Settings(BaseSettings):
     # Anthropic specific
     ANTHROPIC_MODEL: str = "claude-3-sonnet-20240229"
     
+    # Offline fake provider (LLM_PROVIDER=fake / EMBEDDING_PROVIDER=fake)
+    FAKE_LLM_MODEL: str = "fake-tutor"
+    FAKE_LLM_LATENCY_DISTRIBUTION: Literal["none", "fixed", "uniform", "lognormal"] = "lognormal"
+    FAKE_LLM_LATENCY_MS: float = 800.0  # Median latency per call
+    FAKE_LLM_LATENCY_SIGMA: float = 0.5  # Lognormal spread
+    FAKE_LLM_STREAM_TOKEN_MS: float = 15.0  # Delay between streamed chunks
+    FAKE_LLM_SEED: int = 0
+    FAKE_EMBEDDING_LATENCY_MS: float = 50.0
+    
+    def model_for_provider(self, provider: str) -> str:
+        """Default chat model name for an LLM provider."""
+        if provider == "openai":
+            return self.OPENAI_MODEL
+        if provider == "fake":
+            return self.FAKE_LLM_MODEL
+        return self.ANTHROPIC_MODEL
+    
+    @property
+    def LLM_MODEL(self) -> str:
+        """Chat model for the configured LLM provider."""
+        return self.model_for_provider(self.LLM_PROVIDER)
+
+    @property
+    def LLM_CONFIGURED(self) -> bool:
+        """Whether AI generation can run (a provider key is set, or the fake provider)."""
+        return self.LLM_PROVIDER == "fake" or bool(self.OPENAI_API_KEY or self.ANTHROPIC_API_KEY)
+
+    # Embeddings
+    EMBEDDING_PROVIDER: Literal["openai", "local", "fake"] = "openai"
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DIMENSIONS: int = 1536  # Must match the document_chunks vector column
+    # Provider for question dedup (validator, question bank); empty = EMBEDDING_PROVIDER
+    SIMILARITY_EMBEDDING_PROVIDER: Literal["", "openai", "local", "fake"] = ""
+    LOCAL_EMBEDDING_THREAD_BATCH_SIZE: int = 32  # Larger batches embed in a worker thread
+    
+    # Embedding Cache (validator, RAG and document search)
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 4096
+    EMBEDDING_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    EMBEDDING_CACHE_USE_REDIS: bool = False
+    EMBEDDING_CACHE_REDIS_DTYPE: Literal["float16", "float32"] = "float16"
+    
+    # Document Embedding Batches (ingestion)
+    EMBEDDING_BATCH_MAX_TOKENS: int = 32000  # Tokens per provider request
+    EMBEDDING_BATCH_MAX_TEXTS: int = 256  # Chunks per provider request
+    EMBEDDING_BATCH_CONCURRENCY: int = 4  # Requests in flight per app worker
+    EMBEDDING_BATCH_MAX_RETRIES: int = 2  # Retries of a batch after a transient error
+    
     # LLM Performance
     LLM_TIMEOUT_SECONDS: int = 30
     LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    
+    # LLM Hedged Requests (second request once the first exceeds ~p95)
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_PROVIDER: str = ""  # Empty = same provider; or "openai"/"anthropic"
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 2.0
+    
+    # LLM Streaming (incremental output moderation)
+    LLM_STREAM_MODERATION_WINDOW: int = 400  # Chars re-checked on each pass
+    LLM_STREAM_HOLDBACK_CHARS: int = 48  # Chars held back until checked with context
     
+    # LLM Response Cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_DEFAULT_TTL_SECONDS: int = 3600
+    LLM_CACHE_USE_REDIS: bool = False
+    
+    # LLM Single-Flight (coalesce identical in-flight requests)
+    LLM_SINGLE_FLIGHT_ENABLED: bool = True
+    LLM_SINGLE_FLIGHT_USE_REDIS: bool = False
+    LLM_SINGLE_FLIGHT_WAIT_SECONDS: float = 45.0
+    
+    # LLM Rate Limiting (per provider/model, 0 = unlimited)
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_RATE_LIMIT_RPM: int = 500
+    LLM_RATE_LIMIT_TPM: int = 200000
+    LLM_RATE_LIMIT_COMPLETION_ESTIMATE: int = 512  # Tokens reserved for the reply
+    LLM_RATE_LIMIT_USE_REDIS: bool = False
+    # Per-model overrides: "provider:model=rpm/tpm/concurrency,..."
+    LLM_RATE_LIMIT_OVERRIDES_STR: str = ""
+    
+    @property
+    def LLM_RATE_LIMIT_OVERRIDES(self) -> dict[str, dict[str, int]]:
+        """Parse per-model rate limit overrides."""
+        overrides = {}
+        for entry in self.LLM_RATE_LIMIT_OVERRIDES_STR.split(","):
+            if "=" not in entry:
+                continue
+            name, limits = entry.split("=", 1)
+            rpm, tpm, concurrency = (int(v) for v in limits.split("/"))
+            overrides[name.strip()] = {"rpm": rpm, "tpm": tpm, "concurrency": concurrency}
+        return overrides
+    
+    # Practice Question Queue (shared across workers via Redis)
+    PRACTICE_QUEUE_USE_REDIS: bool = True
+    PRACTICE_QUEUE_BATCH_SIZE: int = 5
+    PRACTICE_QUEUE_REFILL_THRESHOLD: int = 2  # Refill in the background at or below this
+    PRACTICE_QUEUE_REFILL_LOCK_SECONDS: int = 120
+    PRACTICE_QUEUE_TTL_SECONDS: int = 6 * 3600
+    PRACTICE_ACTIVE_QUESTION_TTL_SECONDS: int = 2 * 3600
+    PRACTICE_SESSION_TTL_SECONDS: int = 24 * 3600
+
+    # Validator Session State (question history/concepts shared across workers)
+    VALIDATOR_STATE_USE_REDIS: bool = True
+    VALIDATOR_STATE_TTL_SECONDS: int = 24 * 3600
+
+    # Question Bank (validated questions reused across students)
+    QUESTION_BANK_ENABLED: bool = True
+    QUESTION_BANK_DEDUP_THRESHOLD: float = 0.97  # Embedding cosine similarity
+    QUESTION_BANK_MINHASH_THRESHOLD: float = 0.8  # Estimated Jaccard of character shingles
+    QUESTION_BANK_DEDUP_CANDIDATES: int = 500  # Recent questions compared per subtopic
+
+    # Curriculum Pre-generation (tutor-cli pregenerate)
+    PREGENERATION_CONCURRENCY: int = 4  # Subtopics generated at once
+    PREGENERATION_QUESTIONS_PER_DIFFICULTY: int = 10
+
+    # Document Ingestion (background jobs: extract, chunk, embed, validate)
+    DOCUMENT_INGESTION_WORKERS: int = 2  # Documents processed at once per app worker
+    DOCUMENT_INGESTION_RECOVER_ON_STARTUP: bool = True  # Re-queue documents still pending
+    DOCUMENT_INGESTION_HEARTBEAT_SECONDS: int = 30  # Running jobs refresh their row this often
+    DOCUMENT_INGESTION_STALE_SECONDS: int = 300  # No heartbeat this long = crashed job, re-queued
+    DOCUMENT_EXTRACTION_PROCESSES: int = 4  # PDF/DOCX parsing processes; 0 = thread executor
+    DOCUMENT_EXTRACTION_PAGES_PER_TASK: int = 16  # PDF pages per process-pool task
+    # "token": one tokenizer pass per page; "compatible": original chunk boundaries
+    DOCUMENT_CHUNKER: Literal["token", "compatible"] = "token"
+    DOCUMENT_CHUNK_COPY: bool = True  # Postgres: COPY chunks in one round trip; False = bulk INSERT
+
+    # Document Vector Search (pgvector HNSW index on document_chunks.embedding)
+    DOCUMENT_VECTOR_HNSW_M: int = 16  # Graph degree (index build; recall vs size)
+    DOCUMENT_VECTOR_HNSW_EF_CONSTRUCTION: int = 64  # Build-time candidate list
+    DOCUMENT_VECTOR_EF_SEARCH: int = 40  # Query-time candidate list (recall vs latency)
+    # pgvector >= 0.8: keep scanning the index until enough rows pass the user filter
+    DOCUMENT_VECTOR_ITERATIVE_SCAN: Literal["off", "relaxed_order", "strict_order"] = "relaxed_order"
+    # Hybrid Retrieval (RAG: full-text + vector results, reciprocal-rank fusion)
+    RAG_HYBRID_SEARCH: bool = True
+    RAG_HYBRID_CANDIDATES: int = 50  # Candidates ranked per retriever before fusion
+    RAG_RRF_K: int = 60  # Fusion constant: higher flattens the rank weighting
+    RAG_FULLTEXT_CONFIG: str = "english"  # Must match the GIN index expression
+    RAG_KEYWORD_MATCH_TOP_N: int = 3  # Top full-text hits kept below the RAG relevance threshold
+    # Retrieval Cache (ranked chunk IDs per user/document/query; dropped on upload/delete)
+    RETRIEVAL_CACHE_ENABLED: bool = True
+    RETRIEVAL_CACHE_TTL_SECONDS: int = 3600
+    RETRIEVAL_CACHE_MAX_ENTRIES: int = 2048
+    RETRIEVAL_CACHE_USE_REDIS: bool = False
+    # In-process fallback when pgvector is unavailable (per-user NumPy matrices)
+    DOCUMENT_VECTOR_FALLBACK_DIR: str = "uploads/vectors"
+    DOCUMENT_VECTOR_FALLBACK_PERSIST: bool = True  # Memory-mapped .npy per user
+    DOCUMENT_VECTOR_FALLBACK_CACHE_USERS: int = 64  # Users kept in memory
+
     # CORS - stored as comma-separated string
     CORS_ORIGINS_STR: str = "http://localhost:3000,http://localhost:5173"
     
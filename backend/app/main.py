@@ -61,10 +61,25 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"[Startup] Auto-seed check failed (non-fatal): {e}")
     
+    # Start background document ingestion (and pick up uploads left pending)
+    try:
+        from app.services.document_ingestion import get_ingestion_queue
+        
+        ingestion_queue = get_ingestion_queue()
+        ingestion_queue.start()
+        if settings.DOCUMENT_INGESTION_RECOVER_ON_STARTUP:
+            await ingestion_queue.recover()
+        print(f"[Startup] Document ingestion workers started ({ingestion_queue.workers})")
+    except Exception as e:
+        print(f"[Startup] Document ingestion recovery failed (non-fatal): {e}")
+    
     yield
     
     # Shutdown
-    pass
+    from app.ai.core.text_extraction import shutdown_extraction_pool
+    from app.services.document_ingestion import get_ingestion_queue
+    await get_ingestion_queue().stop()
+    shutdown_extraction_pool()
 
 
 
@@ -11,6 +11,7 @@ from app.models.lesson import GeneratedLesson, StudentLessonProgress
 from app.models.assessment import AssessmentResult
 from app.models.exam import ExamResult
 from app.models.test import TestResult
+from app.models.question_bank import BankQuestion, StudentSeenQuestion
 from app.models.document import (
     UserDocument,
     DocumentChunk,
@@ -38,6 +39,9 @@ __all__ = [
     "AssessmentResult",
     "ExamResult",
     "TestResult",
+    # Question bank
+    "BankQuestion",
+    "StudentSeenQuestion",
     # Document models (RAG)
     "UserDocument",
     "DocumentChunk",
@@ -7,10 +7,11 @@ from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func, Index
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func, Index, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.config import settings
 from app.core.database import Base
 
 # Try to import pgvector, fall back gracefully
@@ -35,6 +36,17 @@ class DocumentStatus(str, Enum):
     FAILED = "failed"
 
 
+class IngestionStage(str, Enum):
+    """Step of the background ingestion job (status polling)."""
+    QUEUED = "queued"
+    EXTRACTING = "extracting"
+    CHUNKING = "chunking"
+    EMBEDDING = "embedding"
+    STORING = "storing"
+    VALIDATING = "validating"
+    DONE = "done"
+
+
 class ValidationStatus(str, Enum):
     """Document validation status for grade-appropriateness."""
     PENDING = "pending"
@@ -92,6 +104,17 @@ class UserDocument(Base):
         default=DocumentStatus.PENDING
     )
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    processing_stage: Mapped[Optional[str]] = mapped_column(
+        String(50),
+        nullable=True,
+        default=IngestionStage.QUEUED
+    )
+    processing_progress: Mapped[int] = mapped_column(Integer, default=0)  # percent
+    # Refreshed by the worker while a job runs; stale = the worker died
+    processing_heartbeat_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
     
     # Stats
     chunk_count: Mapped[int] = mapped_column(Integer, default=0)
@@ -159,6 +182,15 @@ class DocumentChunk(Base):
         index=True
     )
     
+    # Denormalized document owner: vector search filters on it without
+    # joining user_documents before the scan
+    user_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), 
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=True,
+        index=True
+    )
+    
     # Chunk content
     content: Mapped[str] = mapped_column(Text, nullable=False)
     chunk_index: Mapped[int] = mapped_column(Integer)  # Position in document
@@ -185,13 +217,35 @@ class DocumentChunk(Base):
         return f"<DocumentChunk {self.chunk_index} of {self.document_id}>"
 
 
+# Full-text index for hybrid retrieval; the expression must match the one
+# DocumentService queries with (RAG_FULLTEXT_CONFIG)
+Index(
+    "ix_document_chunks_content_fts",
+    text(f"to_tsvector('{settings.RAG_FULLTEXT_CONFIG}', content)"),
+    _table=DocumentChunk.__table__,
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
+
+
 # Conditional embedding column - added dynamically if pgvector available
 if PGVECTOR_AVAILABLE and Vector is not None:
-    # Add vector column for embeddings (OpenAI dimension = 1536)
+    # Add vector column for embeddings (EMBEDDING_DIMENSIONS, 1536 for OpenAI)
     DocumentChunk.embedding = mapped_column(
-        Vector(1536), 
+        Vector(settings.EMBEDDING_DIMENSIONS), 
         nullable=True
     )
+    # HNSW index for cosine-distance search (see migrations/01_document_chunks_hnsw.sql
+    # for existing databases; Postgres only, like the full-text index)
+    Index(
+        "ix_document_chunks_embedding_hnsw",
+        DocumentChunk.__table__.c.embedding,
+        postgresql_using="hnsw",
+        postgresql_with={
+            "m": settings.DOCUMENT_VECTOR_HNSW_M,
+            "ef_construction": settings.DOCUMENT_VECTOR_HNSW_EF_CONSTRUCTION,
+        },
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    ).ddl_if(dialect="postgresql")
 
 
 class GeneratedImage(Base):
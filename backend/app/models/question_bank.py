@@ -0,0 +1,121 @@
+"""
+AI Tutor Platform - Question Bank Models
+Validated, reusable questions shared across students, plus a per-student
+record of which bank questions each student has already been served.
+"""
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.config import settings
+from app.core.database import Base
+
+# Try to import pgvector, fall back gracefully
+try:
+    from pgvector.sqlalchemy import Vector
+    PGVECTOR_AVAILABLE = True
+except ImportError:
+    PGVECTOR_AVAILABLE = False
+    Vector = None
+
+if TYPE_CHECKING:
+    from app.models.curriculum import Subtopic
+
+
+class BankQuestion(Base):
+    """
+    A generated question that passed validation, keyed by
+    subtopic, grade and difficulty for reuse across students.
+    """
+
+    __tablename__ = "question_bank"
+    __table_args__ = (
+        UniqueConstraint("subtopic_id", "grade_level", "question_hash", name="uq_question_bank_hash"),
+        Index("ix_question_bank_lookup", "subtopic_id", "grade_level", "difficulty"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+    subtopic_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("subtopics.id", ondelete="CASCADE"),
+    )
+    grade_level: Mapped[int] = mapped_column(Integer)
+    difficulty: Mapped[str] = mapped_column(String(20))  # easy, medium, hard
+
+    # Question content
+    question: Mapped[str] = mapped_column(Text, nullable=False)
+    question_type: Mapped[str] = mapped_column(String(50), default="multiple_choice")
+    answer: Mapped[str] = mapped_column(Text)
+    correct_answers: Mapped[list] = mapped_column(JSONB, default=list)
+    options: Mapped[list] = mapped_column(JSONB, default=list)
+    hint: Mapped[str] = mapped_column(Text, default="")
+    explanation: Mapped[str] = mapped_column(Text, default="")
+
+    # Normalized-text hash for exact dedup (embedding catches near-duplicates)
+    question_hash: Mapped[str] = mapped_column(String(64))
+    # "provider:model" that produced `embedding`; vectors from another model
+    # are not comparable and get re-embedded
+    embedding_model: Mapped[str | None] = mapped_column(String(100), nullable=True)
+
+    # Metadata
+    generated_by: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    times_served: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+
+    # Relationships
+    subtopic: Mapped["Subtopic"] = relationship("Subtopic")
+
+    def __repr__(self) -> str:
+        return f"<BankQuestion {self.difficulty} {self.question[:40]!r}>"
+
+
+class StudentSeenQuestion(Base):
+    """A bank question already served to a student (never served to them again)."""
+
+    __tablename__ = "student_seen_questions"
+    __table_args__ = (
+        UniqueConstraint("student_id", "question_id", name="uq_student_seen_question"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+    student_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("students.id", ondelete="CASCADE"),
+        index=True
+    )
+    question_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("question_bank.id", ondelete="CASCADE"),
+    )
+    seen_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+
+    # Relationships
+    question: Mapped[Optional["BankQuestion"]] = relationship("BankQuestion")
+
+
+# Conditional embedding column - added dynamically if pgvector available
+if PGVECTOR_AVAILABLE and Vector is not None:
+    BankQuestion.embedding = mapped_column(
+        Vector(settings.EMBEDDING_DIMENSIONS),
+        nullable=True
+    )
@@ -2,6 +2,8 @@
 AI Tutor Platform - Document Service
 Handles document storage, retrieval, and RAG operations.
 """
+import json
+import struct
 import uuid
 import os
 import shutil
@@ -9,18 +11,45 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
-from sqlalchemy import select, func
+import numpy as np
+from sqlalchemy import insert, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.document import UserDocument, DocumentChunk, DocumentStatus, GeneratedImage, ValidationStatus
+from app.ai.core.embedding_cache import get_embedding_cache
+from app.ai.core.hybrid_search import fulltext_query, reciprocal_rank_fusion
+from app.ai.core.telemetry import trace_retrieval_cache
+from app.core.config import settings
+from app.models.document import (
+    PGVECTOR_AVAILABLE, UserDocument, DocumentChunk, DocumentStatus, GeneratedImage, IngestionStage,
+    ValidationStatus,
+)
 from app.ai.agents.document import document_agent, DocumentResult
 from app.ai.agents.document_validator import document_validator_agent, GradeMatch
+from app.services.local_vector_index import get_local_vector_index
+from app.services.retrieval_cache import CachedHit, get_retrieval_cache
 
 
 # Upload directory
 UPLOAD_DIR = Path("uploads/documents")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# Percent complete when each ingestion step starts
+STAGE_PROGRESS = {
+    IngestionStage.QUEUED: 0,
+    IngestionStage.EXTRACTING: 10,
+    IngestionStage.CHUNKING: 30,
+    IngestionStage.EMBEDDING: 40,
+    IngestionStage.STORING: 70,
+    IngestionStage.VALIDATING: 80,
+    IngestionStage.DONE: 100,
+}
+
+
+def _vector_to_binary(embedding) -> bytes:
+    """pgvector binary format: dimensions, unused, big-endian float4 values."""
+    values = np.asarray(embedding, dtype=">f4")
+    return struct.pack(">HH", len(values), 0) + values.tobytes()
+
 
 class DocumentService:
     """
@@ -28,7 +57,7 @@ class DocumentService:
     
     Handles:
     - File upload and storage
-    - Document processing via DocumentAgent
+    - Document processing via DocumentAgent (background ingestion job)
     - Vector similarity search
     - Document CRUD operations
     """
@@ -47,7 +76,11 @@ class DocumentService:
         description: Optional[str] = None,
     ) -> UserDocument:
         """
-        Upload and process a document.
+        Store an uploaded document and queue it for ingestion.
+        
+        Returns as soon as the file and its record are saved; extraction,
+        chunking, embedding and validation run in a background job (see
+        process_document). Poll the document's status/processing_stage.
         
         Args:
             file_content: Raw file bytes
@@ -59,8 +92,10 @@ class DocumentService:
             description: Optional description
             
         Returns:
-            UserDocument model instance
+            UserDocument model instance (status PENDING)
         """
+        from app.services.document_ingestion import get_ingestion_queue
+        
         # Generate unique filename
         file_ext = Path(filename).suffix.lower()
         unique_filename = f"{uuid.uuid4()}{file_ext}"
@@ -83,129 +118,210 @@ class DocumentService:
             subject=subject,
             grade_level=grade_level,
             description=description,
-            status=DocumentStatus.PROCESSING,
+            status=DocumentStatus.PENDING,
+            processing_stage=IngestionStage.QUEUED,
+            processing_progress=0,
         )
         
         self.db.add(document)
         await self.db.commit()
         await self.db.refresh(document)
         
-        # Process document asynchronously
+        await get_ingestion_queue().enqueue(str(document.id))
+        
+        return document
+    
+    async def process_document(self, document_id: str) -> Optional[UserDocument]:
+        """
+        Run the ingestion pipeline for a claimed document (background job).
+        
+        Extracts, chunks and embeds the file once, stores the chunks, then
+        validates grade-appropriateness. Each step is committed to
+        processing_stage/processing_progress as it starts.
+        """
+        document = await self.db.get(UserDocument, uuid.UUID(document_id))
+        if document is None:
+            return None  # Deleted while queued
+        user_id = str(document.user_id)
+        
+        async def on_stage(stage: str) -> None:
+            await self._set_stage(document, IngestionStage(stage))
+        
         try:
-            result = await document_agent.process_file(
-                file_path=str(file_path),
-                user_id=user_id,
-                student_id=student_id,
-                subject=subject,
-                grade_level=grade_level,
+            agent_result = await document_agent.run(
+                user_input=f"Process document: {document.file_path}",
+                metadata={
+                    "file_path": document.file_path,
+                    "user_id": user_id,
+                    "student_id": str(document.student_id) if document.student_id else None,
+                    "subject": document.subject,
+                    "grade_level": document.grade_level,
+                    "on_stage": on_stage,
+                }
             )
             
-            if result.status == "completed":
-                # Get full result with chunks and embeddings
-                agent_result = await document_agent.run(
-                    user_input=f"Process document: {file_path}",
-                    metadata={
-                        "file_path": str(file_path),
-                        "user_id": user_id,
-                        "student_id": student_id,
-                        "subject": subject,
-                        "grade_level": grade_level,
-                    }
+            if agent_result.success:
+                output = agent_result.output
+                
+                # Store chunks
+                await self._set_stage(document, IngestionStage.STORING)
+                chunks = output.get("chunks", [])
+                embeddings = output.get("embeddings", [])
+                token_counts = output.get("token_counts", [])
+                chunk_metadata = output.get("chunk_metadata", [])
+                
+                chunk_ids = await self._store_chunks(
+                    document, chunks, token_counts, chunk_metadata, embeddings
                 )
                 
-                if agent_result.success:
-                    output = agent_result.output
-                    
-                    # Store chunks
-                    chunks = output.get("chunks", [])
-                    embeddings = output.get("embeddings", [])
-                    token_counts = output.get("token_counts", [])
-                    chunk_metadata = output.get("chunk_metadata", [])
-                    
-                    for i, chunk_text in enumerate(chunks):
-                        chunk = DocumentChunk(
-                            id=uuid.uuid4(),
-                            document_id=document.id,
-                            content=chunk_text,
-                            chunk_index=i,
-                            token_count=token_counts[i] if i < len(token_counts) else 0,
-                            chunk_metadata=chunk_metadata[i] if i < len(chunk_metadata) else {},
-                        )
-                        
-                        # Add embedding if available and pgvector is enabled
-                        if embeddings and i < len(embeddings):
-                            try:
-                                chunk.embedding = embeddings[i]
-                            except AttributeError:
-                                # pgvector not available
-                                pass
-                        
-                        self.db.add(chunk)
-                    
-                    # Validate document for grade-appropriateness
-                    document.status = DocumentStatus.VALIDATING
-                    await self.db.commit()
-                    
-                    # Get sample chunks for validation
-                    sample_chunks = chunks[:3] if len(chunks) >= 3 else chunks
-                    
-                    validation_result = await document_validator_agent.validate(
-                        content_samples=sample_chunks,
-                        target_grade=grade_level or 5,  # Default to grade 5 if not specified
-                        subject=subject,
+                # Validate document for grade-appropriateness
+                document.status = DocumentStatus.VALIDATING
+                await self._set_stage(document, IngestionStage.VALIDATING)
+                
+                # Keep the in-process fallback index (if built) in sync
+                if embeddings:
+                    await get_local_vector_index().add_chunks(
+                        user_id, str(document.id), chunk_ids, embeddings
                     )
-                    
-                    # Store validation result
-                    document.validation_result = {
-                        "is_appropriate": validation_result.is_appropriate,
-                        "grade_match": validation_result.grade_match.value,
-                        "estimated_grade_range": list(validation_result.estimated_grade_range),
-                        "reason": validation_result.reason,
-                        "educational_value": validation_result.educational_value,
-                        "content_warnings": validation_result.content_warnings,
-                    }
-                    
-                    # Determine final status based on validation
-                    if validation_result.is_appropriate:
-                        if validation_result.grade_match == GradeMatch.INAPPROPRIATE:
-                            # Edge case: marked appropriate but grade match says inappropriate
-                            document.status = DocumentStatus.REJECTED
-                            document.validation_status = ValidationStatus.REJECTED
-                            document.error_message = validation_result.reason
-                        elif validation_result.grade_match in [GradeMatch.EXACT, GradeMatch.CLOSE]:
-                            document.status = DocumentStatus.COMPLETED
-                            document.validation_status = ValidationStatus.APPROVED
-                        else:
-                            # TOO_EASY or TOO_HARD - allow with review status
-                            document.status = DocumentStatus.COMPLETED
-                            document.validation_status = ValidationStatus.NEEDS_REVIEW
-                    else:
-                        # Not appropriate - reject the document
+                await get_retrieval_cache().invalidate_user(user_id)
+                
+                # Get sample chunks for validation
+                sample_chunks = chunks[:3] if len(chunks) >= 3 else chunks
+                
+                validation_result = await document_validator_agent.validate(
+                    content_samples=sample_chunks,
+                    target_grade=document.grade_level or 5,  # Default to grade 5 if not specified
+                    subject=document.subject,
+                )
+                
+                # Store validation result
+                document.validation_result = {
+                    "is_appropriate": validation_result.is_appropriate,
+                    "grade_match": validation_result.grade_match.value,
+                    "estimated_grade_range": list(validation_result.estimated_grade_range),
+                    "reason": validation_result.reason,
+                    "educational_value": validation_result.educational_value,
+                    "content_warnings": validation_result.content_warnings,
+                }
+                
+                # Determine final status based on validation
+                if validation_result.is_appropriate:
+                    if validation_result.grade_match == GradeMatch.INAPPROPRIATE:
+                        # Edge case: marked appropriate but grade match says inappropriate
                         document.status = DocumentStatus.REJECTED
                         document.validation_status = ValidationStatus.REJECTED
                         document.error_message = validation_result.reason
-                    
-                    # Set metadata if approved
-                    if document.status == DocumentStatus.COMPLETED:
-                        document.chunk_count = len(chunks)
-                        document.total_tokens = sum(token_counts)
-                        document.processed_at = datetime.utcnow()
+                    elif validation_result.grade_match in [GradeMatch.EXACT, GradeMatch.CLOSE]:
+                        document.status = DocumentStatus.COMPLETED
+                        document.validation_status = ValidationStatus.APPROVED
+                    else:
+                        # TOO_EASY or TOO_HARD - allow with review status
+                        document.status = DocumentStatus.COMPLETED
+                        document.validation_status = ValidationStatus.NEEDS_REVIEW
                 else:
-                    document.status = DocumentStatus.FAILED
-                    document.error_message = agent_result.error
+                    # Not appropriate - reject the document
+                    document.status = DocumentStatus.REJECTED
+                    document.validation_status = ValidationStatus.REJECTED
+                    document.error_message = validation_result.reason
+                
+                # Set metadata if approved
+                if document.status == DocumentStatus.COMPLETED:
+                    document.chunk_count = len(chunks)
+                    document.total_tokens = sum(token_counts)
+                    document.processed_at = datetime.utcnow()
             else:
                 document.status = DocumentStatus.FAILED
-                document.error_message = result.error
+                document.error_message = agent_result.error
                 
         except Exception as e:
+            await self.db.rollback()
+            document = await self.db.get(UserDocument, uuid.UUID(document_id))
+            if document is None:
+                return None
             document.status = DocumentStatus.FAILED
             document.error_message = str(e)
         
+        document.processing_stage = IngestionStage.DONE
+        document.processing_progress = 100
         await self.db.commit()
         await self.db.refresh(document)
         
         return document
     
+    async def _set_stage(self, document: UserDocument, stage: IngestionStage) -> None:
+        """Record (and commit) the ingestion step that is starting."""
+        document.processing_stage = stage
+        document.processing_progress = STAGE_PROGRESS[stage]
+        await self.db.commit()
+    
+    async def _store_chunks(
+        self,
+        document: UserDocument,
+        chunks: List[str],
+        token_counts: List[int],
+        chunk_metadata: List[Dict[str, Any]],
+        embeddings: List[List[float]],
+    ) -> List[str]:
+        """
+        Insert a document's chunks and embeddings in one bulk write.
+        
+        Postgres (asyncpg) loads them with a binary COPY; other databases,
+        or DOCUMENT_CHUNK_COPY=false, get a single executemany INSERT. Rows
+        join the session's transaction. Returns chunk IDs in chunk order.
+        """
+        with_embeddings = PGVECTOR_AVAILABLE and bool(embeddings)
+        rows = []
+        for i, chunk_text in enumerate(chunks):
+            row = {
+                "id": uuid.uuid4(),
+                "document_id": document.id,
+                "user_id": document.user_id,
+                "content": chunk_text,
+                "chunk_index": i,
+                "token_count": token_counts[i] if i < len(token_counts) else 0,
+                "chunk_metadata": chunk_metadata[i] if i < len(chunk_metadata) else {},
+            }
+            if with_embeddings:
+                row["embedding"] = embeddings[i] if i < len(embeddings) else None
+            rows.append(row)
+        if not rows:
+            return []
+        
+        connection = await self.db.connection()
+        if settings.DOCUMENT_CHUNK_COPY and connection.dialect.driver == "asyncpg":
+            await self._copy_chunks(connection, rows)
+        else:
+            await self.db.execute(insert(DocumentChunk), rows)
+        return [str(row["id"]) for row in rows]
+    
+    @staticmethod
+    async def _copy_chunks(connection, rows: List[Dict[str, Any]]) -> None:
+        """COPY chunk rows into document_chunks over the session's asyncpg connection."""
+        asyncpg_conn = (await connection.get_raw_connection()).driver_connection
+        columns = list(rows[0])
+        records = [
+            tuple(
+                json.dumps(row[column]) if column == "chunk_metadata" else row[column]
+                for column in columns
+            )
+            for row in rows
+        ]
+        
+        # COPY is binary-only and asyncpg has no binary vector codec. Keep
+        # one just for the COPY: search_chunks passes vectors as text
+        with_embeddings = "embedding" in columns
+        if with_embeddings:
+            await asyncpg_conn.set_type_codec(
+                "vector", encoder=_vector_to_binary, decoder=bytes, format="binary"
+            )
+        try:
+            await asyncpg_conn.copy_records_to_table(
+                DocumentChunk.__tablename__, records=records, columns=columns
+            )
+        finally:
+            if with_embeddings:
+                await asyncpg_conn.reset_type_codec("vector")
+    
     async def get_document(self, document_id: str, user_id: str) -> Optional[UserDocument]:
         """Get a document by ID, ensuring user access."""
         result = await self.db.execute(
@@ -258,35 +374,115 @@ class DocumentService:
         # Delete from database (cascade will delete chunks)
         await self.db.delete(document)
         await self.db.commit()
+        await get_local_vector_index().remove_document(user_id, document_id)
+        await get_retrieval_cache().invalidate_user(user_id)
         
         return True
     
+    async def retrieve(
+        self,
+        query: str,
+        user_id: str,
+        document_id: Optional[str] = None,
+        limit: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """
+        Chunks for a text query, served from the retrieval cache when the
+        same user asked the same (normalized) question before.
+        
+        A hit skips the query embedding and the vector scan; only the
+        cached chunk IDs are loaded. Misses embed the query (shared
+        embedding cache) and run search_chunks. Raises if the query cannot
+        be embedded.
+        """
+        cache = get_retrieval_cache() if settings.RETRIEVAL_CACHE_ENABLED else None
+        version = ""
+        if cache:
+            version = await self._retrieval_version(user_id)
+            cached = await cache.get(user_id, document_id, query, limit, version)
+            if cached is not None:
+                results = await self._hydrate_chunks(user_id, cached)
+                trace_retrieval_cache(True, cache.stats)
+                if len(results) == len(cached):
+                    return results
+        
+        query_embedding = await get_embedding_cache().get(query)
+        results = await self.search_chunks(
+            query_embedding=query_embedding,
+            user_id=user_id,
+            document_id=document_id,
+            limit=limit,
+            query_text=query,
+        )
+        
+        if cache:
+            trace_retrieval_cache(False, cache.stats)
+            if results:
+                await cache.set(user_id, document_id, query, limit, [
+                    CachedHit(r["chunk_id"], r["similarity"], r.get("keyword_match", False))
+                    for r in results
+                ], version)
+        return results
+    
+    async def _retrieval_version(self, user_id: str) -> str:
+        """
+        Version of the user's document set for retrieval cache keys.
+        
+        Any upload, ingestion update or delete changes the document count
+        or the latest updated_at, so every worker sees the change at commit
+        time, with or without Redis.
+        """
+        result = await self.db.execute(
+            select(func.count(UserDocument.id), func.max(UserDocument.updated_at))
+            .where(UserDocument.user_id == uuid.UUID(user_id))
+        )
+        count, latest = result.one()
+        return f"{count}:{latest}"
+    
     async def search_chunks(
         self,
         query_embedding: List[float],
         user_id: str,
         document_id: Optional[str] = None,
         limit: int = 5,
+        ef_search: Optional[int] = None,
+        query_text: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
         Search for similar chunks using vector similarity.
         
+        The nearest-neighbour scan runs on document_chunks alone, filtered
+        by the denormalized user_id (HNSW index, or the user_id index when
+        the planner finds the user's chunks few enough to scan exactly);
+        user_documents is joined only for the top results.
+        
+        With query_text (and RAG_HYBRID_SEARCH on), full-text matches are
+        ranked alongside and both lists are merged by reciprocal-rank
+        fusion in the same statement.
+        
         Args:
-            query_embedding: Query vector (1536 dimensions)
+            query_embedding: Query vector (EMBEDDING_DIMENSIONS)
             user_id: User ID for access control
             document_id: Optional specific document to search
             limit: Max results to return
+            ef_search: HNSW candidate list size for this query (recall vs
+                latency; defaults to DOCUMENT_VECTOR_EF_SEARCH)
+            query_text: Query text for hybrid keyword + vector search
             
         Returns:
-            List of chunks with similarity scores
+            List of chunks with similarity scores (dense cosine similarity;
+            keyword_match marks chunks among the top RAG_KEYWORD_MATCH_TOP_N
+            full-text results)
         """
+        hybrid_query = fulltext_query(query_text) if query_text and settings.RAG_HYBRID_SEARCH else ""
+        
         # Check if pgvector is available
         try:
             from pgvector.sqlalchemy import Vector
         except ImportError:
-            # Fallback to text search if pgvector not available
-            return await self._text_search_fallback(
-                query_embedding, user_id, document_id, limit
+            # Search in-process if pgvector not available
+            return await self._local_vector_search(
+                query_embedding, user_id, document_id, limit, query_text=hybrid_query and query_text
             )
         
         # Use raw connection to handle pgvector properly with asyncpg
@@ -295,52 +491,51 @@ class DocumentService:
         
         # Format embedding as PostgreSQL array literal
         embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
+        candidates = max(settings.RAG_HYBRID_CANDIDATES, limit) if hybrid_query else limit
         
         try:
-            # Use raw SQL execution through the connection
+            # Per-query index knobs; set_config(..., true) lasts until the
+            # end of the current transaction only
+            await self._set_vector_search_options(max(ef_search or settings.DOCUMENT_VECTOR_EF_SEARCH, candidates))
+            
+            # Use raw SQL execution through the same connection/transaction
             connection = await self.db.connection()
             raw_conn = await connection.get_raw_connection()
             asyncpg_conn = raw_conn.driver_connection
             
+            params: List[Any] = [embedding_str, uuid.UUID(user_id)]
+            document_filter = ""
             if document_id:
-                sql = """
-                    SELECT 
-                        dc.id,
-                        dc.content,
-                        dc.chunk_index,
-                        dc.document_id,
-                        ud.original_filename,
-                        1 - (dc.embedding <=> $1::vector) as similarity
-                    FROM document_chunks dc
-                    JOIN user_documents ud ON dc.document_id = ud.id
-                    WHERE ud.user_id = $2::uuid
-                    AND dc.document_id = $3::uuid
-                    AND dc.embedding IS NOT NULL
-                    ORDER BY dc.embedding <=> $1::vector
-                    LIMIT $4
-                """
-                rows = await asyncpg_conn.fetch(
-                    sql, embedding_str, uuid.UUID(user_id), uuid.UUID(document_id), limit
-                )
+                params.append(uuid.UUID(document_id))
+                document_filter = "AND document_id = $3::uuid"
+            
+            if hybrid_query:
+                sql = self._hybrid_search_sql(params, document_filter, hybrid_query, candidates, limit)
             else:
-                sql = """
+                params.append(limit)
+                sql = f"""
                     SELECT 
-                        dc.id,
-                        dc.content,
-                        dc.chunk_index,
-                        dc.document_id,
+                        nn.id,
+                        nn.content,
+                        nn.chunk_index,
+                        nn.document_id,
                         ud.original_filename,
-                        1 - (dc.embedding <=> $1::vector) as similarity
-                    FROM document_chunks dc
-                    JOIN user_documents ud ON dc.document_id = ud.id
-                    WHERE ud.user_id = $2::uuid
-                    AND dc.embedding IS NOT NULL
-                    ORDER BY dc.embedding <=> $1::vector
-                    LIMIT $3
+                        1 - nn.distance as similarity,
+                        false as keyword_match
+                    FROM (
+                        SELECT id, content, chunk_index, document_id,
+                               embedding <=> $1::vector AS distance
+                        FROM document_chunks
+                        WHERE user_id = $2::uuid
+                        {document_filter}
+                        AND embedding IS NOT NULL
+                        ORDER BY embedding <=> $1::vector
+                        LIMIT ${len(params)}
+                    ) nn
+                    JOIN user_documents ud ON nn.document_id = ud.id AND ud.user_id = $2::uuid
+                    ORDER BY nn.distance
                 """
-                rows = await asyncpg_conn.fetch(
-                    sql, embedding_str, uuid.UUID(user_id), limit
-                )
+            rows = await asyncpg_conn.fetch(sql, *params)
             
             return [
                 {
@@ -349,17 +544,179 @@ class DocumentService:
                     "chunk_index": row["chunk_index"],
                     "document_id": str(row["document_id"]),
                     "filename": row["original_filename"],
-                    "similarity": float(row["similarity"]) if row["similarity"] else 0.5,
+                    "similarity": float(row["similarity"]) if row["similarity"] is not None else 0.0,
+                    "keyword_match": row["keyword_match"],
                 }
                 for row in rows
             ]
             
         except Exception as e:
             print(f"[DocumentService] Vector search failed: {e}")
-            # Fall back to text search
-            return await self._text_search_fallback(
-                query_embedding, user_id, document_id, limit
+            # Fall back to in-process search (e.g. SQLite, no extension)
+            return await self._local_vector_search(
+                query_embedding, user_id, document_id, limit, query_text=hybrid_query and query_text
+            )
+    
+    @staticmethod
+    def _hybrid_search_sql(
+        params: List[Any],
+        document_filter: str,
+        tsquery: str,
+        candidates: int,
+        limit: int,
+    ) -> str:
+        """
+        Dense + full-text candidates fused by reciprocal rank, in one statement.
+        
+        Appends its parameters to params. Each CTE ranks at most
+        `candidates` of the user's chunks (HNSW and GIN index scans); the
+        final join only touches the fused top rows.
+        """
+        config = settings.RAG_FULLTEXT_CONFIG
+        params.extend([tsquery, candidates, settings.RAG_RRF_K, limit, settings.RAG_KEYWORD_MATCH_TOP_N])
+        tsquery_p, candidates_p, rrf_k_p, limit_p, keyword_top_p = (
+            f"${i}" for i in range(len(params) - 4, len(params) + 1)
+        )
+        return f"""
+            WITH dense AS (
+                SELECT id, row_number() OVER (ORDER BY distance) AS rank
+                FROM (
+                    SELECT id, embedding <=> $1::vector AS distance
+                    FROM document_chunks
+                    WHERE user_id = $2::uuid
+                    {document_filter}
+                    AND embedding IS NOT NULL
+                    ORDER BY embedding <=> $1::vector
+                    LIMIT {candidates_p}
+                ) d
+            ),
+            lexical AS (
+                SELECT id, row_number() OVER (ORDER BY score DESC) AS rank
+                FROM (
+                    SELECT id, ts_rank(to_tsvector('{config}', content), q) AS score
+                    FROM document_chunks, to_tsquery('{config}', {tsquery_p}) q
+                    WHERE user_id = $2::uuid
+                    {document_filter}
+                    AND to_tsvector('{config}', content) @@ q
+                    ORDER BY score DESC
+                    LIMIT {candidates_p}
+                ) l
+            ),
+            fused AS (
+                SELECT
+                    COALESCE(dense.id, lexical.id) AS id,
+                    COALESCE(1.0 / ({rrf_k_p} + dense.rank), 0)
+                        + COALESCE(1.0 / ({rrf_k_p} + lexical.rank), 0) AS score,
+                    COALESCE(lexical.rank <= {keyword_top_p}, false) AS keyword_match
+                FROM dense
+                FULL OUTER JOIN lexical ON dense.id = lexical.id
+                ORDER BY score DESC
+                LIMIT {limit_p}
             )
+            SELECT
+                dc.id,
+                dc.content,
+                dc.chunk_index,
+                dc.document_id,
+                ud.original_filename,
+                1 - (dc.embedding <=> $1::vector) AS similarity,
+                fused.keyword_match
+            FROM fused
+            JOIN document_chunks dc ON dc.id = fused.id
+            JOIN user_documents ud ON dc.document_id = ud.id AND ud.user_id = $2::uuid
+            ORDER BY fused.score DESC
+        """
+    
+    async def _set_vector_search_options(self, ef_search: int) -> None:
+        """Set HNSW query options for the current transaction."""
+        from sqlalchemy import text
+        
+        settings_sql = "set_config('hnsw.ef_search', :ef_search, true)"
+        params = {"ef_search": str(ef_search)}
+        if settings.DOCUMENT_VECTOR_ITERATIVE_SCAN != "off":
+            settings_sql += ", set_config('hnsw.iterative_scan', :iterative_scan, true)"
+            params["iterative_scan"] = settings.DOCUMENT_VECTOR_ITERATIVE_SCAN
+        try:
+            # Savepoint: an older pgvector rejecting an option must not
+            # abort the caller's transaction
+            async with self.db.begin_nested():
+                await self.db.execute(text(f"SELECT {settings_sql}"), params)
+        except Exception as e:
+            print(f"[DocumentService] Could not set HNSW search options: {e}")
+    
+    async def _local_vector_search(
+        self,
+        query_embedding: List[float],
+        user_id: str,
+        document_id: Optional[str] = None,
+        limit: int = 5,
+        query_text: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Cosine top-k over the user's chunks in process (LocalVectorIndex),
+        fused with BM25 keyword results when query_text is given.
+        """
+        if not query_embedding:
+            return await self._text_search_fallback(query_embedding, user_id, document_id, limit)
+        
+        index = get_local_vector_index()
+        keyword_ids: set = set()
+        try:
+            if query_text:
+                candidates = max(settings.RAG_HYBRID_CANDIDATES, limit)
+                dense = await index.search(
+                    self.db, user_id, query_embedding, limit=candidates, document_id=document_id
+                )
+                keyword = await index.keyword_search(
+                    self.db, user_id, query_text, limit=candidates, document_id=document_id
+                )
+                keyword_ids = {chunk_id for chunk_id, _ in keyword[:settings.RAG_KEYWORD_MATCH_TOP_N]}
+                similarity = dict(dense)
+                fused = reciprocal_rank_fusion(
+                    [[chunk_id for chunk_id, _ in dense], [chunk_id for chunk_id, _ in keyword]],
+                    k=settings.RAG_RRF_K,
+                )
+                matches = [(chunk_id, similarity.get(chunk_id, 0.0)) for chunk_id, _ in fused[:limit]]
+            else:
+                matches = await index.search(
+                    self.db, user_id, query_embedding, limit=limit, document_id=document_id
+                )
+        except Exception as e:
+            print(f"[DocumentService] Local vector search failed: {e}")
+            return await self._text_search_fallback(query_embedding, user_id, document_id, limit)
+        if not matches:
+            return await self._text_search_fallback(query_embedding, user_id, document_id, limit)
+        
+        return await self._hydrate_chunks(user_id, [
+            CachedHit(chunk_id, similarity, chunk_id in keyword_ids)
+            for chunk_id, similarity in matches
+        ])
+    
+    async def _hydrate_chunks(self, user_id: str, hits: List[CachedHit]) -> List[Dict[str, Any]]:
+        """Load ranked chunk IDs into result dicts (one primary-key lookup)."""
+        result = await self.db.execute(
+            select(DocumentChunk, UserDocument.original_filename)
+            .join(UserDocument, DocumentChunk.document_id == UserDocument.id)
+            .where(
+                DocumentChunk.id.in_([uuid.UUID(hit.chunk_id) for hit in hits]),
+                UserDocument.user_id == uuid.UUID(user_id),
+            )
+        )
+        rows = {str(chunk.id): (chunk, filename) for chunk, filename in result.all()}
+        
+        return [
+            {
+                "chunk_id": hit.chunk_id,
+                "content": rows[hit.chunk_id][0].content,
+                "chunk_index": rows[hit.chunk_id][0].chunk_index,
+                "document_id": str(rows[hit.chunk_id][0].document_id),
+                "filename": rows[hit.chunk_id][1],
+                "similarity": hit.similarity,
+                "keyword_match": hit.keyword_match,
+            }
+            for hit in hits
+            if hit.chunk_id in rows  # Deleted since it was indexed/cached
+        ]
     
     async def _text_search_fallback(
         self,
@@ -368,7 +725,7 @@ class DocumentService:
         document_id: Optional[str] = None,
         limit: int = 5,
     ) -> List[Dict[str, Any]]:
-        """Fallback to simple retrieval when pgvector not available."""
+        """Last-resort retrieval when no embeddings are available (unranked)."""
         query = select(DocumentChunk, UserDocument).join(
             UserDocument, DocumentChunk.document_id == UserDocument.id
         ).where(
@@ -391,6 +748,7 @@ class DocumentService:
                 "document_id": str(chunk.document_id),
                 "filename": doc.original_filename,
                 "similarity": 0.5,  # Placeholder
+                "keyword_match": False,
             }
             for chunk, doc in rows
         ]
@@ -0,0 +1,309 @@
+"""
+AI Tutor Platform - Document Ingestion Queue
+Background jobs for uploaded documents: extraction, chunking, embedding,
+chunk storage and grade validation run off the request path, so
+POST /documents/upload returns 202 as soon as the file is saved.
+
+Jobs are keyed by document ID and run by a small pool of asyncio workers
+in each app process. Before processing, a worker claims the document
+(PENDING -> PROCESSING in one UPDATE), so a document is ingested exactly
+once even if several processes re-queue it after a restart.
+
+While a job runs its worker refreshes processing_heartbeat_at. A job
+whose worker died without cleaning up (kill -9, OOM, lost node) stops
+heartbeating; recovery deletes its partial chunks and re-queues it.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, delete, or_, select, update
+
+from app.core.config import settings
+from app.models.document import DocumentChunk, DocumentStatus, IngestionStage, UserDocument
+
+
+class DocumentIngestionQueue:
+    """
+    In-process job queue with a fixed number of worker tasks.
+
+    Queued IDs are not persisted: the document row is the durable record.
+    Documents still PENDING after a restart are re-queued by recover();
+    a job interrupted by shutdown is put back to PENDING for the same, and
+    a job that stopped heartbeating is reclaimed by recover() or by the
+    periodic stale-job sweep.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Initialize the queue.
+
+        Args:
+            workers: Documents processed concurrently in this process.
+        """
+        self.workers = max(1, workers or settings.DOCUMENT_INGESTION_WORKERS)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running: set = set()  # Document IDs being processed
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self.processed = 0
+        self.failed = 0
+        self.skipped = 0  # Claimed elsewhere or deleted while queued
+        self.reclaimed = 0  # Stale jobs of crashed workers re-queued
+
+    def start(self) -> None:
+        """Start the worker tasks (idempotent; needs a running loop)."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.ensure_future(self._worker(n)) for n in range(self.workers)
+        ]
+        self._sweeper = asyncio.ensure_future(self._sweep_stale())
+
+    async def stop(self) -> None:
+        """Cancel the workers; interrupted documents go back to PENDING."""
+        tasks, self._tasks = self._tasks, []
+        if self._sweeper is not None:
+            tasks.append(self._sweeper)
+            self._sweeper = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._queue = None
+
+    async def enqueue(self, document_id: str) -> str:
+        """Queue a document for ingestion; returns the job ID (the document ID)."""
+        self.start()
+        await self._queue.put(document_id)
+        return document_id
+
+    async def recover(self) -> int:
+        """
+        Re-queue documents left PENDING (e.g. by a restart) and stale jobs
+        of crashed workers; returns the count.
+        """
+        from app.core.database import async_session_maker
+
+        await self.reclaim_stale(enqueue=False)
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(UserDocument.id)
+                .where(UserDocument.status == DocumentStatus.PENDING)
+                .order_by(UserDocument.created_at)
+            )
+            document_ids = [str(document_id) for document_id in result.scalars().all()]
+
+        for document_id in document_ids:
+            await self.enqueue(document_id)
+        if document_ids:
+            print(f"[DocumentIngestionQueue] Re-queued {len(document_ids)} pending documents")
+        return len(document_ids)
+
+    async def reclaim_stale(self, enqueue: bool = True) -> List[str]:
+        """
+        Reset PROCESSING/VALIDATING documents without a recent heartbeat to
+        PENDING, discarding their partial chunks; returns their IDs.
+        """
+        from app.core.database import async_session_maker
+
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(UserDocument.id).where(self._stale_condition())
+            )
+            candidates = [str(document_id) for document_id in result.scalars().all()]
+
+        reclaimed = [
+            document_id for document_id in candidates
+            if document_id not in self._running
+            and await self._reset(document_id, self._stale_condition())
+        ]
+        if reclaimed:
+            self.reclaimed += len(reclaimed)
+            print(f"[DocumentIngestionQueue] Reclaimed {len(reclaimed)} stale ingestion jobs")
+            if enqueue:
+                for document_id in reclaimed:
+                    await self.enqueue(document_id)
+        return reclaimed
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and job counters."""
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": len(self._running),
+            "processed": self.processed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "reclaimed": self.reclaimed,
+        }
+
+    async def _worker(self, n: int) -> None:
+        queue = self._queue
+        while True:
+            document_id = await queue.get()
+            try:
+                await self._run_job(document_id)
+            except Exception as e:
+                self.failed += 1
+                print(f"[DocumentIngestionQueue] Worker {n}: document {document_id} failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def _run_job(self, document_id: str) -> None:
+        from app.core.database import async_session_maker
+        from app.services.document import DocumentService
+
+        async with async_session_maker() as session:
+            if not await self._claim(session, document_id):
+                self.skipped += 1
+                return
+            self._running.add(document_id)
+            heartbeat = asyncio.ensure_future(self._heartbeat(document_id))
+            try:
+                document = await DocumentService(session).process_document(document_id)
+            except asyncio.CancelledError:
+                await asyncio.shield(self._release(document_id))
+                raise
+            finally:
+                heartbeat.cancel()
+                self._running.discard(document_id)
+
+        if document is None:
+            self.skipped += 1
+        elif document.status == DocumentStatus.FAILED:
+            self.failed += 1
+        else:
+            self.processed += 1
+
+    @staticmethod
+    async def _claim(session, document_id: str) -> bool:
+        """Atomically move a document from PENDING to PROCESSING."""
+        result = await session.execute(
+            update(UserDocument)
+            .where(
+                UserDocument.id == uuid.UUID(document_id),
+                UserDocument.status == DocumentStatus.PENDING,
+            )
+            .values(status=DocumentStatus.PROCESSING, processing_heartbeat_at=_now())
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    async def _heartbeat(document_id: str) -> None:
+        """Refresh the claimed document's heartbeat until cancelled."""
+        from app.core.database import async_session_maker
+
+        while True:
+            await asyncio.sleep(settings.DOCUMENT_INGESTION_HEARTBEAT_SECONDS)
+            try:
+                async with async_session_maker() as session:
+                    await session.execute(
+                        update(UserDocument)
+                        .where(
+                            UserDocument.id == uuid.UUID(document_id),
+                            UserDocument.status.in_(_IN_PROGRESS),
+                        )
+                        .values(processing_heartbeat_at=_now())
+                    )
+                    await session.commit()
+            except Exception as e:
+                print(f"[DocumentIngestionQueue] Heartbeat for document {document_id} failed: {e}")
+
+    async def _sweep_stale(self) -> None:
+        """Periodically reclaim jobs of workers that died elsewhere."""
+        while True:
+            await asyncio.sleep(settings.DOCUMENT_INGESTION_STALE_SECONDS)
+            try:
+                await self.reclaim_stale()
+            except Exception as e:
+                print(f"[DocumentIngestionQueue] Stale job sweep failed: {e}")
+
+    @staticmethod
+    def _stale_condition():
+        """In progress, with no heartbeat within DOCUMENT_INGESTION_STALE_SECONDS."""
+        cutoff = _now() - timedelta(seconds=settings.DOCUMENT_INGESTION_STALE_SECONDS)
+        return and_(
+            UserDocument.status.in_(_IN_PROGRESS),
+            or_(
+                UserDocument.processing_heartbeat_at.is_(None),
+                UserDocument.processing_heartbeat_at < cutoff,
+            ),
+        )
+
+    @staticmethod
+    async def _release(document_id: str) -> None:
+        """Put an interrupted job back to PENDING (its chunks are discarded)."""
+        try:
+            await DocumentIngestionQueue._reset(document_id, UserDocument.status.in_(_IN_PROGRESS))
+        except Exception as e:
+            print(f"[DocumentIngestionQueue] Could not release document {document_id}: {e}")
+
+    @staticmethod
+    async def _reset(document_id: str, condition) -> bool:
+        """
+        Move a document matching `condition` back to PENDING and delete its
+        partial chunks, in one transaction. Returns False if it no longer
+        matches (finished, deleted, or reset by another process).
+        """
+        from app.core.database import async_session_maker
+        from app.services.local_vector_index import get_local_vector_index
+
+        async with async_session_maker() as session:
+            result = await session.execute(
+                update(UserDocument)
+                .where(UserDocument.id == uuid.UUID(document_id), condition)
+                .values(
+                    status=DocumentStatus.PENDING,
+                    processing_stage=IngestionStage.QUEUED,
+                    processing_progress=0,
+                    processing_heartbeat_at=None,
+                )
+                .returning(UserDocument.user_id)
+            )
+            user_id = result.scalar_one_or_none()
+            if user_id is None:
+                await session.rollback()
+                return False
+            await session.execute(
+                delete(DocumentChunk).where(DocumentChunk.document_id == uuid.UUID(document_id))
+            )
+            await session.commit()
+        await get_local_vector_index().remove_document(str(user_id), document_id)
+        return True
+
+
+# Statuses of a claimed, unfinished job
+_IN_PROGRESS = [DocumentStatus.PROCESSING, DocumentStatus.VALIDATING]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# Singleton queue shared by the upload endpoint
+_ingestion_queue: Optional[DocumentIngestionQueue] = None
+
+
+def get_ingestion_queue() -> DocumentIngestionQueue:
+    """Get the shared ingestion queue instance."""
+    global _ingestion_queue
+    if _ingestion_queue is None:
+        _ingestion_queue = DocumentIngestionQueue()
+    return _ingestion_queue
+
+
+async def ingest_document(document_id: str) -> None:
+    """
+    Entry point for running one ingestion job outside the app (Celery/cron).
+
+    Example Celery task:
+        @celery.task
+        def ingest(document_id):
+            asyncio.run(ingest_document(document_id))
+    """
+    await DocumentIngestionQueue(workers=1)._run_job(document_id)
@@ -0,0 +1,321 @@
+"""
+AI Tutor Platform - Local Vector Index
+In-process cosine search over a user's document chunk embeddings, used
+when pgvector is unavailable (SQLite, or Postgres without the extension).
+
+Each user's chunks are held in a normalized NumPy matrix, cached in an
+LRU and persisted as `{user_id}.npy` (memory-mapped on load) plus a
+`{user_id}.json` row index, so a restart does not re-read or re-embed
+every chunk. Uploads append rows and deletes drop them; a missing or
+unreadable file is rebuilt from the database. A BM25 keyword index over
+the same chunks is built on demand for hybrid search.
+"""
+import asyncio
+import json
+import os
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai.core.hybrid_search import BM25Index
+from app.ai.core.similarity import EmbeddingMatrix
+from app.core.config import settings
+from app.models.document import DocumentChunk, UserDocument
+
+
+@dataclass
+class _UserIndex:
+    """One user's chunk matrix; keys are (chunk_id, document_id) strings."""
+    matrix: EmbeddingMatrix
+    mtime: Optional[float] = None  # Persisted file version this was loaded from
+    keywords: Optional[BM25Index] = None  # Built on first keyword search
+
+
+class LocalVectorIndex:
+    """
+    Per-user chunk embedding matrices with disk persistence.
+
+    Rows come from the embedding column when the model has one, otherwise
+    chunk text is re-embedded through the shared embedding cache (once;
+    the result is persisted).
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_users: Optional[int] = None,
+        persist: Optional[bool] = None,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            directory: Where .npy/.json files are kept.
+            max_users: Users kept in memory (LRU).
+            persist: Whether to write matrices to disk.
+        """
+        self.directory = Path(directory or settings.DOCUMENT_VECTOR_FALLBACK_DIR)
+        self.max_users = max_users or settings.DOCUMENT_VECTOR_FALLBACK_CACHE_USERS
+        self.persist = settings.DOCUMENT_VECTOR_FALLBACK_PERSIST if persist is None else persist
+        self._cache: "OrderedDict[str, _UserIndex]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    # ==================== SEARCH ====================
+
+    async def search(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        query_embedding: Sequence[float],
+        limit: int = 5,
+        document_id: Optional[str] = None,
+    ) -> List[Tuple[str, float]]:
+        """Top chunks as (chunk_id, cosine similarity), best first."""
+        index = await self._get(db, user_id)
+        matrix = index.matrix
+        if not len(matrix) or limit <= 0:
+            return []
+        if matrix.dimensions != len(query_embedding):
+            print(f"[LocalVectorIndex] Query has {len(query_embedding)} dims, index has {matrix.dimensions}; rebuilding")
+            self.invalidate(user_id)
+            matrix = (await self._get(db, user_id)).matrix
+            if not len(matrix) or matrix.dimensions != len(query_embedding):
+                return []
+
+        scores = matrix.similarities(query_embedding)
+        keys = matrix.keys
+        if document_id:
+            mask = np.fromiter((doc == document_id for _, doc in keys), dtype=bool, count=len(keys))
+            scores = np.where(mask, scores, -np.inf)
+            limit = min(limit, int(mask.sum()))
+            if not limit:
+                return []
+
+        k = min(limit, scores.size)
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx])]
+        return [(keys[i][0], float(scores[i])) for i in idx]
+
+    async def keyword_search(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        query: str,
+        limit: int = 5,
+        document_id: Optional[str] = None,
+    ) -> List[Tuple[str, float]]:
+        """Top chunks by BM25 as (chunk_id, score), best first."""
+        index = await self._get(db, user_id)
+        if index.keywords is None:
+            index.keywords = await self._build_keywords(db, user_id)
+        where = (lambda key: key[1] == document_id) if document_id else None
+        return [(key[0], score) for key, score in index.keywords.search(query, limit, where=where)]
+
+    # ==================== UPDATES ====================
+
+    async def add_chunks(
+        self,
+        user_id: str,
+        document_id: str,
+        chunk_ids: Sequence[str],
+        embeddings: Sequence[Optional[Sequence[float]]],
+    ) -> None:
+        """
+        Append a new document's chunk embeddings (chunks without one are skipped).
+
+        Only updates an index that is already built (in memory or on
+        disk); otherwise the next search builds it with these rows.
+        """
+        async with self._lock(user_id):
+            index = self._current(user_id)
+            if index is None:
+                return
+            matrix = index.matrix
+            known = {chunk_id for chunk_id, _ in matrix.keys}
+            for chunk_id, vector in zip(chunk_ids, embeddings):
+                if vector is not None and chunk_id not in known:
+                    matrix.add((chunk_id, document_id), vector)
+            index.keywords = None
+            self._remember(user_id, index)
+            self._save(user_id, index)
+
+    async def remove_document(self, user_id: str, document_id: str) -> None:
+        """Drop a deleted document's rows."""
+        async with self._lock(user_id):
+            index = self._current(user_id)
+            if index is None:
+                return
+            keys = index.matrix.keys
+            keep = [i for i, (_, doc) in enumerate(keys) if doc != document_id]
+            if len(keep) == len(keys):
+                return
+            index.matrix = EmbeddingMatrix.from_array(
+                [keys[i] for i in keep],
+                np.array(index.matrix.vectors[keep], dtype=np.float32),
+                normalized=True,
+            )
+            index.keywords = None
+            self._remember(user_id, index)
+            self._save(user_id, index)
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget a user's index (memory and disk); rebuilt on next search."""
+        self._cache.pop(user_id, None)
+        for path in self._paths(user_id):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    # ==================== LOADING ====================
+
+    def _lock(self, user_id: str) -> asyncio.Lock:
+        if user_id not in self._locks:
+            self._locks[user_id] = asyncio.Lock()
+        return self._locks[user_id]
+
+    def _current(self, user_id: str) -> Optional[_UserIndex]:
+        """The cached index if still current, else the persisted one (or None)."""
+        index = self._cache.get(user_id)
+        if index is not None and self._is_current(user_id, index):
+            self._cache.move_to_end(user_id)
+            return index
+        return self._load_file(user_id)
+
+    async def _get(self, db: AsyncSession, user_id: str) -> _UserIndex:
+        async with self._lock(user_id):
+            index = self._current(user_id)
+            if index is None:
+                index = await self._build(db, user_id)
+                self._save(user_id, index)
+            self._remember(user_id, index)
+            return index
+
+    def _remember(self, user_id: str, index: _UserIndex) -> None:
+        self._cache[user_id] = index
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.max_users:
+            self._cache.popitem(last=False)
+
+    async def _build(self, db: AsyncSession, user_id: str) -> _UserIndex:
+        """Build a user's matrix from the database."""
+        columns = [DocumentChunk.id, DocumentChunk.document_id, DocumentChunk.content]
+        has_column = hasattr(DocumentChunk, "embedding")
+        if has_column:
+            columns.append(DocumentChunk.embedding)
+        result = await db.execute(
+            select(*columns)
+            .join(UserDocument, DocumentChunk.document_id == UserDocument.id)
+            .where(UserDocument.user_id == uuid.UUID(user_id))
+            .order_by(DocumentChunk.document_id, DocumentChunk.chunk_index)
+        )
+        rows = result.all()
+
+        keyed: List[Tuple[Tuple[str, str], Optional[Sequence[float]]]] = [
+            ((str(row[0]), str(row[1])), row[3] if has_column else None) for row in rows
+        ]
+        missing = [i for i, (_, vector) in enumerate(keyed) if vector is None]
+        if missing:
+            embedded = await self._embed([rows[i][2] for i in missing])
+            for i, vector in zip(missing, embedded):
+                keyed[i] = (keyed[i][0], vector)
+
+        matrix = EmbeddingMatrix()
+        for key, vector in keyed:
+            if vector is not None:
+                matrix.add(key, vector)
+        print(f"[LocalVectorIndex] Built index for user {user_id}: {len(matrix)} chunks ({len(missing)} re-embedded)")
+        return _UserIndex(matrix=matrix)
+
+    async def _build_keywords(self, db: AsyncSession, user_id: str) -> BM25Index:
+        """BM25 over a user's chunk text (in memory only; cheap to rebuild)."""
+        result = await db.execute(
+            select(DocumentChunk.id, DocumentChunk.document_id, DocumentChunk.content)
+            .join(UserDocument, DocumentChunk.document_id == UserDocument.id)
+            .where(UserDocument.user_id == uuid.UUID(user_id))
+        )
+        keywords = BM25Index()
+        for chunk_id, document_id, content in result.all():
+            keywords.add((str(chunk_id), str(document_id)), content or "")
+        return keywords
+
+    @staticmethod
+    async def _embed(texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed chunk text (documents use EMBEDDING_PROVIDER, not the dedup provider)."""
+        if not texts:
+            return []
+        from app.ai.core.embedding_cache import get_embedding_cache
+
+        try:
+            return await get_embedding_cache().get_many(texts)
+        except Exception as e:
+            print(f"[LocalVectorIndex] Re-embedding chunks failed: {e}")
+            return [None] * len(texts)
+
+    # ==================== PERSISTENCE ====================
+
+    def _paths(self, user_id: str) -> Tuple[Path, Path]:
+        safe_id = str(uuid.UUID(user_id))  # Never a path component from input
+        return self.directory / f"{safe_id}.npy", self.directory / f"{safe_id}.json"
+
+    def _is_current(self, user_id: str, index: _UserIndex) -> bool:
+        """Whether another worker has rewritten the persisted file since load."""
+        if not self.persist or index.mtime is None:
+            return True
+        try:
+            return self._paths(user_id)[0].stat().st_mtime == index.mtime
+        except FileNotFoundError:
+            return False
+
+    def _load_file(self, user_id: str) -> Optional[_UserIndex]:
+        if not self.persist:
+            return None
+        vectors_path, keys_path = self._paths(user_id)
+        try:
+            mtime = vectors_path.stat().st_mtime
+            keys = [tuple(key) for key in json.loads(keys_path.read_text())]
+            vectors = np.load(vectors_path, mmap_mode="r")
+            matrix = EmbeddingMatrix.from_array(keys, vectors, normalized=True)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[LocalVectorIndex] Ignoring unreadable index for user {user_id}: {e}")
+            return None
+        return _UserIndex(matrix=matrix, mtime=mtime)
+
+    def _save(self, user_id: str, index: _UserIndex) -> None:
+        if not self.persist:
+            return
+        vectors_path, keys_path = self._paths(user_id)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write then rename so readers never see a partial file; a
+            # reader racing the two renames sees mismatched lengths and
+            # rebuilds. Keys go first since the .npy mtime marks the version
+            tmp_keys = keys_path.with_suffix(".json.tmp")
+            tmp_keys.write_text(json.dumps(index.matrix.keys))
+            os.replace(tmp_keys, keys_path)
+            tmp_vectors = vectors_path.with_suffix(".tmp.npy")
+            np.save(tmp_vectors, np.ascontiguousarray(index.matrix.vectors, dtype=np.float32))
+            os.replace(tmp_vectors, vectors_path)
+            index.mtime = vectors_path.stat().st_mtime
+        except OSError as e:
+            print(f"[LocalVectorIndex] Could not persist index for user {user_id}: {e}")
+
+
+# Singleton index shared by DocumentService instances
+_local_vector_index: Optional[LocalVectorIndex] = None
+
+
+def get_local_vector_index() -> LocalVectorIndex:
+    """Get the shared local vector index."""
+    global _local_vector_index
+    if _local_vector_index is None:
+        _local_vector_index = LocalVectorIndex()
+    return _local_vector_index
@@ -0,0 +1,385 @@
+"""
+AI Tutor Platform - Practice Question Store
+Shared state for practice sessions: pre-generated question queues, questions
+awaiting an answer, recently asked questions and per-session answers.
+
+State lives in Redis (shared by all uvicorn workers, expired by TTL) with
+an in-process fallback when Redis is unavailable. Queues are refilled in
+the background once they drop to the refill threshold, so /practice/start
+rarely waits on the LLM.
+"""
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+# Release the refill lock only if we still own it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Coroutine factory producing a batch of question dicts
+BatchGenerator = Callable[[], Awaitable[List[Dict[str, Any]]]]
+
+
+class PracticeQuestionStore:
+    """
+    Practice session state with TTL eviction.
+
+    Keys:
+    - practice:queue:{queue_key} - list of pre-generated questions
+    - practice:active:{question_id} - question served, awaiting an answer
+    - practice:recent:{user_id} - last few question texts (avoid repeats)
+    - practice:answers:{user_id} - answers for end-of-session feedback
+    - practice:refill:{queue_key} - lock held while a worker refills
+    """
+
+    PREFIX = "practice:"
+
+    def __init__(
+        self,
+        use_redis: bool = None,
+        queue_ttl: int = None,
+        active_ttl: int = None,
+        session_ttl: int = None,
+        refill_threshold: int = None,
+        max_recent: int = 5,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            use_redis: Whether to share state through Redis.
+            queue_ttl: Seconds an idle question queue is kept.
+            active_ttl: Seconds a served question can still be answered.
+            session_ttl: Seconds recent questions and session answers are kept.
+            refill_threshold: Refill a queue once it has this many or fewer.
+            max_recent: Number of recent question texts kept per user.
+        """
+        self.use_redis = settings.PRACTICE_QUEUE_USE_REDIS if use_redis is None else use_redis
+        self.queue_ttl = queue_ttl or settings.PRACTICE_QUEUE_TTL_SECONDS
+        self.active_ttl = active_ttl or settings.PRACTICE_ACTIVE_QUESTION_TTL_SECONDS
+        self.session_ttl = session_ttl or settings.PRACTICE_SESSION_TTL_SECONDS
+        self.refill_threshold = (
+            settings.PRACTICE_QUEUE_REFILL_THRESHOLD if refill_threshold is None else refill_threshold
+        )
+        self.max_recent = max_recent
+
+        self._redis = None
+        # Local fallback: key -> (expires_at, value)
+        self._local: Dict[str, Tuple[float, Any]] = {}
+        self._refills: Dict[str, asyncio.Task] = {}
+        self._local_writes = 0
+
+        self.background_refills = 0
+        self.blocking_refills = 0
+
+    async def _get_redis(self):
+        """Get Redis connection (lazy initialization)."""
+        if not self.use_redis:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(
+                    settings.REDIS_URL,
+                    encoding="utf-8",
+                    decode_responses=True,
+                )
+                await self._redis.ping()
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis unavailable, using local store: {e}")
+                self._redis = False
+        return self._redis if self._redis else None
+
+    # ==================== LOCAL FALLBACK ====================
+
+    def _local_get(self, key: str, default: Any = None) -> Any:
+        entry = self._local.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return default
+        return value
+
+    def _local_set(self, key: str, value: Any, ttl: int) -> None:
+        self._local[key] = (time.monotonic() + ttl, value)
+        self._evict_expired()
+
+    def _evict_expired(self) -> None:
+        # Amortized sweep so abandoned sessions do not accumulate
+        self._local_writes += 1
+        if self._local_writes % 256:
+            return
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._local.items() if expires_at < now]:
+            del self._local[key]
+
+    # ==================== QUESTION QUEUE ====================
+
+    @staticmethod
+    def queue_key(user_id: str, subtopic_id: Any) -> str:
+        return f"{user_id}:{subtopic_id}"
+
+    async def queue_length(self, queue_key: str) -> int:
+        key = f"{self.PREFIX}queue:{queue_key}"
+        redis = await self._get_redis()
+        if redis:
+            try:
+                return await redis.llen(key)
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis read failed: {e}")
+        return len(self._local_get(key, []))
+
+    async def push_questions(self, queue_key: str, questions: List[Dict[str, Any]]) -> None:
+        if not questions:
+            return
+        key = f"{self.PREFIX}queue:{queue_key}"
+        redis = await self._get_redis()
+        if redis:
+            try:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.rpush(key, *(json.dumps(q, default=str) for q in questions))
+                    pipe.expire(key, self.queue_ttl)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis write failed: {e}")
+        self._local_set(key, self._local_get(key, []) + list(questions), self.queue_ttl)
+
+    async def pop_question(self, queue_key: str) -> Optional[Dict[str, Any]]:
+        key = f"{self.PREFIX}queue:{queue_key}"
+        redis = await self._get_redis()
+        if redis:
+            try:
+                raw = await redis.lpop(key)
+                return json.loads(raw) if raw else None
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis read failed: {e}")
+        queue = self._local_get(key, [])
+        return queue.pop(0) if queue else None
+
+    async def next_question(
+        self,
+        queue_key: str,
+        generate: BatchGenerator,
+        wait_timeout: float = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Serve the next queued question, refilling ahead of demand.
+
+        If the queue is empty the caller waits for a refill (joining one
+        already running in this worker). Once the queue is at or below the
+        refill threshold, a background refill is started for the next call.
+
+        Args:
+            queue_key: Queue identifier (see queue_key()).
+            generate: Produces a fresh batch of question dicts.
+            wait_timeout: Max seconds to wait on an empty queue.
+        """
+        wait_timeout = wait_timeout or settings.LLM_TIMEOUT_SECONDS * 2
+
+        question = await self.pop_question(queue_key)
+        if question is None:
+            self.blocking_refills += 1
+            task = self._start_refill(queue_key, generate)
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout=wait_timeout)
+            except asyncio.TimeoutError:
+                print(f"[PracticeQuestionStore] Refill for {queue_key} still running after {wait_timeout}s")
+            question = await self.pop_question(queue_key)
+            if question is None:
+                return None
+
+        if await self.queue_length(queue_key) <= self.refill_threshold:
+            self.background_refills += 1
+            self._start_refill(queue_key, generate)
+        return question
+
+    def _start_refill(self, queue_key: str, generate: BatchGenerator) -> asyncio.Task:
+        """Start (or join) this worker's refill task for a queue."""
+        task = self._refills.get(queue_key)
+        if task is None:
+            task = asyncio.ensure_future(self._refill(queue_key, generate))
+            self._refills[queue_key] = task
+            task.add_done_callback(lambda t: self._on_refill_done(queue_key, t))
+        return task
+
+    def _on_refill_done(self, queue_key: str, task: asyncio.Task) -> None:
+        if self._refills.get(queue_key) is task:
+            del self._refills[queue_key]
+        if not task.cancelled() and task.exception():
+            print(f"[PracticeQuestionStore] Refill for {queue_key} failed: {task.exception()}")
+
+    async def _refill(self, queue_key: str, generate: BatchGenerator) -> None:
+        """Generate a batch and append it, unless another worker is already refilling."""
+        redis = await self._get_redis()
+        lock_key = f"{self.PREFIX}refill:{queue_key}"
+        token = uuid.uuid4().hex
+
+        if redis:
+            try:
+                acquired = await redis.set(
+                    lock_key, token, nx=True, ex=settings.PRACTICE_QUEUE_REFILL_LOCK_SECONDS
+                )
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis lock failed: {e}")
+                acquired = True
+            if not acquired:
+                await self._wait_for_remote_refill(redis, queue_key, lock_key)
+                if await self.queue_length(queue_key) > 0:
+                    return
+                # The other worker's refill failed or its lock lapsed
+
+        try:
+            # Another request may have refilled while we were scheduled
+            if await self.queue_length(queue_key) > self.refill_threshold:
+                return
+            await self.push_questions(queue_key, await generate())
+        finally:
+            if redis:
+                try:
+                    await redis.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except Exception:
+                    pass  # Lock expires on its own
+
+    async def _wait_for_remote_refill(self, redis, queue_key: str, lock_key: str) -> None:
+        """Poll until another worker's refill lands (or its lock lapses)."""
+        deadline = time.monotonic() + settings.PRACTICE_QUEUE_REFILL_LOCK_SECONDS
+        while time.monotonic() < deadline:
+            if await self.queue_length(queue_key) > 0 or not await redis.exists(lock_key):
+                return
+            await asyncio.sleep(0.25)
+
+    # ==================== ACTIVE QUESTIONS ====================
+
+    async def save_active_question(self, question_id: str, question: Dict[str, Any]) -> None:
+        key = f"{self.PREFIX}active:{question_id}"
+        redis = await self._get_redis()
+        if redis:
+            try:
+                await redis.set(key, json.dumps(question, default=str), ex=self.active_ttl)
+                return
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis write failed: {e}")
+        self._local_set(key, question, self.active_ttl)
+
+    async def get_active_question(self, question_id: str) -> Optional[Dict[str, Any]]:
+        key = f"{self.PREFIX}active:{question_id}"
+        redis = await self._get_redis()
+        if redis:
+            try:
+                raw = await redis.get(key)
+                return json.loads(raw) if raw else None
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis read failed: {e}")
+        return self._local_get(key)
+
+    async def delete_active_question(self, question_id: str) -> None:
+        key = f"{self.PREFIX}active:{question_id}"
+        redis = await self._get_redis()
+        if redis:
+            try:
+                await redis.delete(key)
+                return
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis delete failed: {e}")
+        self._local.pop(key, None)
+
+    # ==================== RECENT QUESTIONS ====================
+
+    async def get_recent_questions(self, user_id: str) -> List[str]:
+        key = f"{self.PREFIX}recent:{user_id}"
+        redis = await self._get_redis()
+        if redis:
+            try:
+                return await redis.lrange(key, 0, -1)
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis read failed: {e}")
+        return list(self._local_get(key, []))
+
+    async def add_recent_question(self, user_id: str, question_text: str) -> int:
+        """Record a served question; returns how many are now tracked."""
+        key = f"{self.PREFIX}recent:{user_id}"
+        redis = await self._get_redis()
+        if redis:
+            try:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.rpush(key, question_text)
+                    pipe.ltrim(key, -self.max_recent, -1)
+                    pipe.expire(key, self.session_ttl)
+                    pipe.llen(key)
+                    results = await pipe.execute()
+                return results[-1]
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis write failed: {e}")
+        recent = (self._local_get(key, []) + [question_text])[-self.max_recent:]
+        self._local_set(key, recent, self.session_ttl)
+        return len(recent)
+
+    # ==================== SESSION ANSWERS ====================
+
+    async def add_session_answer(self, user_id: str, answer: Dict[str, Any]) -> None:
+        key = f"{self.PREFIX}answers:{user_id}"
+        redis = await self._get_redis()
+        if redis:
+            try:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.rpush(key, json.dumps(answer, default=str))
+                    pipe.expire(key, self.session_ttl)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis write failed: {e}")
+        self._local_set(key, self._local_get(key, []) + [answer], self.session_ttl)
+
+    async def get_session_answers(self, user_id: str) -> List[Dict[str, Any]]:
+        key = f"{self.PREFIX}answers:{user_id}"
+        redis = await self._get_redis()
+        if redis:
+            try:
+                return [json.loads(a) for a in await redis.lrange(key, 0, -1)]
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis read failed: {e}")
+        return list(self._local_get(key, []))
+
+    async def clear_session_answers(self, user_id: str) -> None:
+        key = f"{self.PREFIX}answers:{user_id}"
+        redis = await self._get_redis()
+        if redis:
+            try:
+                await redis.delete(key)
+                return
+            except Exception as e:
+                print(f"[PracticeQuestionStore] Redis delete failed: {e}")
+        self._local.pop(key, None)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Refill counters for telemetry."""
+        return {
+            "background_refills": self.background_refills,
+            "blocking_refills": self.blocking_refills,
+            "refills_in_flight": len(self._refills),
+        }
+
+
+# Singleton store shared by all practice requests in this worker
+_practice_store: Optional[PracticeQuestionStore] = None
+
+
+def get_practice_store() -> PracticeQuestionStore:
+    """Get the shared practice question store."""
+    global _practice_store
+    if _practice_store is None:
+        _practice_store = PracticeQuestionStore()
+    return _practice_store
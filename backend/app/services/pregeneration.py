@@ -0,0 +1,269 @@
+"""
+AI Tutor Platform - Curriculum Pre-generation Service
+Walks the seeded curriculum ahead of time and fills in lessons and the
+question bank, so the first student on a subtopic never waits on the LLM.
+
+Progress is read back from the database: a subtopic/grade with a lesson
+and enough banked questions per difficulty is skipped, so an interrupted
+run resumes where it stopped.
+"""
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.ai.core.rate_limiter import LLMPriority
+from app.core.config import settings
+from app.models.curriculum import Subject, Subtopic, Topic
+from app.models.lesson import GeneratedLesson
+from app.services.question_bank import get_question_bank
+
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+@dataclass
+class PregenerationItem:
+    """One subtopic x grade to warm."""
+    subtopic_id: uuid.UUID
+    subject: str
+    topic: str
+    subtopic: str
+    grade: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.subject} > {self.topic} > {self.subtopic} (grade {self.grade})"
+
+
+@dataclass
+class PregenerationReport:
+    """Counters for a pre-generation run."""
+    total: int = 0
+    completed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    lessons_generated: int = 0
+    questions_banked: int = 0
+    errors: List[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def summary(self) -> str:
+        return (
+            f"{self.completed}/{self.total} subtopics done "
+            f"({self.skipped} already warm, {self.failed} failed), "
+            f"{self.lessons_generated} lessons, {self.questions_banked} questions "
+            f"in {self.elapsed_seconds:.0f}s"
+        )
+
+
+class CurriculumPregenerator:
+    """
+    Generates lessons and banked questions for every subtopic x grade.
+
+    Each item runs in its own database session and commits when done, with
+    at most `concurrency` items in flight. LLM calls go out at BATCH
+    priority so live student traffic is dispatched first.
+    """
+
+    def __init__(
+        self,
+        questions_per_difficulty: Optional[int] = None,
+        difficulties: Sequence[str] = DIFFICULTIES,
+        concurrency: Optional[int] = None,
+        lessons: bool = True,
+        questions: bool = True,
+        progress: Optional[Callable[[str], None]] = print,
+    ):
+        self.questions_per_difficulty = (
+            questions_per_difficulty
+            if questions_per_difficulty is not None
+            else settings.PREGENERATION_QUESTIONS_PER_DIFFICULTY
+        )
+        self.difficulties = list(difficulties)
+        self.concurrency = max(1, concurrency or settings.PREGENERATION_CONCURRENCY)
+        self.lessons = lessons
+        self.questions = questions
+        self.progress = progress
+
+    async def plan(
+        self,
+        subject_slugs: Sequence[str] = (),
+        grades: Sequence[int] = (),
+    ) -> List[PregenerationItem]:
+        """
+        List the subtopic x grade items to warm.
+
+        Each subtopic is warmed for its topic's grade; `grades` restricts
+        the run to those grades.
+        """
+        from app.core.database import async_session_maker
+
+        async with async_session_maker() as session:
+            query = (
+                select(Subtopic)
+                .join(Topic, Subtopic.topic_id == Topic.id)
+                .join(Subject, Topic.subject_id == Subject.id)
+                .options(selectinload(Subtopic.topic).selectinload(Topic.subject))
+                .where(Subject.is_active, Topic.is_active, Subtopic.is_active)
+                .order_by(Subject.display_order, Topic.grade_level, Topic.display_order, Subtopic.display_order)
+            )
+            if subject_slugs:
+                query = query.where(Subject.slug.in_(list(subject_slugs)))
+            if grades:
+                query = query.where(Topic.grade_level.in_(list(grades)))
+            result = await session.execute(query)
+
+            return [
+                PregenerationItem(
+                    subtopic_id=subtopic.id,
+                    subject=subtopic.topic.subject.name,
+                    topic=subtopic.topic.name,
+                    subtopic=subtopic.name,
+                    grade=subtopic.topic.grade_level or 1,
+                )
+                for subtopic in result.scalars().all()
+            ]
+
+    async def run(
+        self,
+        subject_slugs: Sequence[str] = (),
+        grades: Sequence[int] = (),
+        limit: Optional[int] = None,
+    ) -> PregenerationReport:
+        """Warm the curriculum and return the run's counters."""
+        items = await self.plan(subject_slugs=subject_slugs, grades=grades)
+        if limit is not None:
+            items = items[:limit]
+
+        report = PregenerationReport(total=len(items))
+        self._log(
+            f"[Pregen] {len(items)} subtopics, {self.questions_per_difficulty} questions x "
+            f"{len(self.difficulties)} difficulties, concurrency {self.concurrency}"
+        )
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker(item: PregenerationItem) -> None:
+            async with semaphore:
+                await self._warm_item(item, report)
+
+        await asyncio.gather(*(worker(item) for item in items))
+        self._log(f"[Pregen] Finished: {report.summary()}")
+        return report
+
+    async def _warm_item(self, item: PregenerationItem, report: PregenerationReport) -> None:
+        from app.core.database import async_session_maker
+
+        lessons_made = 0
+        questions_made = 0
+        try:
+            async with async_session_maker() as session:
+                if self.lessons and not await self._has_lesson(session, item):
+                    await self._generate_lesson(session, item)
+                    lessons_made = 1
+
+                if self.questions:
+                    bank = get_question_bank(session)
+                    for difficulty in self.difficulties:
+                        have = await bank.count(item.subtopic_id, item.grade, difficulty)
+                        need = self.questions_per_difficulty - have
+                        if need <= 0:
+                            continue
+                        batch = await self._generate_questions(item, difficulty, need)
+                        banked = await bank.add_questions(
+                            item.subtopic_id, item.grade, batch, difficulty=difficulty
+                        )
+                        questions_made += len(banked)
+
+                # Commit per item so an interrupted run keeps its progress
+                await session.commit()
+        except Exception as e:
+            report.failed += 1
+            report.errors.append(f"{item.label}: {e}")
+            self._log(f"[Pregen] {self._position(report)} FAILED {item.label}: {e}")
+            return
+
+        report.completed += 1
+        report.lessons_generated += lessons_made
+        report.questions_banked += questions_made
+        if not lessons_made and not questions_made:
+            report.skipped += 1
+            status = "already warm"
+        else:
+            status = f"{lessons_made} lesson, {questions_made} questions"
+        self._log(f"[Pregen] {self._position(report)} {item.label}: {status}")
+
+    async def _has_lesson(self, session, item: PregenerationItem) -> bool:
+        result = await session.execute(
+            select(GeneratedLesson.id).where(
+                GeneratedLesson.subtopic_id == item.subtopic_id,
+                GeneratedLesson.grade_level == item.grade,
+            ).limit(1)
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def _generate_lesson(self, session, item: PregenerationItem) -> None:
+        from app.ai.agents.lesson import lesson_agent
+
+        content = await lesson_agent.generate(
+            subject=item.subject,
+            topic=item.topic,
+            subtopic=item.subtopic,
+            grade=item.grade,
+            style="story",
+            priority=LLMPriority.BATCH,
+        )
+        session.add(GeneratedLesson(
+            subtopic_id=item.subtopic_id,
+            grade_level=item.grade,
+            title=content.get("title", f"Learning {item.subtopic}"),
+            content=content,
+            generated_by="LessonAgent",
+        ))
+        await session.flush()
+
+    async def _generate_questions(self, item: PregenerationItem, difficulty: str, count: int) -> list:
+        from app.ai.agents.examiner import examiner_agent
+
+        batch = await examiner_agent.generate_batch(
+            subject=item.subject,
+            topic_distribution=[(item.topic, item.subtopic, count)],
+            difficulty_distribution=[difficulty] * count,
+            grade=item.grade,
+            session_id=f"pregen_{item.subtopic_id}_{item.grade}",
+            priority=LLMPriority.BATCH,
+        )
+        return [question for question in batch if question]
+
+    @staticmethod
+    def _position(report: PregenerationReport) -> str:
+        return f"[{report.completed + report.failed}/{report.total}]"
+
+    def _log(self, message: str) -> None:
+        if self.progress:
+            self.progress(message)
+
+
+async def pregenerate_curriculum(
+    subject_slugs: Sequence[str] = (),
+    grades: Sequence[int] = (),
+    **options,
+) -> PregenerationReport:
+    """
+    Entry point for scheduled pre-generation (Celery/cron).
+
+    Example Celery task:
+        @celery.task
+        def warm_curriculum():
+            return asyncio.run(pregenerate_curriculum()).summary()
+    """
+    return await CurriculumPregenerator(**options).run(subject_slugs=subject_slugs, grades=grades)
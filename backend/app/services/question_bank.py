@@ -0,0 +1,367 @@
+"""
+AI Tutor Platform - Question Bank Service
+Stores validated generated questions and serves them back to other students
+before falling back to the LLM.
+"""
+import hashlib
+import re
+import uuid
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, exists, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai.core.minhash import LSHIndex
+from app.ai.core.similarity import EmbeddingMatrix, similarity_service
+from app.core.config import settings
+from app.models.question_bank import BankQuestion, StudentSeenQuestion
+
+
+def question_hash(question: str) -> str:
+    """Hash of the normalized question text (case, punctuation and spacing ignored)."""
+    normalized = " ".join(re.sub(r"[^\w\s]", "", question.lower()).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def bank_question_to_dict(item: BankQuestion) -> Dict[str, Any]:
+    """Question dict in the shape used by practice queues."""
+    return {
+        "bank_question_id": str(item.id),
+        "question": item.question,
+        "answer": item.answer,
+        "correct_answers": list(item.correct_answers or [item.answer]),
+        "options": list(item.options or []),
+        "hint": item.hint,
+        "explanation": item.explanation,
+        "difficulty": item.difficulty,
+        "question_type": item.question_type,
+    }
+
+
+class QuestionBankService:
+    """
+    Question bank keyed by subtopic, grade and difficulty.
+
+    Serving draws the least-served questions the student has not seen
+    yet. Storing drops exact duplicates (normalized-text hash), lexical
+    near-duplicates (MinHash) and, when embeddings are available, semantic
+    near-duplicates of questions already banked for the same subtopic and
+    grade.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def draw(
+        self,
+        subtopic_id: uuid.UUID,
+        grade: int,
+        difficulty: str,
+        count: int,
+        student_id: Optional[uuid.UUID] = None,
+        exclude_ids: Sequence[uuid.UUID] = (),
+    ) -> List[BankQuestion]:
+        """Pick up to count banked questions the student has not seen."""
+        if count <= 0:
+            return []
+
+        query = select(BankQuestion).where(
+            BankQuestion.subtopic_id == subtopic_id,
+            BankQuestion.grade_level == grade,
+            BankQuestion.difficulty == difficulty,
+        )
+        if student_id is not None:
+            query = query.where(~exists().where(and_(
+                StudentSeenQuestion.student_id == student_id,
+                StudentSeenQuestion.question_id == BankQuestion.id,
+            )))
+        if exclude_ids:
+            query = query.where(BankQuestion.id.notin_(list(exclude_ids)))
+
+        # Spread load across the bank; random tiebreak keeps students from
+        # all receiving the same order
+        query = query.order_by(BankQuestion.times_served, func.random()).limit(count)
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    async def draw_slots(
+        self,
+        slots: Sequence[Tuple[uuid.UUID, str]],
+        grade: int,
+        student_id: Optional[uuid.UUID] = None,
+    ) -> List[Optional[BankQuestion]]:
+        """
+        Fill an ordered list of (subtopic_id, difficulty) slots from the bank.
+
+        Returns a list aligned with slots; None marks a slot the bank could
+        not fill (to be generated).
+        """
+        wanted: Dict[Tuple[uuid.UUID, str], int] = defaultdict(int)
+        for slot in slots:
+            wanted[slot] += 1
+
+        available: Dict[Tuple[uuid.UUID, str], List[BankQuestion]] = {}
+        for (subtopic_id, difficulty), count in wanted.items():
+            available[(subtopic_id, difficulty)] = await self.draw(
+                subtopic_id, grade, difficulty, count, student_id=student_id
+            )
+
+        return [available[slot].pop(0) if available[slot] else None for slot in slots]
+
+    async def fill_slots(
+        self,
+        slots: Sequence[Tuple[uuid.UUID, str]],
+        grade: int,
+        generate: Callable[[List[int]], Awaitable[Sequence[Any]]],
+        student_id: Optional[uuid.UUID] = None,
+    ) -> List[Optional[Any]]:
+        """
+        Fill (subtopic_id, difficulty) slots from the bank, generating the rest.
+
+        Args:
+            slots: Ordered question slots.
+            grade: Grade level to draw and bank under.
+            generate: Called once with the indexes of unfilled slots; returns
+                one GeneratedQuestion (or None) per index, in the same order.
+            student_id: Student to filter and record seen questions for.
+
+        Generated questions are banked under their slot's subtopic and
+        difficulty. A result that is not aligned with the requested slots
+        is discarded rather than banked under a subtopic it may not belong to.
+
+        Returns a list aligned with slots holding BankQuestion or
+        GeneratedQuestion objects (None where nothing could be supplied).
+        """
+        filled: List[Optional[Any]] = [None] * len(slots)
+        if settings.QUESTION_BANK_ENABLED:
+            filled = await self.draw_slots(slots, grade, student_id=student_id)
+        drawn = [q for q in filled if q is not None]
+
+        missing = [i for i, q in enumerate(filled) if q is None]
+        banked: List[BankQuestion] = []
+        if missing:
+            generated = list(await generate(missing))
+            if len(generated) != len(missing):
+                print(
+                    f"[QuestionBank] Got {len(generated)} questions for {len(missing)} slots; "
+                    "discarding them (slot subtopics cannot be confirmed)"
+                )
+                generated = [None] * len(missing)
+
+            by_slot: Dict[Tuple[uuid.UUID, str], List[Any]] = defaultdict(list)
+            for slot_idx, question in zip(missing, generated):
+                if question is None:
+                    continue
+                filled[slot_idx] = question
+                by_slot[slots[slot_idx]].append(question)
+
+            if settings.QUESTION_BANK_ENABLED:
+                for (subtopic_id, difficulty), questions in by_slot.items():
+                    banked += await self.add_questions(subtopic_id, grade, questions, difficulty=difficulty)
+
+        await self.mark_served(drawn + banked, student_id=student_id)
+        return filled
+
+    async def mark_served(
+        self,
+        questions: Sequence[BankQuestion],
+        student_id: Optional[uuid.UUID] = None,
+    ) -> None:
+        """Count the serve and remember the student has seen these questions."""
+        ids = [q.id for q in questions]
+        if not ids:
+            return
+        await self.db.execute(
+            update(BankQuestion)
+            .where(BankQuestion.id.in_(ids))
+            .values(times_served=BankQuestion.times_served + 1)
+        )
+        if student_id is not None:
+            seen = await self.db.execute(
+                select(StudentSeenQuestion.question_id).where(
+                    StudentSeenQuestion.student_id == student_id,
+                    StudentSeenQuestion.question_id.in_(ids),
+                )
+            )
+            already = set(seen.scalars().all())
+            try:
+                async with self.db.begin_nested():
+                    self.db.add_all([
+                        StudentSeenQuestion(student_id=student_id, question_id=qid)
+                        for qid in dict.fromkeys(ids) if qid not in already
+                    ])
+            except IntegrityError:
+                pass  # A concurrent request already recorded them
+        await self.db.flush()
+
+    async def add_questions(
+        self,
+        subtopic_id: uuid.UUID,
+        grade: int,
+        questions: Sequence[Any],
+        difficulty: Optional[str] = None,
+        generated_by: Optional[str] = None,
+    ) -> List[BankQuestion]:
+        """
+        Bank validated GeneratedQuestion objects, skipping duplicates.
+
+        Args:
+            subtopic_id: Subtopic the questions were generated for.
+            grade: Grade they were generated for.
+            questions: GeneratedQuestion objects (already answer-verified).
+            difficulty: Bank them all under this difficulty; by default
+                each question's own difficulty label is used.
+            generated_by: Model name (defaults to the configured LLM).
+
+        Returns the newly banked rows (in input order).
+        """
+        if not questions:
+            return []
+
+        hashes = [question_hash(q.question) for q in questions]
+        result = await self.db.execute(
+            select(BankQuestion.question_hash).where(
+                BankQuestion.subtopic_id == subtopic_id,
+                BankQuestion.grade_level == grade,
+                BankQuestion.question_hash.in_(hashes),
+            )
+        )
+        known_hashes = set(result.scalars().all())
+
+        use_embeddings = similarity_service.is_enabled and hasattr(BankQuestion, "embedding")
+        lexical, existing = await self._recent_index(subtopic_id, grade, use_embeddings)
+
+        # MinHash first: lexical near-duplicates are dropped without
+        # spending an embedding call on them
+        candidates = []
+        for q, q_hash in zip(questions, hashes):
+            if q_hash in known_hashes or not q.question.strip():
+                continue
+            if lexical.query(q.question, settings.QUESTION_BANK_MINHASH_THRESHOLD):
+                continue
+            lexical.add(q_hash, q.question)
+            known_hashes.add(q_hash)
+            candidates.append((q, q_hash))
+
+        vectors = (
+            await similarity_service.get_embeddings([q.question for q, _ in candidates])
+            if use_embeddings else [None] * len(candidates)
+        )
+
+        added = []
+        for (q, q_hash), vector in zip(candidates, vectors):
+            if vector and self._is_near_duplicate(vector, existing):
+                continue
+
+            item = BankQuestion(
+                subtopic_id=subtopic_id,
+                grade_level=grade,
+                difficulty=(difficulty or q.difficulty or "medium").lower(),
+                question=q.question,
+                question_type=q.question_type or "multiple_choice",
+                answer=q.answer,
+                correct_answers=list(q.correct_answers or [q.answer]),
+                options=list(q.options or []),
+                hint=q.hint or "",
+                explanation=q.explanation or "",
+                question_hash=q_hash,
+                generated_by=generated_by or settings.LLM_MODEL,
+            )
+            if vector:
+                item.embedding = vector
+                item.embedding_model = similarity_service.model_id
+                existing.add(q_hash, vector)
+            added.append(item)
+
+        if not added:
+            return []
+        try:
+            # Savepoint: a concurrent writer banking the same question must
+            # not fail the caller's transaction
+            async with self.db.begin_nested():
+                self.db.add_all(added)
+        except IntegrityError:
+            print(f"[QuestionBank] Concurrent insert for subtopic {subtopic_id}, skipped {len(added)} questions")
+            return []
+        return added
+
+    async def count(self, subtopic_id: uuid.UUID, grade: int, difficulty: Optional[str] = None) -> int:
+        """Number of banked questions for a subtopic/grade (optionally one difficulty)."""
+        query = select(func.count(BankQuestion.id)).where(
+            BankQuestion.subtopic_id == subtopic_id,
+            BankQuestion.grade_level == grade,
+        )
+        if difficulty:
+            query = query.where(BankQuestion.difficulty == difficulty)
+        result = await self.db.execute(query)
+        return result.scalar() or 0
+
+    async def _recent_index(
+        self,
+        subtopic_id: uuid.UUID,
+        grade: int,
+        with_embeddings: bool,
+    ) -> Tuple[LSHIndex, EmbeddingMatrix]:
+        """
+        MinHash index and embedding matrix of recently banked questions.
+
+        Only vectors from the current similarity model are compared; rows
+        embedded by another model (or before models were recorded) are
+        re-embedded and updated in place.
+        """
+        columns = [BankQuestion.question_hash, BankQuestion.question]
+        if with_embeddings:
+            columns += [BankQuestion.id, BankQuestion.embedding, BankQuestion.embedding_model]
+        result = await self.db.execute(
+            select(*columns)
+            .where(
+                BankQuestion.subtopic_id == subtopic_id,
+                BankQuestion.grade_level == grade,
+            )
+            .order_by(BankQuestion.created_at.desc())
+            .limit(settings.QUESTION_BANK_DEDUP_CANDIDATES)
+        )
+
+        lexical = LSHIndex()
+        matrix = EmbeddingMatrix()
+        model_id = similarity_service.model_id
+        stale = []
+        for row in result.all():
+            lexical.add(row[0], row[1])
+            if not with_embeddings:
+                continue
+            if row[3] is not None and row[4] == model_id:
+                matrix.add(row[0], row[3])
+            else:
+                stale.append(row)
+        if stale:
+            await self._reembed(stale, matrix, model_id)
+        return lexical, matrix
+
+    async def _reembed(self, rows: Sequence[Any], matrix: EmbeddingMatrix, model_id: str) -> None:
+        """Embed rows with the current similarity model, add them to matrix and store the vectors."""
+        vectors = await similarity_service.get_embeddings([row[1] for row in rows])
+        updates = []
+        for row, vector in zip(rows, vectors):
+            if vector:
+                matrix.add(row[0], vector)
+                updates.append({"id": row[2], "embedding": vector, "embedding_model": model_id})
+        if not updates:
+            return
+        try:
+            async with self.db.begin_nested():
+                await self.db.execute(update(BankQuestion), updates)  # Bulk update by primary key
+        except Exception as e:
+            print(f"[QuestionBank] Could not store re-embedded vectors: {e}")
+
+    @staticmethod
+    def _is_near_duplicate(vector: List[float], existing: EmbeddingMatrix) -> bool:
+        best = existing.top_k(vector, k=1)
+        return bool(best) and best[0][1] >= settings.QUESTION_BANK_DEDUP_THRESHOLD
+
+
+def get_question_bank(db: AsyncSession) -> QuestionBankService:
+    """Factory function for the question bank service."""
+    return QuestionBankService(db)
@@ -0,0 +1,212 @@
+"""
+AI Tutor Platform - Retrieval Cache
+Ranked chunk IDs per (user, document, normalized query), so repeated
+document chat, quiz regeneration and search requests skip both the query
+embedding and the vector scan. Keys include a version of the user's
+document set (see DocumentService._retrieval_version), so an upload or
+delete seen by any worker retires older entries; the user's entries are
+also dropped from this worker's LRU and from Redis.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+@dataclass
+class CachedHit:
+    """One ranked chunk of a cached retrieval."""
+    chunk_id: str
+    similarity: float
+    keyword_match: bool = False
+
+
+def normalize_query(query: str) -> str:
+    """Case, whitespace and trailing punctuation insensitive form of a query."""
+    return " ".join(query.lower().split()).rstrip(" ?!.")
+
+
+class RetrievalCache:
+    """
+    Retrieval results with TTL eviction.
+
+    With Redis each user's entries live in one hash
+    (rag:retrieval:{user_id}, field = query key) so invalidation is a
+    single DEL shared by all workers; otherwise a local LRU is used.
+    Every entry carries its own expiry: the hash's EXPIRE is refreshed
+    on each write, so it only bounds idle users.
+    """
+
+    KEY_PREFIX = "rag:retrieval:"
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        ttl: int = None,
+        use_redis: bool = None,
+    ):
+        """
+        Initialize the retrieval cache.
+
+        Args:
+            max_entries: Maximum entries in the local LRU.
+            ttl: Entry lifetime in seconds.
+            use_redis: Whether to share entries through Redis.
+        """
+        self.max_entries = max_entries or settings.RETRIEVAL_CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.RETRIEVAL_CACHE_TTL_SECONDS
+        self.use_redis = settings.RETRIEVAL_CACHE_USE_REDIS if use_redis is None else use_redis
+
+        # Local fallback: (user_id, key) -> (expires_at, hits)
+        self._local: "OrderedDict[Tuple[str, str], Tuple[float, List[CachedHit]]]" = OrderedDict()
+        self._redis = None
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(document_id: Optional[str], query: str, limit: int, version: str = "") -> str:
+        """Key for a query within one user's entries (version: of the user's document set)."""
+        digest = hashlib.sha256()
+        for part in (
+            version,
+            document_id or "*",
+            normalize_query(query),
+            str(limit),
+            # Ranking depends on the embedding model and retrieval mode
+            settings.EMBEDDING_PROVIDER,
+            settings.EMBEDDING_MODEL,
+            str(settings.RAG_HYBRID_SEARCH),
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    async def _get_redis(self):
+        """Get Redis connection (lazy initialization)."""
+        if not self.use_redis:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(
+                    settings.REDIS_URL,
+                    encoding="utf-8",
+                    decode_responses=True,
+                )
+                await self._redis.ping()
+            except Exception as e:
+                print(f"[RetrievalCache] Redis unavailable, using local cache: {e}")
+                self._redis = False
+        return self._redis if self._redis else None
+
+    async def get(
+        self,
+        user_id: str,
+        document_id: Optional[str],
+        query: str,
+        limit: int,
+        version: str = "",
+    ) -> Optional[List[CachedHit]]:
+        """Cached ranked chunks for a query, or None."""
+        key = self.make_key(document_id, query, limit, version)
+        hits = None
+
+        redis = await self._get_redis()
+        if redis:
+            try:
+                raw = await redis.hget(self.KEY_PREFIX + user_id, key)
+                if raw:
+                    entry = json.loads(raw)
+                    if isinstance(entry, dict) and entry.get("expires_at", 0) >= time.time():
+                        hits = [CachedHit(**item) for item in entry["hits"]]
+                    else:
+                        await redis.hdel(self.KEY_PREFIX + user_id, key)
+            except Exception as e:
+                print(f"[RetrievalCache] Redis read failed: {e}")
+        else:
+            entry = self._local.get((user_id, key))
+            if entry is not None:
+                expires_at, hits = entry
+                if expires_at < time.monotonic():
+                    del self._local[(user_id, key)]
+                    hits = None
+                else:
+                    self._local.move_to_end((user_id, key))
+
+        if hits is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return hits
+
+    async def set(
+        self,
+        user_id: str,
+        document_id: Optional[str],
+        query: str,
+        limit: int,
+        hits: List[CachedHit],
+        version: str = "",
+    ) -> None:
+        """Store the ranked chunks for a query."""
+        key = self.make_key(document_id, query, limit, version)
+
+        redis = await self._get_redis()
+        if redis:
+            try:
+                entry = {"expires_at": time.time() + self.ttl, "hits": [asdict(h) for h in hits]}
+                pipe = redis.pipeline(transaction=False)
+                pipe.hset(self.KEY_PREFIX + user_id, key, json.dumps(entry))
+                pipe.expire(self.KEY_PREFIX + user_id, self.ttl)
+                await pipe.execute()
+            except Exception as e:
+                print(f"[RetrievalCache] Redis write failed: {e}")
+            return
+
+        self._local[(user_id, key)] = (time.monotonic() + self.ttl, hits)
+        self._local.move_to_end((user_id, key))
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def invalidate_user(self, user_id: str) -> None:
+        """Drop all of a user's entries (their document set changed)."""
+        self.invalidations += 1
+        for entry_key in [k for k in self._local if k[0] == user_id]:
+            del self._local[entry_key]
+
+        redis = await self._get_redis()
+        if redis:
+            try:
+                await redis.delete(self.KEY_PREFIX + user_id)
+            except Exception as e:
+                print(f"[RetrievalCache] Redis delete failed: {e}")
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for telemetry."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._local),
+        }
+
+
+# Singleton cache shared by document search, chat and quiz
+_retrieval_cache: Optional[RetrievalCache] = None
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Get the shared retrieval cache instance."""
+    global _retrieval_cache
+    if _retrieval_cache is None:
+        _retrieval_cache = RetrievalCache()
+    return _retrieval_cache
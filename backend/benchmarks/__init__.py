@@ -0,0 +1,7 @@
+"""
+AI Tutor Platform - Load Test & Benchmark Suite
+Drives simulated student sessions against the FastAPI app in-process and
+reports per-endpoint throughput, latency percentiles and DB query counts.
+
+Run with: python -m benchmarks --help
+"""
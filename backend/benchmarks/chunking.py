@@ -0,0 +1,218 @@
+"""
+AI Tutor Platform - Document Chunking Benchmark
+
+Chunks a generated text (1 MB by default) with cl100k_base and compares:
+- legacy: the original DocumentAgent._chunk_text (one encode per sentence,
+  per word of long sentences and per overlap sentence; kept here as the
+  reference)
+- compatible: SentenceChunker with cached counts (must match legacy)
+- token: TokenChunker, one encode per page
+Compatible boundaries are checked against legacy; the run fails on any
+difference.
+
+Examples (from backend/):
+    python -m benchmarks.chunking
+    python -m benchmarks.chunking --size 4000000 --chunk-size 300 --overlap 30
+    python -m benchmarks.chunking --file uploads/documents/textbook.txt
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from typing import Callable, List
+
+
+WORDS = """
+the of and to in is that for it as was with be by on not he this are or his
+from at which but have an they you were her she there been one all we their
+plant plants photosynthesis energy sunlight water carbon dioxide oxygen leaf
+fraction numerator denominator multiply divide equation variable triangle
+angle perimeter area volume river mountain climate continent history empire
+""".split()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.chunking", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--file", help="Text file to chunk instead of generated text")
+    parser.add_argument("--size", type=int, default=1_000_000, help="Generated text size in characters")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--overlap", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per chunker (best is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def generate_text(size: int, seed: int) -> str:
+    """Sentences of varying length, with the odd run-on sentence."""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    length = 0
+    while length < size:
+        n_words = rng.choice([4, 8, 12, 16, 24, 40]) if rng.random() > 0.01 else 700
+        sentence = " ".join(rng.choice(WORDS) for _ in range(n_words)).capitalize()
+        sentence += rng.choice(".!?") + rng.choice([" ", " ", "\n"])
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)[:size].strip()
+
+
+def legacy_chunk_text(count_tokens: Callable[[str], int], text: str, chunk_size: int, overlap: int):
+    """The original DocumentAgent._chunk_text, unchanged apart from the signature."""
+    from app.ai.core.chunking import ChunkResult
+
+    # Split into sentences
+    sentences = re.split(r'(?<=[.!?])\s+', text)
+
+    chunks = []
+    token_counts = []
+    metadata = []
+
+    current_chunk = []
+    current_tokens = 0
+    chunk_index = 0
+
+    for sentence in sentences:
+        sentence_tokens = count_tokens(sentence)
+
+        # If single sentence exceeds chunk size, split it
+        if sentence_tokens > chunk_size:
+            # Save current chunk if any
+            if current_chunk:
+                chunk_text = ' '.join(current_chunk)
+                chunks.append(chunk_text)
+                token_counts.append(current_tokens)
+                metadata.append({"chunk_index": chunk_index})
+                chunk_index += 1
+                current_chunk = []
+                current_tokens = 0
+
+            # Split long sentence by words
+            words = sentence.split()
+            word_chunk = []
+            word_tokens = 0
+
+            for word in words:
+                word_token_count = count_tokens(word)
+                if word_tokens + word_token_count > chunk_size:
+                    if word_chunk:
+                        chunk_text = ' '.join(word_chunk)
+                        chunks.append(chunk_text)
+                        token_counts.append(word_tokens)
+                        metadata.append({"chunk_index": chunk_index})
+                        chunk_index += 1
+                    word_chunk = [word]
+                    word_tokens = word_token_count
+                else:
+                    word_chunk.append(word)
+                    word_tokens += word_token_count
+
+            if word_chunk:
+                # Add remainder to current_chunk for overlap
+                current_chunk = word_chunk
+                current_tokens = word_tokens
+
+        elif current_tokens + sentence_tokens > chunk_size:
+            # Save current chunk
+            chunk_text = ' '.join(current_chunk)
+            chunks.append(chunk_text)
+            token_counts.append(current_tokens)
+            metadata.append({"chunk_index": chunk_index})
+            chunk_index += 1
+
+            # Start new chunk with overlap
+            overlap_sentences = []
+            overlap_tokens = 0
+
+            for s in reversed(current_chunk):
+                s_tokens = count_tokens(s)
+                if overlap_tokens + s_tokens <= overlap:
+                    overlap_sentences.insert(0, s)
+                    overlap_tokens += s_tokens
+                else:
+                    break
+
+            current_chunk = overlap_sentences + [sentence]
+            current_tokens = overlap_tokens + sentence_tokens
+        else:
+            current_chunk.append(sentence)
+            current_tokens += sentence_tokens
+
+    # Don't forget the last chunk
+    if current_chunk:
+        chunk_text = ' '.join(current_chunk)
+        chunks.append(chunk_text)
+        token_counts.append(current_tokens)
+        metadata.append({"chunk_index": chunk_index})
+
+    return ChunkResult(
+        chunks=chunks,
+        token_counts=token_counts,
+        total_tokens=sum(token_counts),
+        metadata=metadata
+    )
+
+
+def best_of(repeat: int, run: Callable[[], object]):
+    """(best seconds, last result) over `repeat` runs."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    import tiktoken
+
+    from app.ai.core.chunking import create_chunker, token_byte_lengths
+
+    tokenizer = tiktoken.get_encoding("cl100k_base")
+    token_byte_lengths(tokenizer)  # One-time table, not part of the timing
+
+    def count_tokens(text: str) -> int:
+        return len(tokenizer.encode(text))
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = generate_text(args.size, args.seed)
+    print(f"Text: {len(text):,} chars, {len(tokenizer.encode_ordinary(text)):,} tokens "
+          f"(chunk_size {args.chunk_size}, overlap {args.overlap})")
+
+    def chunk(mode: str):
+        def run():
+            chunker = create_chunker(tokenizer, count_tokens, args.chunk_size, args.overlap, mode=mode)
+            chunker.feed(text)
+            return chunker.finish()
+        return run
+
+    runs = {
+        "legacy": lambda: legacy_chunk_text(count_tokens, text, args.chunk_size, args.overlap),
+        "compatible": chunk("compatible"),
+        "token": chunk("token"),
+    }
+    results = {}
+    baseline = None
+    for name, run in runs.items():
+        seconds, result = best_of(args.repeat, run)
+        results[name] = result
+        baseline = baseline or seconds
+        print(f"{name:<11} {seconds * 1000:9.1f} ms  {baseline / seconds:5.2f}x  "
+              f"{len(result.chunks):6,} chunks  {result.total_tokens:9,} tokens")
+
+    legacy, compatible = results["legacy"], results["compatible"]
+    if (legacy.chunks, legacy.token_counts) != (compatible.chunks, compatible.token_counts):
+        print("compatible chunks differ from legacy")
+        return 1
+    print("compatible chunks identical to legacy")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+AI Tutor Platform - Benchmark Harness
+Per-endpoint latency/query recording, reporting and baseline comparison.
+"""
+import json
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+# The request currently being measured; SQLAlchemy runs cursor events in
+# the calling task's context, so queries are attributed to the right call.
+_current_sample: ContextVar[Optional["RequestSample"]] = ContextVar("benchmark_sample", default=None)
+
+
+@dataclass
+class RequestSample:
+    """A single measured request."""
+    endpoint: str
+    queries: int = 0
+    latency_ms: float = 0.0
+    ok: bool = True
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0-100) of an unsorted list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+@dataclass
+class EndpointStats:
+    """Aggregated results for one endpoint."""
+    endpoint: str
+    latencies_ms: List[float] = field(default_factory=list)
+    queries: List[int] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies_ms)
+
+    def summary(self, duration_seconds: float) -> Dict[str, Any]:
+        return {
+            "requests": self.count,
+            "errors": self.errors,
+            "throughput_rps": round(self.count / duration_seconds, 3) if duration_seconds else 0.0,
+            "p50_ms": round(percentile(self.latencies_ms, 50), 2),
+            "p95_ms": round(percentile(self.latencies_ms, 95), 2),
+            "p99_ms": round(percentile(self.latencies_ms, 99), 2),
+            "queries_mean": round(sum(self.queries) / len(self.queries), 2) if self.queries else 0.0,
+            "queries_max": max(self.queries, default=0),
+        }
+
+
+class BenchmarkRecorder:
+    """
+    Records latency and DB query counts per endpoint.
+
+    Usage:
+        recorder = BenchmarkRecorder()
+        recorder.install(engine)
+        response = await recorder.measure("practice/start", client.post(...))
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, EndpointStats] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def install(self, engine: AsyncEngine) -> None:
+        """Count every statement executed on the engine."""
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def _count_query(conn, cursor, statement, parameters, context, executemany):
+            sample = _current_sample.get()
+            if sample is not None:
+                sample.queries += 1
+
+    @contextmanager
+    def run(self) -> Iterator["BenchmarkRecorder"]:
+        """Mark the measured window (used for throughput)."""
+        self.started_at = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.finished_at = time.perf_counter()
+
+    async def measure(self, endpoint: str, call: Awaitable[Any], expected: tuple = (200, 201, 202)) -> Any:
+        """Await an HTTP call, recording its latency, status and query count."""
+        sample = RequestSample(endpoint=endpoint)
+        token = _current_sample.set(sample)
+        start = time.perf_counter()
+        try:
+            response = await call
+            sample.ok = getattr(response, "status_code", 200) in expected
+            return response
+        except Exception:
+            sample.ok = False
+            raise
+        finally:
+            sample.latency_ms = (time.perf_counter() - start) * 1000.0
+            _current_sample.reset(token)
+            self._record(sample)
+
+    def _record(self, sample: RequestSample) -> None:
+        stats = self.stats.setdefault(sample.endpoint, EndpointStats(sample.endpoint))
+        stats.latencies_ms.append(sample.latency_ms)
+        stats.queries.append(sample.queries)
+        if not sample.ok:
+            stats.errors += 1
+
+    @property
+    def duration_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def report(self, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        duration = self.duration_seconds
+        total = sum(s.count for s in self.stats.values())
+        return {
+            "metadata": metadata or {},
+            "duration_seconds": round(duration, 3),
+            "total_requests": total,
+            "throughput_rps": round(total / duration, 3) if duration else 0.0,
+            "endpoints": {
+                name: stats.summary(duration)
+                for name, stats in sorted(self.stats.items())
+            },
+        }
+
+
+# ==================== REPORTING ====================
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a report as a fixed-width table."""
+    header = f"{'endpoint':<28}{'reqs':>7}{'err':>5}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"
+    lines = [header, "-" * len(header)]
+    for name, s in report["endpoints"].items():
+        lines.append(
+            f"{name:<28}{s['requests']:>7}{s['errors']:>5}{s['throughput_rps']:>10.2f}"
+            f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['queries_mean']:>9.1f}"
+        )
+    lines.append("-" * len(header))
+    lines.append(
+        f"{report['total_requests']} requests in {report['duration_seconds']:.1f}s "
+        f"({report['throughput_rps']:.2f} req/s)"
+    )
+    return "\n".join(lines)
+
+
+def save_report(report: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text())
+
+
+# ==================== REGRESSION CHECK ====================
+
+def compare_to_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    latency_tolerance: float = 0.25,
+    throughput_tolerance: float = 0.25,
+    query_slack: float = 0.5,
+    latency_slack_ms: float = 0.0,
+) -> List[str]:
+    """
+    Compare a run against a saved baseline.
+
+    Returns a list of human-readable regressions (empty = pass):
+    - p50/p95 latency more than latency_tolerance (plus latency_slack_ms) above baseline
+    - throughput more than throughput_tolerance below baseline
+    - mean queries per request more than query_slack above baseline
+    - errors on an endpoint that had none
+    """
+    regressions = []
+
+    base_rps = baseline.get("throughput_rps", 0.0)
+    if base_rps and report["throughput_rps"] < base_rps * (1 - throughput_tolerance):
+        regressions.append(
+            f"overall throughput {report['throughput_rps']:.2f} req/s < baseline {base_rps:.2f} req/s"
+        )
+
+    for name, base in baseline.get("endpoints", {}).items():
+        current = report["endpoints"].get(name)
+        if current is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+
+        for metric in ("p50_ms", "p95_ms"):
+            if base[metric] and current[metric] > base[metric] * (1 + latency_tolerance) + latency_slack_ms:
+                regressions.append(
+                    f"{name}: {metric} {current[metric]:.1f} > baseline {base[metric]:.1f}"
+                )
+
+        if current["queries_mean"] > base["queries_mean"] + query_slack:
+            regressions.append(
+                f"{name}: {current['queries_mean']:.1f} queries/request > baseline {base['queries_mean']:.1f}"
+            )
+
+        if current["errors"] and not base["errors"]:
+            regressions.append(f"{name}: {current['errors']} errors (baseline had none)")
+
+    return regressions
@@ -0,0 +1,209 @@
+"""
+AI Tutor Platform - Benchmark Scenarios
+Seed data and simulated student sessions driven through the public API.
+"""
+import random
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.curriculum import DifficultyLevel, Subject, Subtopic, Topic
+from benchmarks.harness import BenchmarkRecorder
+
+
+API = settings.API_V1_PREFIX
+
+CHAT_MESSAGES = [
+    "Why do we carry the one when adding?",
+    "Can you explain fractions with pizza?",
+    "What is the difference between area and perimeter?",
+    "How do I know which number is bigger?",
+    "Is zero an even number?",
+]
+
+SAMPLE_DOCUMENT = (
+    "Plants make their own food using sunlight, water and air. This process is "
+    "called photosynthesis. The leaves take in carbon dioxide and the roots take "
+    "in water. Chlorophyll makes leaves green and captures sunlight. "
+) * 40
+
+
+@dataclass
+class SeededCurriculum:
+    """Curriculum rows created for a benchmark run."""
+    topic_ids: List[uuid.UUID]
+    subtopic_ids: List[uuid.UUID]
+
+
+async def seed_curriculum(
+    db: AsyncSession,
+    run_id: str,
+    topics: int = 3,
+    subtopics_per_topic: int = 3,
+) -> SeededCurriculum:
+    """
+    Create a small mathematics curriculum to practice and test against.
+
+    Names are suffixed with run_id so runs can share a database.
+    """
+    subject = Subject(name=f"Mathematics {run_id}", slug=f"mathematics-{run_id}", icon="🔢")
+    db.add(subject)
+    await db.flush()
+
+    topic_ids, subtopic_ids = [], []
+    difficulties = list(DifficultyLevel)
+    for t in range(topics):
+        topic = Topic(
+            subject_id=subject.id,
+            name=f"Numbers {t + 1}",
+            slug=f"numbers-{t + 1}-{run_id}",
+            grade_level=3,
+            display_order=t,
+        )
+        db.add(topic)
+        await db.flush()
+        topic_ids.append(topic.id)
+
+        for s in range(subtopics_per_topic):
+            subtopic = Subtopic(
+                topic_id=topic.id,
+                name=f"Addition and Subtraction {t + 1}.{s + 1}",
+                slug=f"add-sub-{t + 1}-{s + 1}-{run_id}",
+                difficulty=difficulties[s % len(difficulties)],
+                display_order=s,
+            )
+            db.add(subtopic)
+            await db.flush()
+            subtopic_ids.append(subtopic.id)
+
+    await db.commit()
+    return SeededCurriculum(topic_ids=topic_ids, subtopic_ids=subtopic_ids)
+
+
+class StudentSession:
+    """
+    One parent account with one student, behaving like a real learner:
+    a few practice questions, a topic test, some tutor chat, an occasional
+    document upload, and the parent checking the dashboard.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        client: AsyncClient,
+        recorder: BenchmarkRecorder,
+        curriculum: SeededCurriculum,
+        seed: int = 0,
+    ):
+        self.index = index
+        self.client = client
+        self.recorder = recorder
+        self.curriculum = curriculum
+        self.rng = random.Random(seed * 100003 + index)
+        self.headers: Dict[str, str] = {}
+        self.student_id: str = ""
+
+    async def setup(self) -> None:
+        """Register, log in and create the student profile (not measured)."""
+        email = f"bench-{self.index}-{uuid.uuid4().hex[:8]}@example.com"
+        password = "BenchPass123!"
+        response = await self.client.post(f"{API}/auth/register", json={
+            "email": email,
+            "password": password,
+            "first_name": "Bench",
+            "last_name": f"Parent{self.index}",
+        })
+        response.raise_for_status()
+
+        response = await self.client.post(f"{API}/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        response = await self.client.post(f"{API}/users/me/students", headers=self.headers, json={
+            "first_name": "Bench",
+            "last_name": f"Student{self.index}",
+            "grade_level": 3,
+        })
+        response.raise_for_status()
+        self.student_id = response.json()["id"]
+
+    async def run(self, practice_questions: int = 5, chat_turns: int = 2, upload_probability: float = 0.2) -> None:
+        await self.practice(practice_questions)
+        await self.topic_test()
+        await self.chat(chat_turns)
+        if self.rng.random() < upload_probability:
+            await self.upload_document()
+        await self.parent_dashboard()
+
+    async def _post(self, endpoint: str, path: str, **kwargs) -> Any:
+        return await self.recorder.measure(
+            endpoint, self.client.post(f"{API}{path}", headers=self.headers, **kwargs)
+        )
+
+    async def practice(self, questions: int) -> None:
+        subtopic_id = str(self.rng.choice(self.curriculum.subtopic_ids))
+        for _ in range(questions):
+            response = await self._post("practice/start", "/practice/start", json={"subtopic_id": subtopic_id})
+            if response.status_code != 200:
+                continue
+            question = response.json()
+            options = question.get("options") or ["42"]
+            await self._post("practice/answer", "/practice/answer", json={
+                "question_id": question["question_id"],
+                "answer": self.rng.choice(options),
+            })
+
+    async def topic_test(self) -> None:
+        topic_id = str(self.rng.choice(self.curriculum.topic_ids))
+        response = await self._post("tests/start", "/tests/start", json={"topic_id": topic_id})
+        if response.status_code != 200:
+            return
+        test = response.json()
+
+        # The fake provider lists the correct option first
+        answers = []
+        for q in test["questions"]:
+            options = q["options"] or ["?"]
+            answers.append({
+                "question_id": q["question_id"],
+                "question": q["question"],
+                "answer": options[0] if self.rng.random() < 0.7 else self.rng.choice(options),
+                "correct_answer": options[0],
+                "subtopic_id": q.get("subtopic_id"),
+            })
+
+        await self._post("tests/submit", "/tests/submit", json={
+            "test_id": test["test_id"],
+            "topic_id": topic_id,
+            "topic_name": test["topic_name"],
+            "answers": answers,
+            "duration_seconds": self.rng.randint(120, 600),
+        })
+
+    async def chat(self, turns: int) -> None:
+        session_id = None
+        for _ in range(turns):
+            payload = {"message": self.rng.choice(CHAT_MESSAGES)}
+            if session_id:
+                payload["session_id"] = session_id
+            response = await self._post("chat/ask", "/chat/ask", json=payload)
+            if response.status_code == 200:
+                session_id = response.json()["session_id"]
+
+    async def upload_document(self) -> None:
+        await self._post(
+            "documents/upload",
+            "/documents/upload",
+            files={"file": (f"notes-{self.index}.txt", SAMPLE_DOCUMENT.encode(), "text/plain")},
+            data={"subject": "Science", "grade_level": "3", "student_id": self.student_id},
+        )
+
+    async def parent_dashboard(self) -> None:
+        await self.recorder.measure(
+            "parent/child/{id}",
+            self.client.get(f"{API}/parent/child/{self.student_id}", headers=self.headers),
+        )
@@ -0,0 +1,40 @@
+-- ============================================================================
+-- AI Tutor Platform - Document chunk vector search
+-- ============================================================================
+-- Adds the denormalized owner column and the HNSW index used by
+-- DocumentService.search_chunks. Safe to re-run; a no-op on a fresh database
+-- (init_db creates both with the tables).
+--
+-- Keep in sync with the settings: m and ef_construction below are the
+-- DOCUMENT_VECTOR_HNSW_M / DOCUMENT_VECTOR_HNSW_EF_CONSTRUCTION defaults that
+-- init_db uses on fresh databases, and the embedding column must have
+-- EMBEDDING_DIMENSIONS dimensions (changing that means altering the column
+-- and re-embedding every chunk). To rebuild with different HNSW settings:
+--   DROP INDEX ix_document_chunks_embedding_hnsw;
+--   CREATE INDEX CONCURRENTLY ix_document_chunks_embedding_hnsw ON document_chunks
+--       USING hnsw (embedding vector_cosine_ops) WITH (m = 24, ef_construction = 128);
+-- ============================================================================
+
+DO $$
+BEGIN
+    IF to_regclass('public.document_chunks') IS NULL THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE document_chunks
+        ADD COLUMN IF NOT EXISTS user_id UUID REFERENCES users(id) ON DELETE CASCADE;
+
+    UPDATE document_chunks dc
+    SET user_id = ud.user_id
+    FROM user_documents ud
+    WHERE dc.document_id = ud.id
+    AND dc.user_id IS NULL;
+
+    CREATE INDEX IF NOT EXISTS ix_document_chunks_user_id
+        ON document_chunks (user_id);
+
+    CREATE INDEX IF NOT EXISTS ix_document_chunks_embedding_hnsw
+        ON document_chunks USING hnsw (embedding vector_cosine_ops)
+        WITH (m = 16, ef_construction = 64);
+END
+$$;
@@ -0,0 +1,19 @@
+-- ============================================================================
+-- AI Tutor Platform - Document chunk full-text search
+-- ============================================================================
+-- GIN index used by hybrid (keyword + vector) retrieval in
+-- DocumentService.search_chunks. The expression must match the query:
+-- to_tsvector('<RAG_FULLTEXT_CONFIG>', content), 'english' by default.
+-- Safe to re-run; a no-op before the tables exist.
+-- ============================================================================
+
+DO $$
+BEGIN
+    IF to_regclass('public.document_chunks') IS NULL THEN
+        RETURN;
+    END IF;
+
+    CREATE INDEX IF NOT EXISTS ix_document_chunks_content_fts
+        ON document_chunks USING gin (to_tsvector('english', content));
+END
+$$;
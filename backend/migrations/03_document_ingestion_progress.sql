@@ -0,0 +1,23 @@
+-- ============================================================================
+-- AI Tutor Platform - Document ingestion progress
+-- ============================================================================
+-- Stage and percent columns for background document ingestion, polled via
+-- GET /documents/{id}. Documents processed before this change are marked
+-- done. Safe to re-run; a no-op before the tables exist.
+-- ============================================================================
+
+DO $$
+BEGIN
+    IF to_regclass('public.user_documents') IS NULL THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE user_documents ADD COLUMN IF NOT EXISTS processing_stage VARCHAR(50);
+    ALTER TABLE user_documents ADD COLUMN IF NOT EXISTS processing_progress INTEGER NOT NULL DEFAULT 0;
+
+    UPDATE user_documents
+    SET processing_stage = 'done', processing_progress = 100
+    WHERE processing_stage IS NULL
+      AND status IN ('completed', 'rejected', 'failed');
+END
+$$;
@@ -0,0 +1,18 @@
+-- ============================================================================
+-- AI Tutor Platform - Document ingestion heartbeat
+-- ============================================================================
+-- Running ingestion jobs refresh processing_heartbeat_at; documents left
+-- processing/validating without a recent heartbeat (crashed worker) are
+-- reset to pending and re-queued. Safe to re-run; a no-op before the
+-- tables exist.
+-- ============================================================================
+
+DO $$
+BEGIN
+    IF to_regclass('public.user_documents') IS NULL THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE user_documents ADD COLUMN IF NOT EXISTS processing_heartbeat_at TIMESTAMPTZ;
+END
+$$;
@@ -0,0 +1,18 @@
+-- ============================================================================
+-- AI Tutor Platform - Question bank embedding model
+-- ============================================================================
+-- Records which "provider:model" produced question_bank.embedding. Dedup
+-- only compares vectors from the current SIMILARITY_EMBEDDING_PROVIDER;
+-- existing rows (NULL here) are re-embedded the next time their subtopic
+-- is banked. Safe to re-run; a no-op before the tables exist.
+-- ============================================================================
+
+DO $$
+BEGIN
+    IF to_regclass('public.question_bank') IS NULL THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE question_bank ADD COLUMN IF NOT EXISTS embedding_model VARCHAR(100);
+END
+$$;
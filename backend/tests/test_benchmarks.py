@@ -0,0 +1,57 @@
+"""
+AI Tutor Platform - Benchmark Regression Test
+Runs the simulated student sessions (SQLite + fake LLM) against the committed
+baseline. Deselected by default; run with `pytest -m benchmark`.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.harness import compare_to_baseline, load_report
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BASELINE = BACKEND_DIR / "benchmarks" / "baselines" / "sqlite.json"
+
+# Wall-clock numbers swing with the machine and with scheduling at this
+# concurrency (the fast endpoints are tens of ms), so latency and throughput
+# only catch gross slowdowns here. Query counts are steady except tests/start,
+# whose cache hits depend on interleaving (about +-2); an N+1 adds far more
+LATENCY_TOLERANCE = 1.0
+LATENCY_SLACK_MS = 250.0
+THROUGHPUT_TOLERANCE = 0.5
+QUERY_SLACK = 2.0
+
+
+@pytest.mark.benchmark
+def test_no_regressions_against_sqlite_baseline(tmp_path: Path):
+    """Same scenario settings as the baseline, compared with CI tolerances."""
+    baseline = load_report(BASELINE)
+    metadata = baseline["metadata"]
+    output = tmp_path / "report.json"
+    command = [
+        sys.executable, "-m", "benchmarks",
+        "--database-url", f"sqlite+aiosqlite:///{tmp_path / 'benchmark.db'}",
+        "--sessions", str(metadata["sessions"]),
+        "--concurrency", str(metadata["concurrency"]),
+        "--seed", str(metadata["seed"]),
+        "--fake-latency-ms", str(metadata["fake_latency_ms"]),
+        "--output", str(output),
+    ]
+
+    # A separate process: the benchmark selects the fake provider before
+    # settings load, and the app here is already configured for the tests
+    result = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, timeout=1800)
+    assert result.returncode == 0, result.stdout[-4000:] + result.stderr[-4000:]
+
+    regressions = compare_to_baseline(
+        load_report(output),
+        baseline,
+        latency_tolerance=LATENCY_TOLERANCE,
+        throughput_tolerance=THROUGHPUT_TOLERANCE,
+        latency_slack_ms=LATENCY_SLACK_MS,
+        query_slack=QUERY_SLACK,
+    )
+    assert not regressions, "\n".join(regressions)
@@ -0,0 +1,147 @@
+"""
+AI Tutor Platform - Document Chunking Tests
+"""
+import re
+
+import pytest
+
+from app.ai.core.chunking import SentenceChunker, TokenChunker
+from benchmarks.chunking import generate_text, legacy_chunk_text
+
+
+def count_tokens(text: str) -> int:
+    """Deterministic stand-in tokenizer: words and punctuation marks."""
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+LONG_SENTENCE = " ".join(f"word{i}" for i in range(120)) + "."
+
+TEXT = " ".join([
+    generate_text(3_000, seed=1),
+    LONG_SENTENCE,
+    generate_text(2_000, seed=2),
+    LONG_SENTENCE,
+    "Short one. Another!",
+])
+
+
+def sentence_chunks(pages, chunk_size, overlap):
+    chunker = SentenceChunker(count_tokens, chunk_size, overlap)
+    for page, text in enumerate(pages, start=1):
+        chunker.feed(text, page)
+    return chunker.finish()
+
+
+# ==================== SentenceChunker (compatible mode) ====================
+
+@pytest.mark.parametrize("chunk_size,overlap", [(50, 0), (50, 10), (80, 30), (25, 24)])
+def test_sentence_chunker_matches_legacy(chunk_size, overlap):
+    """Chunks and counts are identical to the original _chunk_text."""
+    legacy = legacy_chunk_text(count_tokens, TEXT, chunk_size, overlap)
+    result = sentence_chunks([TEXT], chunk_size, overlap)
+
+    assert result.chunks == legacy.chunks
+    assert result.token_counts == legacy.token_counts
+    assert result.total_tokens == legacy.total_tokens
+    assert [m["chunk_index"] for m in result.metadata] == list(range(len(result.chunks)))
+
+
+def test_sentence_chunker_splits_long_sentences_between_words():
+    """A sentence over chunk_size is cut into word pieces of at most chunk_size."""
+    result = sentence_chunks([LONG_SENTENCE], chunk_size=50, overlap=10)
+
+    assert len(result.chunks) == 3
+    assert " ".join(result.chunks) == LONG_SENTENCE
+    assert all(count <= 50 for count in result.token_counts)
+    assert result.token_counts == [count_tokens(chunk) for chunk in result.chunks]
+
+
+def test_sentence_chunker_overlap_repeats_trailing_sentences():
+    """The next chunk starts with the previous chunk's last sentences (within overlap)."""
+    sentences = [f"Sentence number {i} is here." for i in range(12)]  # 6 tokens each
+    result = sentence_chunks([" ".join(sentences)], chunk_size=30, overlap=12)
+
+    assert result.chunks[0] == " ".join(sentences[0:5])
+    assert result.chunks[1] == " ".join(sentences[3:8])
+    assert result.chunks[2] == " ".join(sentences[6:11])
+    assert result.chunks[3] == " ".join(sentences[9:12])
+
+
+def test_sentence_chunker_multi_page_matches_single_feed():
+    """Feeding page by page gives the same chunks as the joined text, with page ranges."""
+    pages = [generate_text(1_500, seed=seed) + "." for seed in range(4)]  # Pages end a sentence
+    legacy = legacy_chunk_text(count_tokens, " ".join(pages), 60, 15)
+    result = sentence_chunks(pages, chunk_size=60, overlap=15)
+
+    assert result.chunks == legacy.chunks
+    assert result.token_counts == legacy.token_counts
+    assert result.metadata[0]["page_start"] == 1
+    assert result.metadata[-1]["page_end"] == len(pages)
+    for metadata in result.metadata:
+        assert 1 <= metadata["page_start"] <= metadata["page_end"] <= len(pages)
+    starts = [metadata["page_start"] for metadata in result.metadata]
+    assert starts == sorted(starts)
+    assert any(m["page_start"] < m["page_end"] for m in result.metadata)  # Chunks span pages
+
+
+# ==================== TokenChunker ====================
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    """Small offline BPE encoding with multi-byte tokens (no vocabulary download)."""
+    tiktoken = pytest.importorskip("tiktoken")
+    ranks = {bytes([i]): i for i in range(256)}
+    for merge in [
+        b"th", b"he", b"the", b" t", b" th", b" the", b"in", b"ng", b"ing",
+        b"an", b"er", b"on", b" a", b"at", b"es", b"or", b"d.", b"\xc3\xa9",
+    ]:
+        ranks[merge] = len(ranks)
+    return tiktoken.Encoding(
+        name="test_chunking_bpe",
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks=ranks,
+        special_tokens={},
+    )
+
+
+PAGES = [
+    generate_text(2_500, seed=3),
+    "Café théorie. " + LONG_SENTENCE + " The end of the page.",
+    generate_text(1_800, seed=4) + " Résumé d'été!",
+]
+
+
+def token_chunks(tokenizer, pages, chunk_size, overlap):
+    chunker = TokenChunker(tokenizer, chunk_size, overlap)
+    for page, text in enumerate(pages, start=1):
+        chunker.feed(text, page)
+    return chunker.finish()
+
+
+def test_token_chunker_counts_sum_to_page_encoding(tokenizer):
+    """Without overlap every token of every page is counted exactly once."""
+    for page in PAGES:
+        result = token_chunks(tokenizer, [page], chunk_size=40, overlap=0)
+        assert result.total_tokens == len(tokenizer.encode_ordinary(page))
+
+    result = token_chunks(tokenizer, PAGES, chunk_size=40, overlap=0)
+    assert result.total_tokens == sum(len(tokenizer.encode_ordinary(page)) for page in PAGES)
+
+
+@pytest.mark.parametrize("chunk_size,overlap", [(40, 0), (40, 10), (64, 32), (16, 8)])
+def test_token_chunker_respects_chunk_size(tokenizer, chunk_size, overlap):
+    """No chunk, including its overlap and long-sentence windows, exceeds chunk_size."""
+    result = token_chunks(tokenizer, PAGES, chunk_size, overlap)
+
+    assert result.chunks
+    assert all(0 < count <= chunk_size for count in result.token_counts)
+    assert all(chunk.strip() for chunk in result.chunks)
+    assert [m["chunk_index"] for m in result.metadata] == list(range(len(result.chunks)))
+
+
+def test_token_chunker_long_sentence_windows_cut_at_word_starts(tokenizer):
+    """Windows of an over-long sentence keep whole words and all of its text."""
+    result = token_chunks(tokenizer, [LONG_SENTENCE], chunk_size=30, overlap=0)
+
+    assert len(result.chunks) > 1
+    assert " ".join(result.chunks).split() == LONG_SENTENCE.split()
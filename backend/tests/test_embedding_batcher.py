@@ -0,0 +1,44 @@
+"""
+AI Tutor Platform - Embedding Batch Packing Tests
+"""
+from app.ai.core.embedding_batcher import pack_batches
+
+
+def test_batches_respect_token_limit_in_order():
+    texts = [f"t{i}" for i in range(6)]
+    batches = pack_batches(texts, [40, 30, 30, 50, 10, 45], max_tokens=100, max_texts=10)
+
+    assert [b.texts for b in batches] == [["t0", "t1", "t2"], ["t3", "t4"], ["t5"]]
+    assert [b.start for b in batches] == [0, 3, 5]
+    assert [b.tokens for b in batches] == [100, 60, 45]
+
+
+def test_batches_respect_text_limit():
+    batches = pack_batches(list("abcdefg"), [1] * 7, max_tokens=1000, max_texts=3)
+
+    assert [len(b.texts) for b in batches] == [3, 3, 1]
+    assert [b.start for b in batches] == [0, 3, 6]
+
+
+def test_oversized_text_gets_its_own_batch():
+    batches = pack_batches(["small", "huge", "small2"], [10, 500, 10], max_tokens=100, max_texts=10)
+
+    assert [b.texts for b in batches] == [["small"], ["huge"], ["small2"]]
+    assert batches[1].tokens == 500
+
+
+def test_every_text_is_packed_exactly_once():
+    texts = [f"t{i}" for i in range(50)]
+    counts = [(i * 37) % 90 + 1 for i in range(50)]
+    batches = pack_batches(texts, counts, max_tokens=200, max_texts=8)
+
+    assert [t for b in batches for t in b.texts] == texts
+    for b in batches:
+        assert b.texts == texts[b.start:b.start + len(b.texts)]
+        assert b.tokens == sum(counts[b.start:b.start + len(b.texts)])
+        assert len(b.texts) <= 8
+        assert b.tokens <= 200 or len(b.texts) == 1
+
+
+def test_empty_input():
+    assert pack_batches([], [], max_tokens=100, max_texts=10) == []
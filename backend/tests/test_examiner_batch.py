@@ -0,0 +1,79 @@
+"""
+AI Tutor Platform - Examiner Batch Answer-Correction Tests
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai.agents.examiner import ExaminerAgent, GeneratedQuestion
+
+
+def make_question(options=("5", "6", "7", "8"), answer="6") -> GeneratedQuestion:
+    return GeneratedQuestion(question="What is 2 + 3?", answer=answer, options=list(options))
+
+
+def test_corrected_answer_replaces_the_wrong_option():
+    question = make_question(options=("6", "7", "8", "9"))
+
+    ExaminerAgent._apply_corrected_answer(question, "5")
+
+    assert question.options == ["5", "7", "8", "9"]
+    assert question.answer == "5"
+    assert question.correct_answers == ["5"]
+
+
+def test_corrected_answer_already_an_option_keeps_options():
+    """The model marked a distractor as correct: no option is duplicated."""
+    question = make_question()
+
+    ExaminerAgent._apply_corrected_answer(question, "5")
+
+    assert question.options == ["5", "6", "7", "8"]
+    assert question.answer == "5"
+    assert question.correct_answers == ["5"]
+
+
+class FakeValidator:
+    """Rejects every answer key as wrong, then answers the re-check."""
+
+    def __init__(self, recheck_valid: bool):
+        self.recheck_valid = recheck_valid
+        self.rechecks = []
+
+    async def validate_many(self, questions, session_id, grade=1, subject=""):
+        return [SimpleNamespace(is_valid=False, corrected_answer="5") for _ in questions]
+
+    async def validate(self, **kwargs):
+        self.rechecks.append(kwargs)
+        return SimpleNamespace(is_valid=self.recheck_valid, corrected_answer=None)
+
+    async def record_question(self, session_id, question):
+        pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("recheck_valid", [True, False])
+async def test_batch_revalidates_corrected_questions(monkeypatch, recheck_valid):
+    agent = ExaminerAgent()
+    agent._validator = FakeValidator(recheck_valid)
+    responses = [[(("Addition", "Sums"), make_question(options=("6", "6", "7", "8")))]]
+
+    async def request_batch(*args, **kwargs):
+        return responses.pop(0) if responses else []
+
+    monkeypatch.setattr(agent, "_request_batch", request_batch)
+
+    result = await agent.generate_batch(
+        subject="Math",
+        topic_distribution=[("Addition", "Sums", 1)],
+        difficulty_distribution=["easy"],
+        grade=1,
+    )
+
+    recheck = agent._validator.rechecks[0]
+    assert recheck["answer"] is None
+    assert recheck["options"] == ["5", "6", "7", "8"]
+    if recheck_valid:
+        assert result[0].answer == "5"
+    else:
+        assert result == [None]
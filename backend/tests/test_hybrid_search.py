@@ -0,0 +1,67 @@
+"""
+AI Tutor Platform - Hybrid Search Tests
+BM25 keyword ranking and reciprocal-rank fusion.
+"""
+import pytest
+
+from app.ai.core.hybrid_search import BM25Index, fulltext_query, reciprocal_rank_fusion, tokenize
+
+
+@pytest.fixture
+def index() -> BM25Index:
+    index = BM25Index()
+    index.add(("c1", "doc1"), "Photosynthesis turns sunlight, water and carbon dioxide into sugar.")
+    index.add(("c2", "doc1"), "Plants release oxygen during photosynthesis. Oxygen is a gas.")
+    index.add(("c3", "doc2"), "The Roman empire built roads across the continent.")
+    index.add(("c4", "doc2"), "Rivers carry water from the mountains to the sea.")
+    return index
+
+
+def test_tokenize_drops_stopwords_and_case():
+    assert tokenize("What is the Capital of France?") == ["capital", "france"]
+    assert fulltext_query("What is photosynthesis and why is photosynthesis needed?") == (
+        "photosynthesis | needed"
+    )
+    assert fulltext_query("What is it?") == ""
+
+
+def test_bm25_ranks_by_term_frequency_and_rarity(index: BM25Index):
+    results = index.search("oxygen photosynthesis")
+
+    assert [key for key, _ in results] == [("c2", "doc1"), ("c1", "doc1")]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_bm25_rare_terms_outweigh_common_ones(index: BM25Index):
+    """'roman' is in one chunk, 'water' in two: the rare match ranks first."""
+    results = index.search("water roman")
+
+    assert results[0][0] == ("c3", "doc2")
+    assert {key for key, _ in results} == {("c1", "doc1"), ("c3", "doc2"), ("c4", "doc2")}
+
+
+def test_bm25_limit_filter_and_no_match(index: BM25Index):
+    assert len(index.search("water", limit=1)) == 1
+    filtered = index.search("water", where=lambda key: key[1] == "doc2")
+    assert [key for key, _ in filtered] == [("c4", "doc2")]
+    assert index.search("volcano") == []
+    assert index.search("water", limit=0) == []
+    assert BM25Index().search("water") == []
+
+
+def test_rrf_sums_reciprocal_ranks():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+
+    scores = dict(fused)
+    assert scores["a"] == pytest.approx(1 / 61 + 1 / 62)
+    assert scores["b"] == pytest.approx(1 / 62)
+    assert scores["c"] == pytest.approx(1 / 63 + 1 / 61)
+    assert [key for key, _ in fused] == ["a", "c", "b"]
+
+
+def test_rrf_favours_agreement_over_single_top_rank():
+    """A key ranked second in both lists beats one ranked first in only one."""
+    fused = reciprocal_rank_fusion([["dense_only", "both"], ["lexical_only", "both"]], k=60)
+
+    assert fused[0][0] == "both"
+    assert reciprocal_rank_fusion([]) == []
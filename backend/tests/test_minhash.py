@@ -0,0 +1,78 @@
+"""
+AI Tutor Platform - MinHash / LSH Index Tests
+"""
+import pytest
+
+from app.ai.core.minhash import LSHIndex, MinHasher, normalize_text
+
+
+def test_normalize_text_canonicalizes_numbers_and_punctuation():
+    assert normalize_text("What is 1,000 + 0.50?") == "what is 1000 0.5"
+    assert normalize_text("Add  01000 and 2.") == "add 1000 and 2"
+
+
+def test_signatures_are_deterministic_and_estimate_jaccard():
+    hasher = MinHasher()
+    a = hasher.signature("How many legs does a spider have?")
+
+    assert (a == hasher.signature("how many legs does a SPIDER have")).all()
+    assert MinHasher.jaccard(a, hasher.signature("How many legs does a spider have?")) == 1.0
+    assert MinHasher.jaccard(a, hasher.signature("Name the capital city of France.")) < 0.2
+
+
+def test_query_finds_near_duplicates_only():
+    index = LSHIndex()
+    index.add("spider", "How many legs does a spider have?")
+    index.add("france", "What is the capital city of France?")
+
+    matches = index.query("How many legs does a spider have in total?", threshold=0.5)
+
+    assert [key for key, _ in matches] == ["spider"]
+    assert 0.5 <= matches[0][1] < 1.0
+    assert index.query("Which planet is closest to the sun?", threshold=0.5) == []
+
+
+def test_numbers_keep_questions_apart():
+    """Different operands are different drills, not duplicates."""
+    index = LSHIndex()
+    index.add("a", "What is 3 + 4?")
+
+    assert index.query("What is 3 + 4 ?", threshold=0.9)
+    assert not index.query("What is 58 + 67?", threshold=0.9)
+
+
+def test_readding_a_key_replaces_its_signature():
+    index = LSHIndex()
+    index.add("q", "How many legs does a spider have?")
+    index.add("q", "What is the capital city of France?")
+
+    assert len(index) == 1
+    assert index.query("How many legs does a spider have?", threshold=0.5) == []
+    assert [key for key, _ in index.query("What is the capital city of France?", 0.9)] == ["q"]
+
+
+def test_remove_drops_key_from_all_buckets():
+    index = LSHIndex()
+    index.add("q", "How many legs does a spider have?")
+    index.remove("q")
+    index.remove("missing")  # No-op
+
+    assert "q" not in index
+    assert index.candidates("How many legs does a spider have?") == set()
+    assert all(not band for band in index._buckets)
+
+
+def test_max_size_evicts_oldest_entries():
+    index = LSHIndex(max_size=2)
+    for i, text in enumerate(["Spiders have eight legs.", "Cats have four legs.", "Birds have two legs."]):
+        index.add(i, text)
+
+    assert len(index) == 2
+    assert 0 not in index
+    assert set(index.jaccard_all("Birds have two legs.")) == {1, 2}
+    assert index.jaccard_all("Birds have two legs.")[2] == 1.0
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        LSHIndex(hasher=MinHasher(num_perm=64), bands=7)
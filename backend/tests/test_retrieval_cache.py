@@ -0,0 +1,78 @@
+"""
+AI Tutor Platform - Retrieval Cache Tests (local mode)
+"""
+import pytest
+
+from app.services import retrieval_cache as retrieval_cache_module
+from app.services.retrieval_cache import CachedHit, RetrievalCache, normalize_query
+
+
+HITS = [CachedHit("chunk-1", 0.91, True), CachedHit("chunk-2", 0.74)]
+
+
+@pytest.fixture
+def cache() -> RetrievalCache:
+    return RetrievalCache(max_entries=3, ttl=60, use_redis=False)
+
+
+def test_normalize_query():
+    assert normalize_query("  What is  Photosynthesis?? ") == "what is photosynthesis"
+
+
+@pytest.mark.asyncio
+async def test_hit_for_equivalent_query(cache: RetrievalCache):
+    await cache.set("u1", "doc1", "What is photosynthesis?", 5, HITS, "1:a")
+
+    assert await cache.get("u1", "doc1", "what is  PHOTOSYNTHESIS", 5, "1:a") == HITS
+    assert cache.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_miss_on_different_scope(cache: RetrievalCache):
+    """User, document, limit and document-set version are all part of the key."""
+    await cache.set("u1", "doc1", "photosynthesis", 5, HITS, "1:a")
+
+    assert await cache.get("u2", "doc1", "photosynthesis", 5, "1:a") is None
+    assert await cache.get("u1", "doc2", "photosynthesis", 5, "1:a") is None
+    assert await cache.get("u1", None, "photosynthesis", 5, "1:a") is None
+    assert await cache.get("u1", "doc1", "photosynthesis", 3, "1:a") is None
+    assert await cache.get("u1", "doc1", "photosynthesis", 5, "2:b") is None
+    assert cache.stats["misses"] == 5
+
+
+@pytest.mark.asyncio
+async def test_entries_expire(cache: RetrievalCache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(retrieval_cache_module.time, "monotonic", lambda: now[0])
+    await cache.set("u1", "doc1", "photosynthesis", 5, HITS)
+
+    now[0] += 59
+    assert await cache.get("u1", "doc1", "photosynthesis", 5) == HITS
+    now[0] += 2
+    assert await cache.get("u1", "doc1", "photosynthesis", 5) is None
+    assert cache.stats["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction(cache: RetrievalCache):
+    for query in ("q1", "q2", "q3"):
+        await cache.set("u1", None, query, 5, HITS)
+    await cache.get("u1", None, "q1", 5)  # q2 is now least recently used
+    await cache.set("u1", None, "q4", 5, HITS)
+
+    assert cache.stats["size"] == 3
+    assert await cache.get("u1", None, "q2", 5) is None
+    assert await cache.get("u1", None, "q1", 5) == HITS
+    assert await cache.get("u1", None, "q4", 5) == HITS
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_drops_only_their_entries(cache: RetrievalCache):
+    await cache.set("u1", "doc1", "photosynthesis", 5, HITS)
+    await cache.set("u2", "doc9", "photosynthesis", 5, HITS)
+
+    await cache.invalidate_user("u1")
+
+    assert await cache.get("u1", "doc1", "photosynthesis", 5) is None
+    assert await cache.get("u2", "doc9", "photosynthesis", 5) == HITS
+    assert cache.stats["invalidations"] == 1
@@ -0,0 +1,88 @@
+"""
+AI Tutor Platform - Validator State Store Tests
+The in-process fallback must behave exactly like the Redis pipeline.
+"""
+import pytest
+import pytest_asyncio
+
+from app.ai.core.validator_state import ValidatorSessionState, ValidatorStateStore
+
+
+@pytest_asyncio.fixture(params=["local", "redis"])
+async def store(request) -> ValidatorStateStore:
+    """Store backed by the local fallback or by (fake) Redis."""
+    if request.param == "local":
+        yield ValidatorStateStore(use_redis=False, ttl=60, max_history=3, max_concepts=4)
+        return
+
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    store = ValidatorStateStore(use_redis=True, ttl=60, max_history=3, max_concepts=4)
+    store._redis = redis
+    yield store
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_empty_session(store: ValidatorStateStore):
+    """An unknown session loads as empty state."""
+    state = await store.load("new-session")
+    assert state == ValidatorSessionState()
+
+
+@pytest.mark.asyncio
+async def test_history_is_trimmed_to_most_recent(store: ValidatorStateStore):
+    """Only the last max_history questions are kept, oldest first."""
+    for i in range(5):
+        await store.record("s1", f"Question {i}?", {}, [])
+
+    state = await store.load("s1")
+    assert state.history == ["Question 2?", "Question 3?", "Question 4?"]
+
+
+@pytest.mark.asyncio
+async def test_reused_concepts_move_to_most_recent_end(store: ValidatorStateStore):
+    """A re-used concept is removed and re-appended (LREM + RPUSH), then trimmed."""
+    await store.record("s1", "q1", {"words": ["apple", "pear", "plum"]}, [])
+    await store.record("s1", "q2", {"words": ["apple"]}, [])
+    await store.record("s1", "q3", {"words": ["kiwi", "fig"]}, [])
+
+    state = await store.load("s1")
+    assert state.concepts["words"] == ["plum", "apple", "kiwi", "fig"]
+
+
+@pytest.mark.asyncio
+async def test_numbers_and_pattern_counts_round_trip_as_ints(store: ValidatorStateStore):
+    """Numbers come back as ints and pattern usage as int counters."""
+    await store.record("s1", "What is 3 + 4?", {"numbers": [3, 4]}, ["addition"])
+    await store.record("s1", "What is 4 + 12?", {"numbers": [4, 12]}, ["addition", "two_digit"])
+
+    state = await store.load("s1")
+    assert state.concepts["numbers"] == [3, 4, 12]
+    assert state.pattern_usage == {"addition": 2, "two_digit": 1}
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_isolated_and_clearable(store: ValidatorStateStore):
+    """Sessions do not share state; clear drops one session only."""
+    await store.record("s1", "q1", {"formats": ["fill_blank"]}, ["p"])
+    await store.record("s2", "q2", {}, [])
+
+    await store.clear("s1")
+
+    assert await store.load("s1") == ValidatorSessionState()
+    assert (await store.load("s2")).history == ["q2"]
+
+
+@pytest.mark.asyncio
+async def test_loaded_state_is_a_snapshot(store: ValidatorStateStore):
+    """Mutating a loaded state does not change the stored one."""
+    await store.record("s1", "q1", {"words": ["apple"]}, [])
+
+    state = await store.load("s1")
+    state.history.append("not recorded")
+    state.concepts["words"].clear()
+
+    reloaded = await store.load("s1")
+    assert reloaded.history == ["q1"]
+    assert reloaded.concepts["words"] == ["apple"]
@@ -39,6 +39,7 @@ export default function DocumentsPage() {
     const [uploadProgress, setUploadProgress] = useState(0)
     const fileInputRef = useRef<HTMLInputElement>(null)
     const chatEndRef = useRef<HTMLDivElement>(null)
+    const pollAbortRef = useRef<AbortController | null>(null)
 
     // Quiz state
     const [quizLoading, setQuizLoading] = useState(false)
@@ -49,6 +50,10 @@ export default function DocumentsPage() {
 
     useEffect(() => {
         loadDocuments()
+        // Stop polling upload status when leaving the page
+        const controller = new AbortController()
+        pollAbortRef.current = controller
+        return () => controller.abort()
     }, [])
 
     useEffect(() => {
@@ -95,6 +100,18 @@ export default function DocumentsPage() {
                 setUploadProgress(0)
             }, 1000)
 
+            // Ingestion runs in the background; refresh the entry as it progresses
+            documentService
+                .waitForProcessing(
+                    doc.job_id,
+                    updated => {
+                        setDocuments(prev => prev.map(d => (d.id === updated.id ? updated : d)))
+                        setSelectedDoc(prev => (prev?.id === updated.id ? updated : prev))
+                    },
+                    { signal: pollAbortRef.current?.signal }
+                )
+                .catch(error => console.error('Failed to poll document status:', error))
+
         } catch (error) {
             console.error('Upload failed:', error)
             setUploading(false)
@@ -387,7 +404,11 @@ export default function DocumentsPage() {
                                                             {getStatusIcon(doc.status)}
                                                             <span>{documentService.formatFileSize(doc.file_size)}</span>
                                                             <span>•</span>
-                                                            <span>{doc.chunk_count} chunks</span>
+                                                            {documentService.isProcessing(doc.status) && doc.processing_stage ? (
+                                                                <span>{doc.processing_stage} ({doc.processing_progress}%)</span>
+                                                            ) : (
+                                                                <span>{doc.chunk_count} chunks</span>
+                                                            )}
                                                         </div>
                                                     </div>
                                                 </div>
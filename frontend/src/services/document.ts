@@ -16,6 +16,8 @@ export interface Document {
     chunk_count: number
     total_tokens: number
     error_message: string | null
+    processing_stage: string | null
+    processing_progress: number
     validation_status: string | null
     validation_result: {
         is_appropriate: boolean
@@ -28,6 +30,10 @@ export interface Document {
     created_at: string
 }
 
+export interface DocumentUploadResponse extends Document {
+    job_id: string
+}
+
 export interface DocumentListResponse {
     documents: Document[]
     total: number
@@ -71,7 +77,7 @@ class DocumentService {
         subject?: string,
         gradeLevel?: number,
         description?: string
-    ): Promise<Document> {
+    ): Promise<DocumentUploadResponse> {
         const formData = new FormData()
         formData.append('file', file)
         if (subject) formData.append('subject', subject)
@@ -111,6 +117,37 @@ class DocumentService {
         return response.data
     }
 
+    /**
+     * Poll a queued upload until ingestion finishes, the timeout passes or
+     * the signal aborts; resolves with the last status seen
+     */
+    async waitForProcessing(
+        documentId: string,
+        onUpdate?: (doc: Document) => void,
+        {
+            intervalMs = 1500,
+            timeoutMs = 15 * 60 * 1000,
+            signal,
+        }: { intervalMs?: number; timeoutMs?: number; signal?: AbortSignal } = {}
+    ): Promise<Document> {
+        const deadline = Date.now() + timeoutMs
+        for (;;) {
+            const doc = await this.getDocument(documentId)
+            if (signal?.aborted) return doc
+            onUpdate?.(doc)
+            if (!this.isProcessing(doc.status) || Date.now() >= deadline) return doc
+            await new Promise(resolve => setTimeout(resolve, intervalMs))
+            if (signal?.aborted) return doc
+        }
+    }
+
+    /**
+     * Whether a document is still queued or being ingested
+     */
+    isProcessing(status: string): boolean {
+        return status === 'pending' || status === 'processing' || status === 'validating'
+    }
+
     /**
      * Delete a document
      */